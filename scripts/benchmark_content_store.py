@@ -0,0 +1,96 @@
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from content_store import CONTENT_STORE_FILE, LEGACY_FILES, ContentStore, _record_line, split_key
+
+# Micro-benchmark: almacén comprimido vs registro sin comprimir vs los JSON anteriores
+#
+#   python scripts/benchmark_content_store.py
+#
+# Con los fragmentos de data/content_store.jsonl arma, en una carpeta
+# temporal, los cuatro JSON anteriores (load_json: json.load de cada archivo
+# completo) y un registro con el HTML plano (formato anterior del almacén).
+# Compara el tamaño en disco y el tiempo de leer todos los fragmentos y los
+# de una sola marca (lectura bajo demanda, lo que hace un generador
+# incremental). Los índices se construyen antes de medir.
+REPEATS = 5
+
+def best_time(read):
+    """Mejor tiempo de REPEATS pasadas"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        read()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def load_json_all(paths):
+    """Todos los fragmentos leyendo los JSON completos"""
+    data = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data.update(json.load(f))
+    return data
+
+def read_store(path, cache_dir, brand=None):
+    """Todos los fragmentos (o los de una marca) abriendo el almacén"""
+    with ContentStore(path, cache_dir) as store:
+        keys = store.keys_for(brand=brand) if brand else list(store)
+        return [store[key] for key in keys]
+
+def run_benchmark():
+    with ContentStore() as store:
+        fragments = {key: store[key] for key in store}
+        fingerprints = {key: store.fingerprint(key) for key in fragments}
+        tmp_dir = Path(tempfile.mkdtemp(prefix='bench_store_'))
+        store.export_legacy(tmp_dir)
+    if not fragments:
+        print("[ERROR] El almacen esta vacio")
+        return
+
+    plain_path = tmp_dir / 'plain.jsonl'
+    with open(plain_path, 'wb') as f:
+        for key, html in fragments.items():
+            f.write(_record_line(key, html, fingerprints[key]))
+    legacy_paths = [tmp_dir / path.name for path in LEGACY_FILES.values() if (tmp_dir / path.name).exists()]
+    html_bytes = sum(len(html.encode('utf-8')) for html in fragments.values())
+    brand = split_key(next(iter(fragments)))[1]
+
+    # Índices listos antes de medir (como en una compilación normal)
+    plain_cache, packed_cache = tmp_dir / 'cache_plain', tmp_dir / 'cache_packed'
+    read_store(plain_path, plain_cache)
+    read_store(CONTENT_STORE_FILE, packed_cache)
+
+    sizes = [
+        ("JSON anteriores", sum(path.stat().st_size for path in legacy_paths)),
+        ("registro plano", plain_path.stat().st_size),
+        ("comprimido", CONTENT_STORE_FILE.stat().st_size),
+    ]
+    print("[*] Benchmark: almacen comprimido vs registro plano vs JSON anteriores")
+    print(f"[*] {len(fragments)} fragmentos, {html_bytes:,d} bytes de HTML, {len(set(fragments.values()))} cuerpos distintos")
+    print("=" * 70)
+    for label, size in sizes:
+        print(f"{label:18s} {size:>12,d} bytes  x{sizes[0][1] / size:5.2f}")
+
+    print("-" * 70)
+    brand_bytes = sum(len(html.encode('utf-8')) for key, html in fragments.items() if split_key(key)[1] == brand)
+    reads = [
+        ("load_json", html_bytes, lambda: load_json_all(legacy_paths)),
+        ("registro plano", html_bytes, lambda: read_store(plain_path, plain_cache)),
+        ("comprimido", html_bytes, lambda: read_store(CONTENT_STORE_FILE, packed_cache)),
+        (f"plano ({brand})", brand_bytes, lambda: read_store(plain_path, plain_cache, brand)),
+        (f"comprimido ({brand})", brand_bytes, lambda: read_store(CONTENT_STORE_FILE, packed_cache, brand)),
+    ]
+    for label, size, read in reads:
+        seconds = best_time(read)
+        print(f"{label:24s} {seconds * 1000:9.2f} ms  {size / seconds / 1024 / 1024:8.1f} MB/s de HTML")
+
+    print("=" * 70)
+    print(f"[*] Mejor de {REPEATS} pasadas")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,372 @@
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from build_repair_pages import REPAIR_TYPES
+from catalog import BRANDS_FILE, CATALOG_FILE, validate
+from content_store import KINDS, ContentStore, _record_line, split_key, write_atomic
+from gemini_client import prompt_fingerprint
+from regenerate import KINDS as PROMPT_KINDS, expected_entries
+
+# Benchmark de escala con catálogos sintéticos
+#
+#   python scripts/benchmark_scale.py [--brands 42,1000,20000] [--models N] [--jobs J]
+#                                     [--repeat R] [--threshold X] [--baseline archivo]
+#                                     [--save-baseline] [--keep]
+#
+# Para cada escala arma, en una carpeta temporal, una copia del proyecto
+# (scripts/, plantillas, vendor/, páginas estáticas y recursos) con datos
+# sintéticos: brands.json con las 42 marcas reales seguidas de 'Marca 00043',
+# 'Marca 00044'..., catalog.json con N modelos por marca (copias de los
+# modelos reales) y un almacén de contenido completo, con un fragmento por
+# cada clave que piden los generadores (el fragmento real del mismo tipo con
+# el nombre de la marca cambiado) y la huella de su prompt actual. Los
+# modelos usan el plan por firma de especificaciones (spec_plan).
+#
+# Sobre esa copia se ejecutan las etapas de STAGES, cada una como un
+# proceso aparte y en orden: los generadores, una segunda pasada sin
+# cambios, la hoja de estilos y el sprite, la reescritura, el sitemap y los
+# verificadores de enlaces. De cada etapa se registra el tiempo, el pico de
+# RSS del proceso, los archivos creados/modificados/borrados y el ritmo en
+# páginas por segundo.
+#
+# Todo corre sin red: el almacén tiene todos los fragmentos (ningún
+# generador llega a pedir nada) y GEMINI_API_URL apunta a un puerto local
+# cerrado, así que una petición inesperada falla al instante (la etapa
+# muestra 'API calls realizadas' > 0 en su log).
+#
+# Los resultados quedan en .build_cache/benchmarks/escala.json. Con
+# --save-baseline se guardan además como referencia
+# (.build_cache/benchmarks/baseline.json, o --baseline archivo); en las
+# ejecuciones siguientes cada etapa se compara con la referencia de la misma
+# escala y el script termina con código 1 si alguna es más de --threshold %
+# más lenta (y al menos MIN_SLOWDOWN segundos, para no fallar por ruido en
+# etapas cortas). Con --repeat R se toma el mejor tiempo de R ejecuciones.
+#
+# Los tipos de reparación están fijos en el código (REPAIR_TYPES más la
+# válvula), así que cada marca suma 1 + N + len(REPAIR_TYPES) + 1 páginas.
+# 20.000 marcas con 3 modelos son unas 220.000 páginas (varios GB en disco).
+
+BASE_DIR = Path(__file__).parent.parent
+BENCH_DIR = BASE_DIR / '.build_cache' / 'benchmarks'
+RESULTS_FILE = BENCH_DIR / 'escala.json'
+BASELINE_FILE = BENCH_DIR / 'baseline.json'
+
+DEFAULT_BRANDS = (42, 1000)
+DEFAULT_MODELS = 3
+DEFAULT_THRESHOLD = 20.0
+MIN_SLOWDOWN = 0.25  # segundos
+
+# Etapas que recorren las páginas del sitio (las demás no informan páginas por segundo)
+PAGE_STAGES = ('build_all_sections', 'build_repair_pages', 'build_cambiar_valvula_pages', 'build_css',
+               'build_icons', 'rewrite_site', 'generate_sitemap', 'link_checker', 'verificar_rutas')
+
+# Qué se copia del proyecto a la carpeta de cada escala
+COPY_DIRS = ('scripts', 'templates', 'documentacion', 'vendor', 'public/assets')
+COPY_FILES = ('data/rewrite_rules.json', 'data/stylesheet.json', 'data/fonts.json', 'data/sprite.json',
+              'public/index.html', 'public/404.html')
+
+# Puerto cerrado: una petición a la API falla enseguida en vez de salir a la red
+OFFLINE_API_URL = 'http://127.0.0.1:9/v1beta/models/offline:generateContent'
+
+
+def stages(jobs):
+    """Etapas en orden: (nombre, script, argumentos)"""
+    jobs_args = ('--jobs', str(jobs))
+    return (
+        ('catalogo', 'catalog', ()),
+        ('secciones', 'build_all_sections', jobs_args),
+        ('reparaciones', 'build_repair_pages', jobs_args),
+        ('valvulas', 'build_cambiar_valvula_pages', jobs_args),
+        ('reparaciones (sin cambios)', 'build_repair_pages', jobs_args),
+        ('estilos', 'build_css', ()),
+        ('iconos', 'build_icons', ()),
+        ('reescritura', 'rewrite_site', ()),
+        ('sitemap', 'generate_sitemap', ()),
+        ('enlaces', 'link_checker', jobs_args),
+        ('rutas', 'verificar_rutas', jobs_args),
+    )
+
+
+# Datos sintéticos
+
+def synthetic_brands(count):
+    """Las marcas reales y, si hacen falta más, 'Marca 00043'..."""
+    with open(BRANDS_FILE, 'r', encoding='utf-8') as f:
+        real = json.load(f)
+    return real[:count] + [f"Marca {idx:05d}" for idx in range(len(real) + 1, count + 1)]
+
+
+def synthetic_catalog(brands, models_per_brand):
+    """catalog.json con models_per_brand copias de los modelos reales por marca"""
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        templates = [model for item in json.load(f) for model in item['models']]
+    catalog = []
+    for brand_idx, brand in enumerate(brands):
+        models = []
+        for idx in range(models_per_brand):
+            model = dict(templates[(brand_idx + idx) % len(templates)])
+            model['id'] = f"{model['id']}-{idx + 1}"
+            model['name'] = f"{model['name']} {idx + 1}"
+            models.append(model)
+        if models:
+            catalog.append({'brand': brand, 'models': models})
+    return catalog
+
+
+def sample_fragments():
+    """Un fragmento real por tipo (y por reparación): (tipo, reparación) -> (marca, html)"""
+    samples = {}
+    with ContentStore() as store:
+        for key in store:
+            kind, slug, _, repair = split_key(key)
+            samples.setdefault((kind, repair), (slug, store[key]))
+    # Párrafo propio y bloque técnico de los modelos sintéticos: una introducción real partida en dos
+    if ('model_intro', None) in samples:
+        slug, html = samples[('model_intro', None)]
+        lead, h3, block = html.partition('<h3')
+        samples[('model_lead', None)] = (slug, lead.strip())
+        samples[('spec_block', None)] = (slug, (h3 + block).strip())
+    return samples
+
+
+def brand_name_variants(slug):
+    return (slug.replace('-', ' ').title(), slug.replace('-', ' ').upper(), slug)
+
+
+def write_content_store(path, catalog, samples):
+    """Almacén con todos los fragmentos que piden los generadores; devuelve cuántos"""
+    count = 0
+    with open(path, 'wb') as f:
+        # Sin introducciones completas: los modelos usan el plan por especificaciones
+        for kind in (kind for kind in PROMPT_KINDS if kind != 'model_intro'):
+            for key, (prompt, _) in expected_entries(kind, catalog.names(), catalog).items():
+                kind_name, slug, _, repair = split_key(key)
+                real_slug, html = samples.get((kind_name, repair)) or samples[(kind_name, None)]
+                if slug:
+                    for variant in brand_name_variants(real_slug):
+                        html = html.replace(variant, catalog.by_slug[slug].name)
+                f.write(_record_line(key, html, prompt_fingerprint(prompt)))
+                count += 1
+    return count
+
+
+def make_workspace(root, brand_count, models_per_brand, samples):
+    """Copia del proyecto con datos sintéticos; devuelve cuántos fragmentos tiene el almacén"""
+    for rel in COPY_DIRS:
+        shutil.copytree(BASE_DIR / rel, root / rel, ignore=shutil.ignore_patterns('__pycache__'))
+    for rel in COPY_FILES:
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(BASE_DIR / rel, root / rel)
+
+    brands = synthetic_brands(brand_count)
+    catalog_data = synthetic_catalog(brands, models_per_brand)
+    with open(root / 'data' / 'brands.json', 'w', encoding='utf-8') as f:
+        json.dump(brands, f, ensure_ascii=False, indent=2)
+    with open(root / 'data' / 'catalog.json', 'w', encoding='utf-8') as f:
+        json.dump(catalog_data, f, ensure_ascii=False, indent=2)
+    catalog = validate(brands, catalog_data)
+    count = write_content_store(root / 'data' / 'content_store.jsonl', catalog, samples)
+    # Comprimido con un diccionario entrenado, como el almacén real
+    with ContentStore(root / 'data' / 'content_store.jsonl', root / '.build_cache') as store:
+        store.compact(retrain=True)
+    return count
+
+
+# Mediciones
+
+def snapshot(root):
+    """Ruta -> (tamaño, fecha) de todos los archivos (sin .build_cache)"""
+    files = {}
+    for dirpath, dirnames, names in os.walk(root):
+        if dirpath == str(root):
+            dirnames[:] = [name for name in dirnames if name != '.build_cache']
+        for name in names:
+            st = os.stat(os.path.join(dirpath, name))
+            files[os.path.join(dirpath, name)] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def touched(before, after):
+    changed = sum(1 for path, stat in after.items() if before.get(path) != stat)
+    return changed + sum(1 for path in before if path not in after)
+
+
+def count_pages(root):
+    return sum(1 for _ in (root / 'public').rglob('*.html'))
+
+
+def run_stage(root, script, args, log_path):
+    """Ejecuta una etapa; devuelve (código, segundos, pico de RSS en bytes o None)"""
+    env = dict(os.environ, GEMINI_API_URL=OFFLINE_API_URL, GEMINI_API_KEY='offline',
+               PYTHONIOENCODING='utf-8')
+    start = time.perf_counter()
+    with open(log_path, 'wb') as log:
+        proc = subprocess.Popen([sys.executable, f'scripts/{script}.py', *args], cwd=root, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss: KB en Linux, bytes en macOS
+            rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+        else:
+            proc.wait()
+            rss = None
+    return proc.returncode, time.perf_counter() - start, rss
+
+
+def run_scale(brand_count, models_per_brand, jobs, samples, keep=False):
+    """Ejecuta todas las etapas sobre una escala; devuelve su resultado"""
+    root = Path(tempfile.mkdtemp(prefix=f'bench_{brand_count}_'))
+    pages_per_brand = 1 + models_per_brand + len(REPAIR_TYPES) + 1
+    print(f"\n[*] Escala: {brand_count} marcas x {models_per_brand} modelos "
+          f"(~{brand_count * pages_per_brand:,d} paginas) en {root}")
+    start = time.perf_counter()
+    fragments = make_workspace(root, brand_count, models_per_brand, samples)
+    print(f"[*] Datos sinteticos: {fragments:,d} fragmentos ({time.perf_counter() - start:.1f}s)")
+
+    results = []
+    log_dir = root / '.build_cache' / 'benchmark'
+    log_dir.mkdir(parents=True, exist_ok=True)
+    for idx, (name, script, args) in enumerate(stages(jobs), 1):
+        before = snapshot(root)
+        log_path = log_dir / f'{idx:02d}_{script}.log'
+        code, seconds, rss = run_stage(root, script, args, log_path)
+        pages = count_pages(root)
+        result = {
+            'etapa': name,
+            'segundos': round(seconds, 4),
+            'rss_pico': rss,
+            'archivos_tocados': touched(before, snapshot(root)),
+            'paginas': pages,
+            'paginas_por_segundo': round(pages / seconds, 1) if seconds and script in PAGE_STAGES else None,
+            'codigo': code,
+        }
+        results.append(result)
+        rss_text = f"{rss / 1024 / 1024:7.1f} MB" if rss else '      - '
+        rate = result['paginas_por_segundo']
+        rate_text = f"{rate:>9,.0f} pag/s" if rate is not None else ''
+        error_text = '' if code == 0 else f"  [ERROR] codigo {code}"
+        print(f"    {name:28s} {seconds:8.2f}s  {rss_text}  {result['archivos_tocados']:>8,d} archivos  "
+              f"{rate_text}{error_text}")
+        if code != 0:
+            print(f"[!] Se detiene la escala; salida en {log_path}")
+            break
+
+    if keep:
+        print(f"[*] Copia conservada en {root}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    return {'marcas': brand_count, 'modelos': models_per_brand, 'fragmentos': fragments, 'etapas': results}
+
+
+def best_of(runs):
+    """Mejor tiempo y mayor RSS de varias ejecuciones de la misma escala"""
+    best = runs[0]
+    for stage_idx, stage in enumerate(best['etapas']):
+        same = [run['etapas'][stage_idx] for run in runs if len(run['etapas']) > stage_idx]
+        stage['segundos'] = min(s['segundos'] for s in same)
+        stage['mediana'] = round(statistics.median(s['segundos'] for s in same), 4)
+        rss = [s['rss_pico'] for s in same if s['rss_pico']]
+        stage['rss_pico'] = max(rss) if rss else None
+        if stage['paginas_por_segundo'] is not None:
+            stage['paginas_por_segundo'] = round(stage['paginas'] / stage['segundos'], 1)
+    return best
+
+
+# Referencia
+
+def regressions(results, baseline, threshold):
+    """Etapas más lentas que la referencia: [(escala, etapa, antes, ahora)]"""
+    found = []
+    reference = {(scale['marcas'], scale['modelos'], stage['etapa']): stage['segundos']
+                 for scale in baseline['escalas'] for stage in scale['etapas']}
+    for scale in results['escalas']:
+        for stage in scale['etapas']:
+            before = reference.get((scale['marcas'], scale['modelos'], stage['etapa']))
+            if before is None:
+                continue
+            now = stage['segundos']
+            if now > before * (1 + threshold / 100) and now - before >= MIN_SLOWDOWN:
+                found.append((f"{scale['marcas']}x{scale['modelos']}", stage['etapa'], before, now))
+    return found
+
+
+def write_json(path, data):
+    write_atomic(path, json.dumps(data, ensure_ascii=False, indent=2) + '\n')
+
+
+def option_value(argv, name, default):
+    if name not in argv:
+        return default
+    idx = argv.index(name)
+    return argv[idx + 1] if idx + 1 < len(argv) else default
+
+
+def run_benchmark(brand_counts, models_per_brand, jobs=1, repeat=1, keep=False):
+    """Ejecuta todas las escalas; devuelve los resultados"""
+    print("[*] Benchmark de escala (sin red, datos sinteticos)")
+    print(f"[*] Etapas: {', '.join(name for name, _, _ in stages(jobs))}")
+    samples = sample_fragments()
+    missing = [kind for kind in KINDS if not any(k == kind for k, _ in samples)]
+    if missing:
+        raise ValueError(f"el almacen no tiene fragmentos de: {', '.join(missing)}")
+
+    scales = []
+    for brand_count in brand_counts:
+        runs = [run_scale(brand_count, models_per_brand, jobs, samples, keep) for _ in range(repeat)]
+        scales.append(best_of(runs))
+    return {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'jobs': jobs,
+        'repeticiones': repeat,
+        'escalas': scales,
+    }
+
+
+if __name__ == "__main__":
+    try:
+        brand_counts = [int(value) for value in option_value(sys.argv, "--brands", '').split(',') if value] \
+            or list(DEFAULT_BRANDS)
+        models_per_brand = int(option_value(sys.argv, "--models", DEFAULT_MODELS))
+        jobs = int(option_value(sys.argv, "--jobs", 1))
+        repeat = max(1, int(option_value(sys.argv, "--repeat", 1)))
+        threshold = float(option_value(sys.argv, "--threshold", DEFAULT_THRESHOLD))
+    except ValueError as e:
+        print(f"[ERROR] Opcion invalida: {e}")
+        sys.exit(1)
+    baseline_file = Path(option_value(sys.argv, "--baseline", BASELINE_FILE))
+
+    try:
+        results = run_benchmark(brand_counts, models_per_brand, jobs=jobs, repeat=repeat,
+                                keep="--keep" in sys.argv)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    write_json(RESULTS_FILE, results)
+    print("\n" + "=" * 70)
+    print(f"[OK] Resultados en {RESULTS_FILE}")
+
+    failed = any(stage['codigo'] != 0 for scale in results['escalas'] for stage in scale['etapas'])
+    if "--save-baseline" in sys.argv:
+        write_json(baseline_file, results)
+        print(f"[OK] Referencia guardada en {baseline_file}")
+    elif baseline_file.exists():
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            found = regressions(results, json.load(f), threshold)
+        for scale, stage, before, now in found:
+            print(f"[!] Regresion en {scale} / {stage}: {before:.2f}s -> {now:.2f}s "
+                  f"(+{(now / before - 1) * 100:.0f}%)")
+        print(f"[*] Regresiones (> {threshold:g}% y > {MIN_SLOWDOWN}s): {len(found)}")
+        failed = failed or bool(found)
+    else:
+        print(f"[INFO] Sin referencia: ejecutar con --save-baseline para guardar una en {baseline_file}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,93 @@
+import time
+from pathlib import Path
+
+from catalog import load_catalog
+from publish import SITE_URL
+from template_engine import load_template
+
+# Micro-benchmark: cadena de str.replace() vs motor de plantillas compilado
+BASE_DIR = Path(__file__).parent.parent
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+SYNTHETIC_PAGES = 10000
+REPEATS = 5
+
+def page_values(brand, idx=0):
+    """Valores de una página de modelo (todos los huecos de la plantilla)"""
+    slug = brand.replace(' ', '-').lower()
+    intro = f'<p class="lead">Guía técnica {idx} para calefones <strong>{brand}</strong>.</p>' * 20
+    return {
+        'stylesheetHref': '/assets/css/estilos.css',
+        'pageTitle': f'Calefón {brand} Modelo {idx} - Especificaciones y Reparación',
+        'pageDescription': f'Guía técnica completa del calefón {brand} modelo {idx}.',
+        'currentUrl': f'{SITE_URL}/{slug}/modelos/m-{idx}.html',
+        'h1Title': f'{brand} Modelo {idx}',
+        'subtitle': 'Modelo de 80 litros con resistencia de brida',
+        'brandName': brand,
+        'brandSlug': slug,
+        'currentPageTitle': f'Modelo {idx}',
+        'introContent': intro,
+        'modelListHtml': '',
+        'specResistencia': 'Brida 6 tornillos - 1500W',
+        'specTermostato': 'Varilla ajustable',
+        'specAnodo': 'Rosca 1/2 pulgada',
+        'specHerramientas': 'Llave Allen, Destornillador, Multímetro',
+        'errorTableRows': '<tr><td>E1</td><td>Sobrecalentamiento</td><td>Verificar termostato</td></tr>' * 3,
+        'maintAnodo': 'Anualmente',
+        'maintLimpieza': 'Cada 2 años',
+        'maintValvula': 'Semestralmente',
+        'sparePartsHtml': '<div class="grid">Repuestos</div>' * 5,
+        'extraHead': '',
+    }
+
+def render_replace_chain(source, values):
+    """Render tal como lo hacían los generadores: un str.replace() por hueco"""
+    html = source
+    for name, value in values.items():
+        html = html.replace('{{' + name + '}}', value)
+    return html.replace('id="modelos"', 'id="modelos" style="display:none;"')
+
+def render_engine(template, values):
+    """Render con el motor compilado: un único join"""
+    return template.render(values, hidden=('modelos',))
+
+def time_renders(render, target, pages):
+    """Mejor tiempo de REPEATS pasadas sobre todas las páginas"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for values in pages:
+            render(target, values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark():
+    """Compara ambos métodos con 42 marcas y con 10.000 páginas sintéticas"""
+    template = load_template(TEMPLATES_DIR / 'plantilla_maestra.html')
+    if template is None:
+        print("[ERROR] No se encontro plantilla_maestra.html")
+        return
+
+    brands_list = load_catalog().names()
+    scenarios = [
+        (f"{len(brands_list)} marcas", [page_values(b) for b in brands_list]),
+        (f"{SYNTHETIC_PAGES} paginas", [page_values(brands_list[i % len(brands_list)], i) for i in range(SYNTHETIC_PAGES)]),
+    ]
+
+    print("[*] Benchmark: str.replace() encadenado vs plantilla compilada")
+    print(f"[*] Plantilla: {len(template.source)} bytes, {len(template.slots)} huecos, {len(template.blocks)} bloques")
+    print("=" * 70)
+
+    for label, pages in scenarios:
+        replace_time = time_renders(render_replace_chain, template.source, pages)
+        engine_time = time_renders(render_engine, template, pages)
+        per_page_replace = replace_time / len(pages) * 1e6
+        per_page_engine = engine_time / len(pages) * 1e6
+        print(f"{label:16s} replace: {replace_time * 1000:9.2f} ms ({per_page_replace:7.1f} us/pag)")
+        print(f"{'':16s} motor:   {engine_time * 1000:9.2f} ms ({per_page_engine:7.1f} us/pag)  x{replace_time / engine_time:.1f}")
+
+    print("=" * 70)
+    print(f"[*] Mejor de {REPEATS} pasadas por escenario")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,54 @@
+import re
+
+# Introducción de marca: un solo prompt para todos los generadores
+#
+# build_with_ai.py y build_all_sections.py guardan el mismo fragmento
+# (brand_intro|<marca>), así que tienen que pedirlo con el mismo prompt: si
+# no, la huella guardada nunca coincide con la del otro generador y
+# regenerate.py lo da siempre por desactualizado.
+
+
+def brand_intro_prompt(brand):
+    """Prompt del contenido introductorio de una marca"""
+    prompt = f"""Eres un técnico experto en reparación de calefones eléctricos en Uruguay con 15 años de experiencia. 
+
+Genera SOLO el contenido HTML (SIN etiquetas html, head, body, ni estructura del documento) para la página principal de la marca **{brand}**.
+
+IMPORTANTE: NO incluyas etiquetas <!DOCTYPE>, <html>, <head>, <body>, ni <section>. Solo el contenido directo.
+
+ESTRUCTURA REQUERIDA:
+
+1. **Párrafo introductorio** con clase "lead":
+<p class="lead">... Historia de {brand} en Uruguay, modelos comunes, capacidades típicas (30-100L) ...</p>
+
+2. **Lista de características técnicas** (4-5 puntos):
+<ul class="space-y-2">
+    <li><i class="fas fa-check text-primary mr-2"></i>Tipo de resistencia común</li>
+    <li><i class="fas fa-check text-primary mr-2"></i>Tipo de termostato</li>
+    ...
+</ul>
+
+3. **Párrafo sobre reparaciones**:
+<p>... Fallas comunes, disponibilidad de repuestos, nivel de complejidad ...</p>
+
+FORMATO: Solo HTML limpio, sin ```html, sin markdown, sin estructura de documento.
+LONGITUD: 200-280 palabras.
+IDIOMA: Español de Uruguay."""
+
+    return prompt
+
+
+def clean_brand_intro(content):
+    """Limpia markdown y estructura no deseada de la introducción de marca"""
+    if content:
+        content = content.replace('```html', '').replace('```', '').strip()
+        # Eliminar etiquetas de estructura si las hay
+        content = re.sub(r'<!DOCTYPE[^>]*>', '', content, flags=re.IGNORECASE)
+        content = re.sub(r'</?html[^>]*>', '', content, flags=re.IGNORECASE)
+        content = re.sub(r'<head>.*?</head>', '', content, flags=re.DOTALL | re.IGNORECASE)
+        content = re.sub(r'</?body[^>]*>', '', content, flags=re.IGNORECASE)
+        content = re.sub(r'</?main[^>]*>', '', content, flags=re.IGNORECASE)
+        content = re.sub(r'</?section[^>]*>', '', content, flags=re.IGNORECASE)
+        content = re.sub(r'<style>.*?</style>', '', content, flags=re.DOTALL | re.IGNORECASE)
+        return content.strip()
+    return None
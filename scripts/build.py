@@ -1,15 +1,23 @@
 import os
-import json
 from pathlib import Path
 
+import build_profile
+from build_css import stylesheet_href
+from build_icons import MissingIconsError
+from build_manifest import BuildManifest, generator_version
+from catalog import CatalogError, load_catalog
+from publish import SITE_URL, ensure_staged, output_dir
+from template_engine import load_template
+from link_graph import DanglingLinksError
+
 # Configuración
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / 'data'
 TEMPLATES_DIR = BASE_DIR / 'documentacion'
-PUBLIC_DIR = BASE_DIR / 'public'
+PUBLIC_DIR = output_dir()
 
-BRANDS_FILE = DATA_DIR / 'brands.json'
-CATALOG_FILE = DATA_DIR / 'catalog.json'
+# Versión del generador para el manifiesto incremental
+GENERATOR_VERSION = generator_version(__file__)
 
 # URLs de tienda para repuestos
 STORE_URL = "https://casadelcalefon.uy"
@@ -25,27 +33,9 @@ SPARE_PARTS_URLS = {
     "cable_alimentacion": f"{STORE_URL}/cables-alimentacion"
 }
 
-def load_json(filepath):
-    """Carga un archivo JSON"""
-    if not filepath.exists():
-        return []
-    with open(filepath, 'r', encoding='utf-8-sig') as f:
-        return json.load(f)
-
 def read_template(filename):
-    """Lee un archivo de plantilla HTML"""
-    path = TEMPLATES_DIR / filename
-    if not path.exists():
-        return ""
-    with open(path, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def write_file(path, content):
-    """Escribe contenido en un archivo"""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    """Lee y compila un archivo de plantilla HTML"""
+    return load_template(TEMPLATES_DIR / filename)
 
 def generate_spare_parts_section(specs):
     """Genera una sección de repuestos recomendados con enlaces a la tienda"""
@@ -63,7 +53,7 @@ def generate_spare_parts_section(specs):
     html += '<div class="grid grid-cols-1 md:grid-cols-2 gap-4">'
     
     # Resistencia
-    resistencia_type = specs.get('resistencia', '')
+    resistencia_type = specs.resistencia or ''
     if 'rosca' in resistencia_type.lower():
         url = SPARE_PARTS_URLS['resistencia_rosca']
         icon = 'fa-bolt'
@@ -91,7 +81,7 @@ def generate_spare_parts_section(specs):
     '''
     
     # Termostato
-    termostato_type = specs.get('termostato', '')
+    termostato_type = specs.termostato or ''
     if 'varilla' in termostato_type.lower():
         url = SPARE_PARTS_URLS['termostato_varilla']
         tipo = 'Termostato de Varilla'
@@ -119,7 +109,7 @@ def generate_spare_parts_section(specs):
     '''
     
     # Ánodo
-    anodo_type = specs.get('anodo', 'Estándar')
+    anodo_type = specs.anodo or 'Estándar'
     html += f'''
     <a href="{SPARE_PARTS_URLS['anodo_magnesio']}" target="_blank" class="group bg-white border-2 border-gray-200 rounded-lg p-4 hover:border-green-500 hover:shadow-md transition-all flex items-center">
         <div class="bg-green-100 text-green-600 rounded-full w-12 h-12 flex items-center justify-center mr-4 group-hover:bg-green-500 group-hover:text-white transition-colors">
@@ -167,144 +157,170 @@ def generate_spare_parts_section(specs):
     
     return html
 
-def build_site():
-    """Genera el sitio completo"""
-    print("🚀 Iniciando construcción del sitio...")
-    
-    # Cargar datos
-    brands_list = load_json(BRANDS_FILE)
-    catalog = load_json(CATALOG_FILE)
-    
-    # Indexar catálogo por marca
-    catalog_map = {item['brand']: item for item in catalog}
-    
-    # Cargar plantilla maestra
-    layout_template = read_template('plantilla_maestra.html')
-    
-    if not layout_template:
-        print("❌ Error: No se encontró la plantilla maestra")
-        return
+def render_brand_index(layout_template, brand, models):
+    """Renderiza la página principal de una marca (index.html)"""
+    slug = brand.replace(' ', '-').lower()
     
-    print(f"📦 Procesando {len(brands_list)} marcas...")
-    
-    for brand in brands_list:
-        print(f"   └─ {brand}")
-        slug = brand.replace(' ', '-').lower()
-        brand_dir = PUBLIC_DIR / slug
-        
-        # Datos del catálogo
-        brand_data = catalog_map.get(brand)
-        
-        # Generar HTML de lista de modelos
-        model_list_html = ""
-        if brand_data and brand_data.get('models'):
-            for m in brand_data['models']:
-                model_list_html += f'''
+    # Generar HTML de lista de modelos
+    model_list_html = ""
+    for m in models:
+        model_list_html += f'''
                 <div class="bg-gradient-to-br from-white to-gray-50 border-2 border-gray-200 rounded-xl p-6 hover:border-primary hover:shadow-lg transition-all duration-300 cursor-pointer group">
                     <div class="flex items-center justify-between mb-4">
-                        <h3 class="text-xl font-bold text-gray-800 group-hover:text-primary transition-colors">{m['name']}</h3>
+                        <h3 class="text-xl font-bold text-gray-800 group-hover:text-primary transition-colors">{m.name}</h3>
                         <i class="fas fa-arrow-right text-gray-400 group-hover:text-primary group-hover:translate-x-1 transition-all"></i>
                     </div>
-                    <p class="text-gray-600 text-sm mb-4">{m['description']}</p>
+                    <p class="text-gray-600 text-sm mb-4">{m.description}</p>
                     <div class="flex items-center text-xs text-gray-500">
                         <i class="fas fa-info-circle mr-2"></i>
-                        <a href="./modelos/{m['id']}.html" class="hover:text-primary transition-colors">Ver especificaciones</a>
+                        <a href="./modelos/{m.id}.html" class="hover:text-primary transition-colors">Ver especificaciones</a>
                     </div>
                 </div>
                 '''
-        
-        # Generar página principal de marca (index.html)
-        page_content = f'''
+    
+    page_content = f'''
         <div class="prose prose-lg max-w-none">
             <p class="lead">Encuentra guías técnicas especializadas para la reparación y mantenimiento de calefones eléctricos <strong>{brand}</strong>.</p>
         </div>
         '''
-        
-        final_html = layout_template.replace('{{pageTitle}}', f'Reparación de Calefones {brand} - Guía Técnica Completa')
-        final_html = final_html.replace('{{pageDescription}}', f'Guía completa de reparación para calefones {brand}. Diagnóstico de fallas, reemplazo de resistencias, termostatos y mantenimiento preventivo.')
-        final_html = final_html.replace('{{currentUrl}}', f'https://calefones-landing.pages.dev/{slug}/')
-        final_html = final_html.replace('{{h1Title}}', f'Calefones {brand}')
-        final_html = final_html.replace('{{subtitle}}', 'Reparación profesional y diagnóstico técnico')
-        final_html = final_html.replace('{{brandName}}', brand)
-        final_html = final_html.replace('{{brandSlug}}', slug)
-        final_html = final_html.replace('{{currentPageTitle}}', 'Inicio')
-        final_html = final_html.replace('{{introContent}}', page_content)
-        final_html = final_html.replace('{{modelListHtml}}', model_list_html)
-        final_html = final_html.replace('{{extraHead}}', '')
-        
-        # Ocultar secciones que no aplican en index
-        final_html = final_html.replace('id="specs"', 'id="specs" style="display:none;"')
-        final_html = final_html.replace('id="errores"', 'id="errores" style="display:none;"')
-        final_html = final_html.replace('id="mantenimiento"', 'id="mantenimiento" style="display:none;"')
-        
-        write_file(brand_dir / 'index.html', final_html)
-        
-        # Generar páginas de modelos específicos
-        if brand_data and brand_data.get('models'):
-            for m in brand_data['models']:
-                specs = m.get('specs', {})
-                
-                # Generar sección de repuestos
-                spare_parts_section = generate_spare_parts_section(specs)
-                
-                # Contenido del modelo
-                model_intro = f'''
+    
+    return layout_template.render({
+        'stylesheetHref': stylesheet_href(),
+        'pageTitle': f'Reparación de Calefones {brand} - Guía Técnica Completa',
+        'pageDescription': f'Guía completa de reparación para calefones {brand}. Diagnóstico de fallas, reemplazo de resistencias, termostatos y mantenimiento preventivo.',
+        'currentUrl': f'{SITE_URL}/{slug}/',
+        'h1Title': f'Calefones {brand}',
+        'subtitle': 'Reparación profesional y diagnóstico técnico',
+        'brandName': brand,
+        'brandSlug': slug,
+        'currentPageTitle': 'Inicio',
+        'introContent': page_content,
+        'modelListHtml': model_list_html,
+        'sparePartsHtml': '',
+        'extraHead': '',
+    }, hidden=('specs', 'errores', 'mantenimiento'))  # Secciones que no aplican en index
+
+def render_model_page(layout_template, brand, m):
+    """Renderiza la página de un modelo específico"""
+    slug = brand.replace(' ', '-').lower()
+    specs = m.specs
+    
+    # Generar sección de repuestos
+    spare_parts_section = generate_spare_parts_section(specs)
+    
+    # Contenido del modelo
+    model_intro = f'''
                 <div class="prose prose-lg max-w-none">
-                    <p class="lead">{m['description']}</p>
-                    <p>A continuación encontrarás las especificaciones técnicas completas y los repuestos compatibles para el modelo <strong>{m['name']}</strong> de {brand}.</p>
+                    <p class="lead">{m.description}</p>
+                    <p>A continuación encontrarás las especificaciones técnicas completas y los repuestos compatibles para el modelo <strong>{m.name}</strong> de {brand}.</p>
                 </div>
                 '''
-                
-                # Tabla de errores
-                error_rows = ""
-                for err in m.get('error_codes', []):
-                    error_rows += f'''
+    
+    # Tabla de errores
+    error_rows = ""
+    for err in m.error_codes:
+        error_rows += f'''
                     <tr class="hover:bg-gray-50 transition-colors">
-                        <td class="p-4 font-mono font-bold text-gray-800">{err['code']}</td>
-                        <td class="p-4 text-gray-700">{err['desc']}</td>
-                        <td class="p-4 text-gray-600">{err['sol']}</td>
+                        <td class="p-4 font-mono font-bold text-gray-800">{err.code}</td>
+                        <td class="p-4 text-gray-700">{err.desc}</td>
+                        <td class="p-4 text-gray-600">{err.sol}</td>
                     </tr>
                     '''
-                
-                final_model = layout_template.replace('{{pageTitle}}', f'Calefón {brand} {m["name"]} - Especificaciones y Reparación')
-                final_model = final_model.replace('{{pageDescription}}', f'Guía técnica completa del calefón {brand} {m["name"]}. Especificaciones, códigos de error, repuestos y mantenimiento.')
-                final_model = final_model.replace('{{currentUrl}}', f'https://calefones-landing.pages.dev/{slug}/modelos/{m["id"]}.html')
-                final_model = final_model.replace('{{h1Title}}', f'{brand} {m["name"]}')
-                final_model = final_model.replace('{{subtitle}}', m['description'])
-                final_model = final_model.replace('{{brandName}}', brand)
-                final_model = final_model.replace('{{brandSlug}}', slug)
-                final_model = final_model.replace('{{currentPageTitle}}', m['name'])
-                final_model = final_model.replace('{{introContent}}', model_intro)
-                
-                # Especificaciones
-                final_model = final_model.replace('{{specResistencia}}', specs.get('resistencia', 'N/A'))
-                final_model = final_model.replace('{{specTermostato}}', specs.get('termostato', 'N/A'))
-                final_model = final_model.replace('{{specAnodo}}', specs.get('anodo', 'N/A'))
-                tools_str = ", ".join(specs.get('herramientas', []))
-                final_model = final_model.replace('{{specHerramientas}}', tools_str)
-                
-                # Tabla de errores
-                final_model = final_model.replace('{{errorTableRows}}', error_rows)
-                
-                # Mantenimiento
-                maint = m.get('maintenance', {})
-                final_model = final_model.replace('{{maintAnodo}}', maint.get('anodo', 'Anualmente'))
-                final_model = final_model.replace('{{maintLimpieza}}', maint.get('limpieza', 'Cada 2 años'))
-                final_model = final_model.replace('{{maintValvula}}', maint.get('valvula', 'Semestralmente'))
-                
-                # Insertar sección de repuestos antes del mantenimiento
-                final_model = final_model.replace('<!-- SECCIÓN 7: Plan de Mantenimiento', spare_parts_section + '\n\n        <!-- SECCIÓN 7: Plan de Mantenimiento')
-                
-                # Ocultar selector de modelos en página de modelo
-                final_model = final_model.replace('id="modelos"', 'id="modelos" style="display:none;"')
-                
-                final_model = final_model.replace('{{modelListHtml}}', '')
-                final_model = final_model.replace('{{extraHead}}', '')
-                
-                write_file(brand_dir / 'modelos' / f'{m["id"]}.html', final_model)
     
+    maint = m.maintenance
+    
+    return layout_template.render({
+        'stylesheetHref': stylesheet_href(),
+        'pageTitle': f'Calefón {brand} {m.name} - Especificaciones y Reparación',
+        'pageDescription': f'Guía técnica completa del calefón {brand} {m.name}. Especificaciones, códigos de error, repuestos y mantenimiento.',
+        'currentUrl': f'{SITE_URL}/{slug}/modelos/{m.id}.html',
+        'h1Title': f'{brand} {m.name}',
+        'subtitle': m.description,
+        'brandName': brand,
+        'brandSlug': slug,
+        'currentPageTitle': m.name,
+        'introContent': model_intro,
+        # Especificaciones
+        'specResistencia': specs.resistencia or 'N/A',
+        'specTermostato': specs.termostato or 'N/A',
+        'specAnodo': specs.anodo or 'N/A',
+        'specHerramientas': ", ".join(specs.herramientas),
+        # Tabla de errores
+        'errorTableRows': error_rows,
+        # Mantenimiento
+        'maintAnodo': maint.anodo or 'Anualmente',
+        'maintLimpieza': maint.limpieza or 'Cada 2 años',
+        'maintValvula': maint.valvula or 'Semestralmente',
+        # Sección de repuestos antes del mantenimiento
+        'sparePartsHtml': spare_parts_section,
+        'extraHead': '',
+    }, hidden=('modelos',))  # Sin selector de modelos en página de modelo
+
+def planned_pages():
+    """Páginas que emite build_site() (rutas relativas a public/), sin renderizar"""
+    pages = []
+    for entry in load_catalog():
+        pages.append(f'{entry.slug}/index.html')
+        for m in entry.models:
+            pages.append(f'{entry.slug}/modelos/{m.id}.html')
+    return pages
+
+def build_site(force=False, minify=False):
+    """Genera el sitio completo"""
+    print("🚀 Iniciando construcción del sitio...")
+    
+    # Cargar datos (validados antes de renderizar)
+    build_profile.phase("Carga de catalogo")
+    catalog = load_catalog()
+    
+    # Cargar plantilla maestra
+    layout_template = read_template('plantilla_maestra.html')
+    
+    if not layout_template:
+        print("❌ Error: No se encontró la plantilla maestra")
+        return
+    
+    # Manifiesto incremental: solo se renderizan las páginas cuyas entradas cambiaron
+    manifest = BuildManifest('build', GENERATOR_VERSION, force=force, minify=minify)
+    css_href = stylesheet_href()
+    
+    print(f"📦 Procesando {len(catalog)} marcas...")
+    build_profile.phase("Render de paginas")
+    
+    for entry in catalog:
+        brand = entry.name
+        print(f"   └─ {brand}")
+        brand_dir = PUBLIC_DIR / entry.slug
+        
+        # Generar página principal de marca (index.html)
+        manifest.build(
+            brand_dir / 'index.html',
+            manifest.inputs('index', brand, entry.models, layout_template.digest, css_href),
+            lambda: render_brand_index(layout_template, brand, entry.models),
+        )
+        
+        # Generar páginas de modelos específicos
+        for m in entry.models:
+            manifest.build(
+                brand_dir / 'modelos' / f'{m.id}.html',
+                manifest.inputs('modelo', brand, m, layout_template.digest, css_href),
+                lambda: render_model_page(layout_template, brand, m),
+            )
+    
+    build_profile.phase("Escritura")
+    manifest.save()
+    manifest.print_summary()
     print("✅ Construcción completada exitosamente!")
     print(f"📁 Sitio generado en: {PUBLIC_DIR}")
 
 if __name__ == "__main__":
-    build_site()
+    import sys
+    ensure_staged()
+    
+    try:
+        with build_profile.profiled('build', sys.argv):
+            build_site(force="--force" in sys.argv, minify="--minify" in sys.argv)
+    except (CatalogError, DanglingLinksError, MissingIconsError) as e:
+        # Ninguna página se escribió: corregir el enlace o el ícono (o el generador) y volver a compilar
+        print(f"[ERROR] {e}")
+        sys.exit(1)
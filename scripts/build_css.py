@@ -0,0 +1,712 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from build_fonts import font_face_rules
+from content_store import ContentStore, write_atomic
+from publish import ensure_staged, output_dir
+
+# Hoja de estilos de utilidades generada en la compilación
+#
+#   python scripts/build_css.py [--verbose]
+#
+# Reemplaza al compilador de Tailwind en el navegador (cdn.tailwindcss.com),
+# que descargaba un script grande y generaba el CSS en cada visita. Se leen
+# los atributos class de todas las páginas de public/, de las plantillas y
+# de los fragmentos generados por IA, y se genera solo el CSS de las
+# utilidades de Tailwind (v3) que se usan, precedido por su base
+# (templates/tailwind_base.css). El resultado se escribe una sola vez como
+# public/assets/css/estilos.<hash>.css y todas las páginas lo enlazan.
+#
+# El nombre vigente se guarda en data/stylesheet.json: los generadores lo
+# leen con stylesheet_href() y lo incluyen en el hash de entradas de cada
+# página, así un CSS nuevo re-renderiza solo la etiqueta <link>. Las
+# páginas estáticas (index.html y 404.html) se actualizan aquí mismo.
+#
+# Los colores primary/secondary/accent y la fuente sans dependen del tema
+# (THEMES): las páginas de plantilla_maestra.html usan <html data-tema="marca">
+# y el resto el tema por defecto, con los mismos valores que tenía el
+# tailwind.config de cada página.
+#
+# Las reglas @font-face de Inter salen de data/fonts.json (build_fonts.py):
+# después de generar las fuentes hay que volver a generar la hoja.
+#
+# Las clases que no son utilidades conocidas ni componentes (COMPONENTS),
+# como las clases propias de cada página o restos de fragmentos de IA
+# truncados, se ignoran; --verbose las lista.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+CSS_DIR = PUBLIC_DIR / 'assets' / 'css'
+CSS_URL = '/assets/css'
+STYLESHEET_FILE = BASE_DIR / 'data' / 'stylesheet.json'
+BASE_CSS_FILE = BASE_DIR / 'templates' / 'tailwind_base.css'
+TEMPLATE_DIRS = (BASE_DIR / 'templates', BASE_DIR / 'documentacion')
+STATIC_PAGES = ('index.html', '404.html')
+
+DEFAULT_SANS = ('ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", '
+                '"Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"')
+MONO = 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace'
+
+DEFAULT_THEME = 'sitio'
+THEMES = {
+    # Guías de reparación, portada y 404
+    'sitio': {
+        'primary': '#0066CC',
+        'secondary': '#FF6B35',
+        'accent': '#e63946',
+        'font-sans': DEFAULT_SANS,
+    },
+    # Páginas de marca y de modelo (plantilla_maestra.html)
+    'marca': {
+        'primary': '#0056b3',
+        'secondary': '#004494',
+        'accent': '#e63946',
+        'font-sans': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+    },
+}
+THEME_COLORS = ('primary', 'secondary', 'accent')
+
+# Paleta de Tailwind v3 (familias que usa el sitio)
+SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+PALETTE = {
+    'gray': ('#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827', '#030712'),
+    'red': ('#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d', '#450a0a'),
+    'orange': ('#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c', '#9a3412', '#7c2d12', '#431407'),
+    'yellow': ('#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12', '#422006'),
+    'green': ('#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d', '#052e16'),
+    'cyan': ('#ecfeff', '#cffafe', '#a5f3fc', '#67e8f9', '#22d3ee', '#06b6d4', '#0891b2', '#0e7490', '#155e75', '#164e63', '#083344'),
+    'blue': ('#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a', '#172554'),
+    'indigo': ('#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3', '#312e81', '#1e1b4b'),
+    'purple': ('#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8', '#581c87', '#3b0764'),
+}
+COLORS = {'white': '#ffffff', 'black': '#000000'}
+for _family, _values in PALETTE.items():
+    COLORS.update({f"{_family}-{shade}": value for shade, value in zip(SHADES, _values)})
+
+SPACING = {'0': '0px', 'px': '1px', '0.5': '0.125rem', '1.5': '0.375rem', '2.5': '0.625rem', '3.5': '0.875rem'}
+SPACING.update({str(n): f"{n / 4:g}rem" for n in (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20, 24,
+                                                   28, 32, 36, 40, 44, 48, 52, 56, 60, 64, 72, 80, 96)})
+FRACTIONS = {'1/2': '50%', '1/3': '33.333333%', '2/3': '66.666667%', '1/4': '25%', '3/4': '75%',
+             '1/5': '20%', '1/6': '16.666667%', '5/6': '83.333333%', 'full': '100%'}
+SCREENS = (('sm', '640px'), ('md', '768px'), ('lg', '1024px'), ('xl', '1280px'), ('2xl', '1536px'))
+STATES = (('hover', '{}:hover'), ('focus', '{}:focus'), ('group-hover', '.group:hover {}'))
+
+FONT_SIZES = {'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+              'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+              '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+              '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1')}
+FONT_WEIGHTS = {'thin': '100', 'extralight': '200', 'light': '300', 'normal': '400', 'medium': '500',
+                'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900'}
+MAX_WIDTHS = {'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem', '2xl': '42rem',
+              '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+              'full': '100%', 'none': 'none', 'prose': '65ch'}
+RADII = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+         'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px'}
+SHADOWS = {
+    'sm': ('0 1px 2px 0 rgb(0 0 0 / 0.05)', '0 1px 2px 0 var(--tw-shadow-color)'),
+    '': ('0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+         '0 1px 3px 0 var(--tw-shadow-color), 0 1px 2px -1px var(--tw-shadow-color)'),
+    'md': ('0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+           '0 4px 6px -1px var(--tw-shadow-color), 0 2px 4px -2px var(--tw-shadow-color)'),
+    'lg': ('0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+           '0 10px 15px -3px var(--tw-shadow-color), 0 4px 6px -4px var(--tw-shadow-color)'),
+    'xl': ('0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+           '0 20px 25px -5px var(--tw-shadow-color), 0 8px 10px -6px var(--tw-shadow-color)'),
+    '2xl': ('0 25px 50px -12px rgb(0 0 0 / 0.25)', '0 25px 50px -12px var(--tw-shadow-color)'),
+    'none': ('0 0 #0000', '0 0 #0000'),
+}
+BLURS = {'none': '0', 'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px', 'xl': '24px', '2xl': '40px', '3xl': '64px'}
+DROP_SHADOWS = {'sm': 'drop-shadow(0 1px 1px rgb(0 0 0 / 0.05))',
+                '': 'drop-shadow(0 1px 2px rgb(0 0 0 / 0.1)) drop-shadow(0 1px 1px rgb(0 0 0 / 0.06))',
+                'md': 'drop-shadow(0 4px 3px rgb(0 0 0 / 0.07)) drop-shadow(0 2px 2px rgb(0 0 0 / 0.06))',
+                'lg': 'drop-shadow(0 10px 8px rgb(0 0 0 / 0.04)) drop-shadow(0 4px 3px rgb(0 0 0 / 0.1))'}
+LEADING = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+TRACKING = {'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em', 'wide': '0.025em',
+            'wider': '0.05em', 'widest': '0.1em'}
+GRADIENT_DIRECTIONS = {'t': 'top', 'tr': 'top right', 'r': 'right', 'br': 'bottom right',
+                       'b': 'bottom', 'bl': 'bottom left', 'l': 'left', 'tl': 'top left'}
+BORDER_SIDES = {'': ('border-width',), 'x': ('border-left-width', 'border-right-width'),
+                'y': ('border-top-width', 'border-bottom-width'), 't': ('border-top-width',),
+                'r': ('border-right-width',), 'b': ('border-bottom-width',), 'l': ('border-left-width',)}
+BOX_SIDES = {'': ('',), 'x': ('-left', '-right'), 'y': ('-top', '-bottom'), 't': ('-top',),
+             'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',)}
+SIDE_ORDER = ('', 'x', 'y', 't', 'r', 'b', 'l')
+
+TRANSFORM = ('translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+             'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))')
+FILTER = ('var(--tw-blur) var(--tw-brightness) var(--tw-contrast) var(--tw-grayscale) var(--tw-hue-rotate) '
+          'var(--tw-invert) var(--tw-saturate) var(--tw-sepia) var(--tw-drop-shadow)')
+BACKDROP_FILTER = ('var(--tw-backdrop-blur) var(--tw-backdrop-brightness) var(--tw-backdrop-contrast) '
+                   'var(--tw-backdrop-grayscale) var(--tw-backdrop-hue-rotate) var(--tw-backdrop-invert) '
+                   'var(--tw-backdrop-opacity) var(--tw-backdrop-saturate) var(--tw-backdrop-sepia)')
+TIMING = 'cubic-bezier(0.4, 0, 0.2, 1)'
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, '
+        'transform, filter, -webkit-backdrop-filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+CHILDREN = '{} > :not([hidden]) ~ :not([hidden])'
+
+# Componentes propios del sitio: van antes de las utilidades, que los pisan
+COMPONENTS = {
+    # Ícono del sprite (build_icons.py): alto de una línea de texto, color del texto
+    'icono': 'display:inline-block;height:1em;overflow:visible;vertical-align:-0.125em;fill:currentColor',
+}
+
+# Orden de los plugins de Tailwind: decide qué regla gana entre utilidades
+# de igual especificidad (p. ej. border y border-t-4)
+PLUGIN_ORDER = (
+    'container', 'pointerEvents', 'position', 'inset', 'zIndex', 'gridColumn', 'float', 'margin',
+    'display', 'height', 'maxHeight', 'minHeight', 'width', 'maxWidth', 'flex', 'flexShrink', 'flexGrow',
+    'borderCollapse', 'translate', 'scale', 'transform', 'cursor', 'listStyleType', 'listStylePosition',
+    'gridTemplateColumns', 'flexDirection', 'flexWrap', 'alignItems', 'justifyContent', 'gap', 'space',
+    'divideWidth', 'divideColor', 'overflow', 'whitespace', 'wordBreak', 'borderRadius', 'borderWidth',
+    'borderStyle', 'borderColor', 'backgroundColor', 'backgroundImage', 'gradientColorStops', 'padding',
+    'textAlign', 'fontFamily', 'fontSize', 'fontWeight', 'textTransform', 'fontStyle', 'lineHeight',
+    'letterSpacing', 'textColor', 'textDecoration', 'fontSmoothing', 'opacity', 'boxShadow',
+    'boxShadowColor', 'outline', 'blur', 'dropShadow', 'filter', 'backdropBlur', 'backdropFilter',
+    'transitionProperty', 'transitionDuration', 'transitionTimingFunction',
+)
+
+# Utilidades de valor fijo, por plugin: clase -> declaraciones
+STATIC_GROUPS = {
+    'pointerEvents': {'pointer-events-none': 'pointer-events:none', 'pointer-events-auto': 'pointer-events:auto'},
+    'position': {'static': 'position:static', 'fixed': 'position:fixed', 'absolute': 'position:absolute',
+                 'relative': 'position:relative', 'sticky': 'position:sticky'},
+    'float': {'float-right': 'float:right', 'float-left': 'float:left', 'float-none': 'float:none'},
+    'margin': {'mx-auto': 'margin-left:auto;margin-right:auto', 'my-auto': 'margin-top:auto;margin-bottom:auto',
+               'ml-auto': 'margin-left:auto', 'mr-auto': 'margin-right:auto'},
+    'display': {'block': 'display:block', 'inline-block': 'display:inline-block', 'inline': 'display:inline',
+                'flex': 'display:flex', 'inline-flex': 'display:inline-flex', 'table': 'display:table',
+                'grid': 'display:grid', 'inline-grid': 'display:inline-grid', 'contents': 'display:contents',
+                'hidden': 'display:none'},
+    'height': {'h-full': 'height:100%', 'h-screen': 'height:100vh', 'h-auto': 'height:auto'},
+    'minHeight': {'min-h-screen': 'min-height:100vh', 'min-h-full': 'min-height:100%'},
+    'width': {'w-full': 'width:100%', 'w-screen': 'width:100vw', 'w-auto': 'width:auto'},
+    'flex': {'flex-1': 'flex:1 1 0%', 'flex-auto': 'flex:1 1 auto', 'flex-none': 'flex:none'},
+    'flexShrink': {'flex-shrink-0': 'flex-shrink:0', 'shrink-0': 'flex-shrink:0'},
+    'flexGrow': {'flex-grow': 'flex-grow:1', 'grow': 'flex-grow:1'},
+    'borderCollapse': {'border-collapse': 'border-collapse:collapse', 'border-separate': 'border-collapse:separate'},
+    'transform': {'transform': f'transform:{TRANSFORM}'},
+    'cursor': {'cursor-pointer': 'cursor:pointer', 'cursor-default': 'cursor:default'},
+    'listStyleType': {'list-disc': 'list-style-type:disc', 'list-decimal': 'list-style-type:decimal',
+                      'list-none': 'list-style-type:none'},
+    'listStylePosition': {'list-inside': 'list-style-position:inside', 'list-outside': 'list-style-position:outside'},
+    'flexDirection': {'flex-row': 'flex-direction:row', 'flex-col': 'flex-direction:column'},
+    'flexWrap': {'flex-wrap': 'flex-wrap:wrap', 'flex-nowrap': 'flex-wrap:nowrap'},
+    'alignItems': {'items-start': 'align-items:flex-start', 'items-end': 'align-items:flex-end',
+                   'items-center': 'align-items:center', 'items-baseline': 'align-items:baseline',
+                   'items-stretch': 'align-items:stretch'},
+    'justifyContent': {'justify-start': 'justify-content:flex-start', 'justify-end': 'justify-content:flex-end',
+                       'justify-center': 'justify-content:center', 'justify-between': 'justify-content:space-between',
+                       'justify-around': 'justify-content:space-around'},
+    'overflow': {'overflow-auto': 'overflow:auto', 'overflow-hidden': 'overflow:hidden',
+                 'overflow-visible': 'overflow:visible', 'overflow-x-auto': 'overflow-x:auto',
+                 'overflow-y-auto': 'overflow-y:auto'},
+    'whitespace': {'whitespace-nowrap': 'white-space:nowrap', 'whitespace-normal': 'white-space:normal'},
+    'wordBreak': {'break-words': 'overflow-wrap:break-word'},
+    'borderStyle': {'border-solid': 'border-style:solid', 'border-dashed': 'border-style:dashed',
+                    'border-none': 'border-style:none'},
+    'backgroundColor': {'bg-transparent': 'background-color:transparent', 'bg-current': 'background-color:currentColor'},
+    'textAlign': {'text-left': 'text-align:left', 'text-center': 'text-align:center',
+                  'text-right': 'text-align:right', 'text-justify': 'text-align:justify'},
+    'fontFamily': {'font-sans': 'font-family:var(--tema-font-sans)', 'font-mono': f'font-family:{MONO}'},
+    'textTransform': {'uppercase': 'text-transform:uppercase', 'lowercase': 'text-transform:lowercase',
+                      'capitalize': 'text-transform:capitalize', 'normal-case': 'text-transform:none'},
+    'fontStyle': {'italic': 'font-style:italic', 'not-italic': 'font-style:normal'},
+    'textColor': {'text-transparent': 'color:transparent', 'text-current': 'color:currentColor'},
+    'textDecoration': {'underline': 'text-decoration-line:underline', 'no-underline': 'text-decoration-line:none',
+                       'line-through': 'text-decoration-line:line-through'},
+    'fontSmoothing': {'antialiased': '-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale'},
+    'outline': {'outline-none': 'outline:2px solid transparent;outline-offset:2px'},
+    'filter': {'filter': f'filter:{FILTER}'},
+    'backdropFilter': {'backdrop-filter': f'-webkit-backdrop-filter:{BACKDROP_FILTER};backdrop-filter:{BACKDROP_FILTER}'},
+    'transitionTimingFunction': {'ease-in': 'transition-timing-function:cubic-bezier(0.4, 0, 1, 1)',
+                                 'ease-out': 'transition-timing-function:cubic-bezier(0, 0, 0.2, 1)',
+                                 'ease-in-out': f'transition-timing-function:{TIMING}'},
+}
+STATIC = {name: (plugin, decl) for plugin, group in STATIC_GROUPS.items() for name, decl in group.items()}
+
+CLASS_ATTR_RE = re.compile(r'''\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+
+
+class Utility:
+    """Regla CSS de una utilidad (sin variantes)"""
+
+    __slots__ = ('plugin', 'sub', 'declarations', 'selector')
+
+    def __init__(self, plugin, declarations, sub=0, selector='{}'):
+        self.plugin = PLUGIN_ORDER.index(plugin)
+        self.sub = sub
+        self.declarations = declarations
+        self.selector = selector
+
+
+def hex_to_rgb(value):
+    value = value.lstrip('#')
+    return ' '.join(str(int(value[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+def color_value(name, alpha=None):
+    """Valor CSS de un color de la paleta o del tema, con opacidad opcional (/10)"""
+    if name in THEME_COLORS:
+        channels = f"var(--tema-{name})"
+    elif name in COLORS:
+        if alpha is None:
+            return COLORS[name]
+        channels = hex_to_rgb(COLORS[name])
+    else:
+        return None
+    if alpha is None:
+        return f"rgb({channels})"
+    return f"rgb({channels} / {alpha})"
+
+
+def parse_color(spec):
+    """'red-500/30' -> (valor, valor transparente) o None"""
+    name, _, opacity = spec.partition('/')
+    alpha = None
+    if opacity:
+        if not opacity.isdigit():
+            return None
+        alpha = f"{int(opacity) / 100:g}"
+    value = color_value(name, alpha)
+    if value is None:
+        return None
+    return value, color_value(name, '0')
+
+
+def spacing(key, negative=False, fractions=False):
+    value = SPACING.get(key)
+    if value is None and fractions:
+        value = FRACTIONS.get(key)
+    if value is None:
+        return None
+    if negative:
+        return '0px' if value == '0px' else f"-{value}"
+    return value
+
+
+def resolve(name):
+    """Utility de una clase sin variantes, o None si no es una utilidad conocida"""
+    negative = name.startswith('-')
+    base = name[1:] if negative else name
+
+    if name == 'container':
+        return Utility('container', 'width:100%')
+    if not negative and name in STATIC:
+        return Utility(*STATIC[name])
+
+    m = re.fullmatch(r'(m|p)([xytrbl]?)-(.+)', base)
+    if m:
+        kind, side, key = m.groups()
+        value = spacing(key, negative)
+        if value is None or (negative and kind == 'p'):
+            return None
+        prop = 'margin' if kind == 'm' else 'padding'
+        decl = ';'.join(f"{prop}{suffix}:{value}" for suffix in BOX_SIDES[side])
+        return Utility('margin' if kind == 'm' else 'padding', decl, SIDE_ORDER.index(side))
+
+    m = re.fullmatch(r'(inset|inset-x|inset-y|top|right|bottom|left)-(.+)', base)
+    if m:
+        prop, key = m.groups()
+        value = spacing(key, negative, fractions=True)
+        if value is None:
+            return None
+        props = {'inset-x': ('left', 'right'), 'inset-y': ('top', 'bottom')}.get(prop, (prop,))
+        sub = ('inset', 'inset-x', 'inset-y', 'top', 'right', 'bottom', 'left').index(prop)
+        return Utility('inset', ';'.join(f"{p}:{value}" for p in props), sub)
+
+    m = re.fullmatch(r'translate-([xy])-(.+)', base)
+    if m:
+        axis, key = m.groups()
+        value = spacing(key, negative, fractions=True)
+        if value is None:
+            return None
+        return Utility('translate', f"--tw-translate-{axis}:{value};transform:{TRANSFORM}", 'xy'.index(axis))
+
+    if negative:
+        return None
+
+    m = re.fullmatch(r'z-(\d+|auto)', name)
+    if m:
+        return Utility('zIndex', f"z-index:{m.group(1)}")
+
+    m = re.fullmatch(r'col-span-(\d+|full)', name)
+    if m:
+        span = m.group(1)
+        value = '1 / -1' if span == 'full' else f"span {span} / span {span}"
+        return Utility('gridColumn', f"grid-column:{value}")
+
+    m = re.fullmatch(r'grid-cols-(\d+)', name)
+    if m:
+        return Utility('gridTemplateColumns', f"grid-template-columns:repeat({m.group(1)}, minmax(0, 1fr))")
+
+    m = re.fullmatch(r'(w|h)-(.+)', name)
+    if m:
+        kind, key = m.groups()
+        value = spacing(key, fractions=True)
+        if value is None:
+            return None
+        return Utility('width' if kind == 'w' else 'height', f"{'width' if kind == 'w' else 'height'}:{value}")
+
+    m = re.fullmatch(r'max-w-(.+)', name)
+    if m and m.group(1) in MAX_WIDTHS:
+        return Utility('maxWidth', f"max-width:{MAX_WIDTHS[m.group(1)]}")
+
+    m = re.fullmatch(r'max-h-(.+)', name)
+    if m:
+        value = {'full': '100%', 'screen': '100vh'}.get(m.group(1)) or spacing(m.group(1))
+        return Utility('maxHeight', f"max-height:{value}") if value else None
+
+    m = re.fullmatch(r'scale-(\d+)', name)
+    if m:
+        value = f"{int(m.group(1)) / 100:g}"
+        return Utility('scale', f"--tw-scale-x:{value};--tw-scale-y:{value};transform:{TRANSFORM}")
+
+    m = re.fullmatch(r'gap-([xy]-)?(.+)', name)
+    if m:
+        axis, key = m.groups()
+        value = spacing(key)
+        if value is None:
+            return None
+        prop = {'x-': 'column-gap', 'y-': 'row-gap'}.get(axis, 'gap')
+        return Utility('gap', f"{prop}:{value}", 0 if axis is None else 1)
+
+    m = re.fullmatch(r'space-([xy])-(.+)', name)
+    if m:
+        axis, key = m.groups()
+        value = spacing(key)
+        if value is None:
+            return None
+        first, second = ('right', 'left') if axis == 'x' else ('bottom', 'top')
+        decl = (f"--tw-space-{axis}-reverse:0;margin-{first}:calc({value} * var(--tw-space-{axis}-reverse));"
+                f"margin-{second}:calc({value} * calc(1 - var(--tw-space-{axis}-reverse)))")
+        return Utility('space', decl, 'xy'.index(axis), CHILDREN)
+
+    m = re.fullmatch(r'divide-([xy])(?:-(\d+))?', name)
+    if m:
+        axis, width = m.group(1), f"{m.group(2) or 1}px"
+        first, second = ('right', 'left') if axis == 'x' else ('bottom', 'top')
+        decl = (f"--tw-divide-{axis}-reverse:0;border-{first}-width:calc({width} * var(--tw-divide-{axis}-reverse));"
+                f"border-{second}-width:calc({width} * calc(1 - var(--tw-divide-{axis}-reverse)))")
+        return Utility('divideWidth', decl, 'xy'.index(axis), CHILDREN)
+
+    m = re.fullmatch(r'divide-(.+)', name)
+    if m:
+        color = parse_color(m.group(1))
+        return Utility('divideColor', f"border-color:{color[0]}", selector=CHILDREN) if color else None
+
+    m = re.fullmatch(r'rounded(?:-(.+))?', name)
+    if m:
+        key = m.group(1) or ''
+        return Utility('borderRadius', f"border-radius:{RADII[key]}") if key in RADII else None
+
+    m = re.fullmatch(r'border(?:-([xytrbl]))?(?:-(\d+))?', name)
+    if m:
+        side, width = m.group(1) or '', m.group(2) or '1'
+        decl = ';'.join(f"{prop}:{width}px" for prop in BORDER_SIDES[side])
+        return Utility('borderWidth', decl, SIDE_ORDER.index(side))
+
+    m = re.fullmatch(r'border-(.+)', name)
+    if m:
+        color = parse_color(m.group(1))
+        return Utility('borderColor', f"border-color:{color[0]}") if color else None
+
+    m = re.fullmatch(r'bg-\[url\(([\'"]?)[^\'"()\s]+\1\)\]', name)
+    if m:
+        # Valor arbitrario: bg-[url('...')]
+        return Utility('backgroundImage', f"background-image:{name[4:-1]}")
+
+    m = re.fullmatch(r'bg-gradient-to-(\w+)', name)
+    if m and m.group(1) in GRADIENT_DIRECTIONS:
+        return Utility('backgroundImage',
+                       f"background-image:linear-gradient(to {GRADIENT_DIRECTIONS[m.group(1)]}, var(--tw-gradient-stops))")
+
+    m = re.fullmatch(r'bg-(.+)', name)
+    if m:
+        color = parse_color(m.group(1))
+        return Utility('backgroundColor', f"background-color:{color[0]}") if color else None
+
+    m = re.fullmatch(r'(from|via|to)-(.+)', name)
+    if m:
+        stop, color = m.group(1), parse_color(m.group(2))
+        if not color:
+            return None
+        if stop == 'from':
+            decl = (f"--tw-gradient-from:{color[0]} var(--tw-gradient-from-position);"
+                    f"--tw-gradient-to:{color[1]} var(--tw-gradient-to-position);"
+                    "--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to)")
+        elif stop == 'via':
+            decl = (f"--tw-gradient-to:{color[1]} var(--tw-gradient-to-position);"
+                    f"--tw-gradient-stops:var(--tw-gradient-from), {color[0]} var(--tw-gradient-via-position), "
+                    "var(--tw-gradient-to)")
+        else:
+            decl = f"--tw-gradient-to:{color[0]} var(--tw-gradient-to-position)"
+        return Utility('gradientColorStops', decl, ('from', 'via', 'to').index(stop))
+
+    m = re.fullmatch(r'text-(.+)', name)
+    if m:
+        key = m.group(1)
+        if key in FONT_SIZES:
+            size, line = FONT_SIZES[key]
+            return Utility('fontSize', f"font-size:{size};line-height:{line}")
+        color = parse_color(key)
+        return Utility('textColor', f"color:{color[0]}") if color else None
+
+    m = re.fullmatch(r'font-(\w+)', name)
+    if m and m.group(1) in FONT_WEIGHTS:
+        return Utility('fontWeight', f"font-weight:{FONT_WEIGHTS[m.group(1)]}")
+
+    m = re.fullmatch(r'leading-(.+)', name)
+    if m:
+        value = LEADING.get(m.group(1)) or (spacing(m.group(1)) if m.group(1).isdigit() else None)
+        return Utility('lineHeight', f"line-height:{value}") if value else None
+
+    m = re.fullmatch(r'tracking-(\w+)', name)
+    if m and m.group(1) in TRACKING:
+        return Utility('letterSpacing', f"letter-spacing:{TRACKING[m.group(1)]}")
+
+    m = re.fullmatch(r'opacity-(\d+)', name)
+    if m and int(m.group(1)) <= 100:
+        return Utility('opacity', f"opacity:{int(m.group(1)) / 100:g}")
+
+    m = re.fullmatch(r'shadow(?:-(.+))?', name)
+    if m:
+        key = m.group(1) or ''
+        if key in SHADOWS:
+            shadow, colored = SHADOWS[key]
+            return Utility('boxShadow', f"--tw-shadow:{shadow};--tw-shadow-colored:{colored};"
+                                        "box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), "
+                                        "var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)")
+        color = parse_color(key)
+        if color:
+            return Utility('boxShadowColor', f"--tw-shadow-color:{color[0]};--tw-shadow:var(--tw-shadow-colored)")
+        return None
+
+    m = re.fullmatch(r'(backdrop-)?blur(?:-(.+))?', name)
+    if m and (m.group(2) or '') in BLURS:
+        value = BLURS[m.group(2) or '']
+        if m.group(1):
+            return Utility('backdropBlur', f"--tw-backdrop-blur:blur({value});"
+                                           f"-webkit-backdrop-filter:{BACKDROP_FILTER};backdrop-filter:{BACKDROP_FILTER}")
+        return Utility('blur', f"--tw-blur:blur({value});filter:{FILTER}")
+
+    m = re.fullmatch(r'drop-shadow(?:-(.+))?', name)
+    if m and (m.group(1) or '') in DROP_SHADOWS:
+        return Utility('dropShadow', f"--tw-drop-shadow:{DROP_SHADOWS[m.group(1) or '']};filter:{FILTER}")
+
+    m = re.fullmatch(r'transition(?:-(\w+))?', name)
+    if m and (m.group(1) or '') in TRANSITIONS:
+        return Utility('transitionProperty', f"transition-property:{TRANSITIONS[m.group(1) or '']};"
+                                             f"transition-timing-function:{TIMING};transition-duration:150ms")
+
+    m = re.fullmatch(r'duration-(\d+)', name)
+    if m:
+        return Utility('transitionDuration', f"transition-duration:{m.group(1)}ms")
+
+    return None
+
+
+def css_escape(name):
+    """Nombre de clase como selector CSS (hover:bg-white/10 -> hover\\:bg-white\\/10)"""
+    escaped = re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+    if name[0].isdigit():
+        escaped = f"\\3{name[0]} {escaped[1:]}"
+    return escaped
+
+
+def parse_class(name):
+    """(pantalla, estado, Utility) de una clase con variantes, o None"""
+    # Los ':' dentro de un valor arbitrario [...] no separan variantes
+    prefix, bracket, rest = name.partition('[')
+    *variants, utility_name = prefix.split(':')
+    utility_name += bracket + rest
+    if not utility_name:
+        return None
+    screen = state = None
+    screens = dict(SCREENS)
+    states = dict(STATES)
+    for variant in variants:
+        if variant in screens and screen is None and state is None:
+            screen = variant
+        elif variant in states and state is None:
+            state = variant
+        else:
+            return None
+    utility = resolve(utility_name)
+    if utility is None:
+        return None
+    return screen, state, utility
+
+
+def theme_rules():
+    """Variables de color y fuente de cada tema"""
+    rules = []
+    for theme, values in THEMES.items():
+        selector = ':root' if theme == DEFAULT_THEME else f'[data-tema="{theme}"]'
+        decls = [f"--tema-{color}:{hex_to_rgb(values[color])}" for color in THEME_COLORS]
+        decls.append(f"--tema-font-sans:{values['font-sans']}")
+        rules.append(f"{selector}{{{';'.join(decls)}}}")
+    return rules
+
+
+def container_rules():
+    return [f"@media (min-width:{width}){{.container{{max-width:{width}}}}}" for _, width in SCREENS]
+
+
+def generate_css(classes):
+    """CSS de las clases usadas; devuelve (css, clases sin regla)"""
+    screen_names = [name for name, _ in SCREENS]
+    state_names = [name for name, _ in STATES]
+    rules = []
+    unknown = []
+    for name in classes:
+        if name in COMPONENTS:
+            continue
+        parsed = parse_class(name)
+        if parsed is None:
+            unknown.append(name)
+            continue
+        screen, state, utility = parsed
+        selector = utility.selector.format('.' + css_escape(name))
+        if state:
+            pattern = dict(STATES)[state]
+            # El estado va sobre la clase, antes del combinador de hijos
+            cls = '.' + css_escape(name)
+            selector = selector.replace(cls, pattern.format(cls), 1)
+        order = (screen_names.index(screen) + 1 if screen else 0,
+                 state_names.index(state) + 1 if state else 0,
+                 utility.plugin, utility.sub, name)
+        rules.append((order, screen, f"{selector}{{{utility.declarations}}}"))
+    rules.sort(key=lambda rule: rule[0])
+
+    out = ["/* Generado por scripts/build_css.py a partir de las clases usadas: no editar */"]
+    with open(BASE_CSS_FILE, 'r', encoding='utf-8') as f:
+        out.append(f.read().strip())
+    out.extend(font_face_rules())
+    out.extend(theme_rules())
+    out.extend(f".{name}{{{COMPONENTS[name]}}}" for name in COMPONENTS if name in classes)
+    container = 'container' in classes
+    current_screen = None
+    block = []
+
+    def close_block():
+        if block:
+            width = dict(SCREENS)[current_screen]
+            out.append(f"@media (min-width:{width}){{{''.join(block)}}}")
+            block.clear()
+
+    for order, screen, rule in rules:
+        if screen is None:
+            out.append(rule)
+            if container and rule.startswith('.container{'):
+                out.extend(container_rules())
+            continue
+        if screen != current_screen:
+            close_block()
+            current_screen = screen
+        block.append(rule)
+    close_block()
+    return '\n'.join(out) + '\n', unknown
+
+
+def html_classes(text):
+    """Clases de los atributos class de un HTML"""
+    classes = set()
+    for match in CLASS_ATTR_RE.finditer(text):
+        classes.update((match.group(1) if match.group(1) is not None else match.group(2)).split())
+    return classes
+
+
+def collect_classes(public_dir=PUBLIC_DIR):
+    """Clases usadas en public/, en las plantillas y en los fragmentos de IA"""
+    classes = set()
+    for root, dirs, names in os.walk(public_dir):
+        for name in names:
+            if name.endswith('.html'):
+                with open(Path(root) / name, 'r', encoding='utf-8', errors='replace') as f:
+                    classes |= html_classes(f.read())
+    for template_dir in TEMPLATE_DIRS:
+        for path in template_dir.glob('*.html'):
+            classes |= html_classes(path.read_text(encoding='utf-8'))
+    with ContentStore() as store:
+        for key in store:
+            classes |= html_classes(store[key])
+    return classes
+
+
+def stylesheet_href():
+    """URL de la hoja de estilos vigente (la que enlazan las páginas)"""
+    try:
+        with open(STYLESHEET_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)['href']
+    except FileNotFoundError:
+        return f"{CSS_URL}/estilos.css"
+
+
+def stylesheet_link():
+    """Etiqueta <link> de la hoja de estilos para las cabeceras de las páginas"""
+    return f'<link rel="stylesheet" href="{stylesheet_href()}">'
+
+
+def update_static_pages(href, public_dir=PUBLIC_DIR):
+    """Apunta las páginas escritas a mano a la hoja de estilos nueva"""
+    pattern = re.compile(re.escape(CSS_URL) + r'/estilos(?:\.[0-9a-f]+)?\.css')
+    updated = 0
+    for name in STATIC_PAGES:
+        path = public_dir / name
+        if not path.exists():
+            continue
+        content = path.read_text(encoding='utf-8')
+        new_content = pattern.sub(href, content)
+        if new_content != content:
+            write_atomic(path, new_content)
+            updated += 1
+    return updated
+
+
+def build_css(verbose=False):
+    """Genera la hoja de estilos; devuelve su URL"""
+    print("[*] Generando hoja de estilos de utilidades...")
+    classes = collect_classes()
+    css, unknown = generate_css(sorted(classes))
+    digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]
+    filename = f"estilos.{digest}.css"
+    href = f"{CSS_URL}/{filename}"
+
+    CSS_DIR.mkdir(parents=True, exist_ok=True)
+    path = CSS_DIR / filename
+    if not path.exists():
+        write_atomic(path, css)
+    for old in CSS_DIR.glob('estilos.*.css'):
+        if old.name != filename:
+            old.unlink()
+
+    previous = stylesheet_href()
+    if previous != href:
+        write_atomic(STYLESHEET_FILE, json.dumps({'href': href}, indent=2) + '\n')
+    updated = update_static_pages(href)
+
+    print(f"[OK] {href} ({len(css.encode('utf-8')):,d} bytes, {len(classes) - len(unknown)} utilidades)")
+    print(f"[*] Clases sin regla (no son utilidades): {len(unknown)}")
+    if verbose:
+        print("    " + ' '.join(unknown))
+    if updated:
+        print(f"[OK] Paginas estaticas actualizadas: {updated}")
+    if previous != href:
+        print("[INFO] La hoja cambio: volver a ejecutar los generadores para actualizar el <link> de las paginas")
+    return href
+
+
+if __name__ == "__main__":
+    ensure_staged()
+    build_css(verbose="--verbose" in sys.argv)
@@ -0,0 +1,290 @@
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from collections import Counter
+from html.parser import HTMLParser
+from pathlib import Path
+
+from content_store import ContentStore, write_atomic
+from publish import ensure_staged, output_dir
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    from fontTools.varLib import instancer
+except ImportError:  # solo hace falta para generar las fuentes
+    TTFont = None
+
+# Fuente Inter propia, recortada a lo que usa el sitio
+#
+#   python scripts/build_fonts.py          (requiere: pip install fonttools brotli)
+#
+# Las guías de reparación y la portada cargaban Inter en 5-6 pesos desde
+# fonts.googleapis.com: una conexión más (DNS + TLS) y una hoja de estilos
+# intermedia antes de poder mostrar el texto. Ahora las fuentes se sirven
+# desde el propio sitio:
+#
+# - se leen las páginas que usan Inter (font-family: 'Inter' en su <style>)
+#   y se anotan los pesos que usan (font-bold, <strong>, font-weight: 600...)
+#   y los caracteres de su texto; a los caracteres se suman los de los
+#   fragmentos de IA del almacén y un juego base (ASCII y letras del
+#   español), así una página nueva no queda con glifos de otra fuente
+# - de vendor/inter/Inter.var.ttf (Inter 3.19, licencia OFL) se genera un
+#   WOFF2 estático por peso, solo con esos caracteres:
+#   public/assets/fonts/inter-<peso>.<hash>.woff2
+# - las reglas @font-face (con font-display: swap y unicode-range) van en
+#   la hoja de estilos (build_css.py), y los pesos de más páginas se precargan
+#   con <link rel="preload"> en la cabecera de las páginas que usan Inter
+#   (font_preload_links(); index.html se actualiza aquí mismo)
+#
+# El resultado se anota en data/fonts.json junto con el hash de sus
+# entradas: si no cambió ni el texto ni los pesos, no se regenera nada.
+# Las páginas de plantilla_maestra.html usan la fuente del sistema
+# (data-tema="marca") y no cargan Inter.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+SOURCE_FONT = BASE_DIR / 'vendor' / 'inter' / 'Inter.var.ttf'
+FONTS_DIR = PUBLIC_DIR / 'assets' / 'fonts'
+FONTS_URL = '/assets/fonts'
+FONTS_FILE = BASE_DIR / 'data' / 'fonts.json'
+STATIC_PAGES = ('index.html', '404.html')
+FAMILY = 'Inter'
+PRELOAD_COUNT = 2  # pesos precargados: los usados en más páginas
+
+# Caracteres que siempre se incluyen
+BASE_CHARS = (''.join(chr(c) for c in range(0x20, 0x7f))
+              + ' ¡¿«»°ºª·–—‘’“”…€•'
+              + 'áéíóúüñÁÉÍÓÚÜÑ')
+
+WEIGHT_CLASSES = {'font-thin': 100, 'font-extralight': 200, 'font-light': 300, 'font-normal': 400,
+                  'font-medium': 500, 'font-semibold': 600, 'font-bold': 700, 'font-extrabold': 800,
+                  'font-black': 900}
+BOLD_TAGS = ('strong', 'b', 'th')
+TEXT_ATTRS = ('alt', 'title', 'placeholder', 'aria-label', 'value')
+INTER_RE = re.compile(r'''font-family:\s*['"]?Inter\b''')
+CSS_WEIGHT_RE = re.compile(r'font-weight:\s*(\d{3}|bold)')
+# Bloque de fuentes de las páginas estáticas: el de Google Fonts o el propio
+FONTS_BLOCK_RE = re.compile(r'''[ \t]*<!-- Google Fonts -->\n[ \t]*<link href="https://fonts\.googleapis\.com/[^"]*" rel="stylesheet">\n'''
+                            r'''|[ \t]*<!-- Fuentes \(scripts/build_fonts\.py\) -->\n(?:[ \t]*<link rel="preload" [^>]*>\n)*''')
+
+
+class PageText(HTMLParser):
+    """Caracteres y pesos de letra de una página"""
+
+    def __init__(self, chars, weights):
+        super().__init__(convert_charrefs=True)
+        self.chars = chars
+        self.weights = weights
+        self.skip = 0  # dentro de <style> o de JSON-LD
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'style' or (tag == 'script' and attrs.get('type') == 'application/ld+json'):
+            self.skip += 1
+            return
+        for name in TEXT_ATTRS:
+            if attrs.get(name):
+                self.chars.update(attrs[name])
+        for cls in (attrs.get('class') or '').split():
+            weight = WEIGHT_CLASSES.get(cls.rsplit(':', 1)[-1])
+            if weight:
+                self.weights[weight] += 1
+        if tag in BOLD_TAGS:
+            self.weights[700] += 1
+
+    def handle_endtag(self, tag):
+        if tag in ('style', 'script') and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if self.skip:
+            for match in CSS_WEIGHT_RE.finditer(data):
+                value = match.group(1)
+                self.weights[700 if value == 'bold' else int(value)] += 1
+        else:
+            self.chars.update(data)
+
+
+def collect_usage(public_dir=PUBLIC_DIR):
+    """(caracteres, pesos -> páginas que los usan, páginas) de las páginas que usan Inter"""
+    chars = Counter(BASE_CHARS)
+    weights = Counter({400: 1})
+    pages = 0
+    for root, dirs, names in os.walk(public_dir):
+        for name in names:
+            if not name.endswith('.html'):
+                continue
+            with open(Path(root) / name, 'r', encoding='utf-8', errors='replace') as f:
+                html = f.read()
+            if not INTER_RE.search(html):
+                continue
+            pages += 1
+            page_weights = Counter({400: 1})  # el texto normal
+            parser = PageText(chars, page_weights)
+            parser.feed(html)
+            parser.close()
+            weights.update(set(page_weights))
+    with ContentStore() as store:
+        for key in store:
+            parser = PageText(chars, Counter())
+            parser.feed(store[key])
+            parser.close()
+    codepoints = {ord(c) for c in chars if c.isprintable() or c == ' '}
+    return codepoints, weights, pages
+
+
+def unicode_range(codepoints):
+    """'U+20-7E,U+A1,...' a partir de un conjunto de códigos"""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ','.join(f"U+{a:X}" if a == b else f"U+{a:X}-{b:X}" for a, b in ranges)
+
+
+def instance(weight):
+    """Inter estática en un peso (sin inclinación)"""
+    font = TTFont(SOURCE_FONT, recalcTimestamp=False)  # mismo archivo en cada compilación
+    return instancer.instantiateVariableFont(font, {'wght': weight, 'slnt': 0})
+
+
+def woff2_bytes(font, codepoints=None):
+    """WOFF2 de una fuente, recortada a los códigos dados (o completa)"""
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.hinting = False
+    options.name_IDs = [0, 1, 2, 3, 4, 5, 6, 13, 14]  # incluye copyright y licencia (OFL)
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options)
+    if codepoints is None:
+        subsetter.populate(glyphs=font.getGlyphOrder())
+    else:
+        subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.flavor = 'woff2'
+    font.save(out)
+    return out.getvalue()
+
+
+def load_fonts_file():
+    try:
+        with open(FONTS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def font_face_rules():
+    """Reglas @font-face de las fuentes generadas (para la hoja de estilos)"""
+    data = load_fonts_file()
+    if not data:
+        return []
+    return [f"@font-face{{font-family:{FAMILY};font-style:normal;font-weight:{face['peso']};"
+            f"font-display:swap;src:url({face['href']}) format(\"woff2\");unicode-range:{data['unicodeRange']}}}"
+            for face in data['caras']]
+
+
+def font_preload_links(indent='    '):
+    """Etiquetas <link rel="preload"> de los pesos más usados para las cabeceras de las páginas"""
+    data = load_fonts_file()
+    if not data:
+        return ''
+    hrefs = [face['href'] for face in data['caras'] if face['peso'] in data['precarga']]
+    return ('\n' + indent).join(f'<link rel="preload" href="{href}" as="font" type="font/woff2" crossorigin>'
+                                for href in hrefs)
+
+
+def update_static_pages(public_dir=PUBLIC_DIR):
+    """Cambia Google Fonts (o la precarga anterior) por la precarga de las fuentes propias"""
+    links = font_preload_links()
+    block = f"    <!-- Fuentes (scripts/build_fonts.py) -->\n    {links}\n" if links else ''
+    updated = 0
+    for name in STATIC_PAGES:
+        path = public_dir / name
+        if not path.exists():
+            continue
+        content = path.read_text(encoding='utf-8')
+        new_content = FONTS_BLOCK_RE.sub(lambda m: block, content, count=1)
+        if new_content != content:
+            write_atomic(path, new_content)
+            updated += 1
+    return updated
+
+
+def build_fonts():
+    """Genera los WOFF2 recortados de Inter; devuelve el contenido de data/fonts.json"""
+    if TTFont is None:
+        raise RuntimeError("falta fontTools: pip install fonttools brotli")
+    print("[*] Generando fuentes (Inter recortada)...")
+    codepoints, weights, pages = collect_usage()
+    used = sorted(weight for weight in weights if weights[weight])
+    preload = sorted(sorted(used, key=lambda w: (-weights[w], w))[:PRELOAD_COUNT])
+
+    with open(SOURCE_FONT, 'rb') as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    with open(__file__, 'rb') as f:
+        script_hash = hashlib.sha256(f.read()).hexdigest()
+    inputs = hashlib.sha256(json.dumps([source_hash, script_hash, used, sorted(codepoints)]).encode()).hexdigest()[:16]
+
+    previous = load_fonts_file()
+    if (previous and previous.get('entradas') == inputs and previous.get('precarga') == preload
+            and all((PUBLIC_DIR / face['href'].lstrip('/')).exists() for face in previous['caras'])):
+        print(f"[OK] Sin cambios ({len(used)} pesos, {len(codepoints)} caracteres)")
+        update_static_pages()
+        return previous
+
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    faces = []
+    full_total = subset_total = 0
+    keep = set()
+    print(f"[*] {pages} paginas usan {FAMILY}: pesos {', '.join(map(str, used))}; {len(codepoints)} caracteres")
+    for weight in used:
+        full = woff2_bytes(instance(weight))
+        data = woff2_bytes(instance(weight), codepoints)
+        filename = f"inter-{weight}.{hashlib.sha256(data).hexdigest()[:10]}.woff2"
+        path = FONTS_DIR / filename
+        if not path.exists():
+            write_atomic(path, data)
+        keep.add(filename)
+        faces.append({'peso': weight, 'href': f"{FONTS_URL}/{filename}", 'bytes': len(data)})
+        full_total += len(full)
+        subset_total += len(data)
+        print(f"    - {weight}: {len(full):>8,d} -> {len(data):>7,d} bytes  (-{100 * (len(full) - len(data)) / len(full):.1f}%)"
+              f"{'  [precarga]' if weight in preload else ''}")
+    for old in FONTS_DIR.glob('inter-*.woff2'):
+        if old.name not in keep:
+            old.unlink()
+
+    result = {
+        'entradas': inputs,
+        'unicodeRange': unicode_range(codepoints),
+        'precarga': preload,
+        'caras': faces,
+    }
+    write_atomic(FONTS_FILE, json.dumps(result, indent=2) + '\n')
+    updated = update_static_pages()
+
+    print(f"[OK] {len(faces)} archivos WOFF2: {subset_total:,d} bytes "
+          f"(Inter completa en los mismos pesos: {full_total:,d} bytes, -{100 * (full_total - subset_total) / full_total:.1f}%)")
+    print(f"[*] Precargados por pagina: {sum(f['bytes'] for f in faces if f['peso'] in preload):,d} bytes "
+          f"({', '.join(map(str, preload))})")
+    if updated:
+        print(f"[OK] Paginas estaticas actualizadas: {updated}")
+    print("[INFO] Volver a generar la hoja de estilos (build_css.py) y las paginas para usar las fuentes nuevas")
+    return result
+
+
+if __name__ == "__main__":
+    ensure_staged()
+    try:
+        build_fonts()
+    except (OSError, RuntimeError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
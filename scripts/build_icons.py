@@ -0,0 +1,309 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from content_store import ContentStore, write_atomic
+from publish import ensure_staged, output_dir
+
+# Sprite SVG de íconos (reemplaza a Font Awesome por CDN)
+#
+#   python scripts/build_icons.py
+#   python scripts/build_icons.py --vendor <Font Awesome Free> fas:nombre [far:nombre ...]
+#
+# Las páginas cargaban all.min.css de Font Awesome y sus fuentes desde
+# cdnjs (dos pedidos a otro dominio que bloquean el render) para usar unos
+# 50 íconos. Ahora las plantillas y los fragmentos de IA siguen escribiendo
+# <i class="fas fa-bolt mr-2"></i>, y al escribir cada página ese <i> se
+# reemplaza por
+#
+#   <svg class="icono mr-2" viewBox="..." aria-hidden="true"><use href="/assets/svg/iconos.<hash>.svg#fas-bolt"></use></svg>
+#
+# (BuildManifest.save() y build_with_ai). El ícono toma el tamaño de la
+# fuente y el color del texto (clase icono, ver build_css.py).
+#
+# Este script junta los íconos usados en public/, en las plantillas y en
+# los fragmentos del almacén de contenido, y escribe con ellos un único
+# sprite public/assets/svg/iconos.<hash>.svg. Como con la hoja de estilos,
+# el nombre vigente queda en data/sprite.json y las páginas estáticas
+# (index.html y 404.html) se reescriben aquí mismo.
+#
+# Los íconos salen de un subconjunto de Font Awesome Free guardado en el
+# repo (vendor/fontawesome/iconos.json); se aceptan los nombres de FA 5
+# (fa-shield-alt) por sus alias. Un ícono que no está en ese archivo hace
+# fallar la compilación (MissingIconsError) en vez de quedar en blanco:
+# hay que agregarlo con --vendor desde una descarga de Font Awesome Free
+# (la carpeta con svgs/ y metadata/icons.json).
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+ICON_SET_FILE = BASE_DIR / 'vendor' / 'fontawesome' / 'iconos.json'
+SPRITE_DIR = PUBLIC_DIR / 'assets' / 'svg'
+SPRITE_URL = '/assets/svg'
+SPRITE_FILE = BASE_DIR / 'data' / 'sprite.json'
+TEMPLATE_DIRS = (BASE_DIR / 'templates', BASE_DIR / 'documentacion')
+STATIC_PAGES = ('index.html', '404.html')
+MAX_REPORTED = 20
+
+# Clase de estilo de Font Awesome -> familia de íconos
+STYLES = {
+    'fa': 'solid', 'fas': 'solid', 'fa-solid': 'solid',
+    'far': 'regular', 'fa-regular': 'regular',
+    'fab': 'brands', 'fa-brands': 'brands',
+}
+SYMBOL_PREFIX = {'solid': 'fas', 'regular': 'far', 'brands': 'fab'}
+
+# Solo íconos vacíos con el atributo class (así los escriben las plantillas);
+# un <i> truncado o con otros atributos se deja igual
+ICON_TAG_RE = re.compile(r'''<i\s+class\s*=\s*(?:"([^"<>]*)"|'([^'<>]*)')\s*>\s*</i>''', re.IGNORECASE)
+USE_RE = re.compile(r'''<use\s+href="[^"#]*#(fa[srb]-[a-z0-9-]+)"''')
+SVG_PATH_RE = re.compile(r'<svg[^>]*viewBox="([^"]+)"[^>]*>(.*)</svg>', re.DOTALL)
+SVG_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+
+
+class MissingIconsError(Exception):
+    """Hay íconos que no están en el subconjunto de Font Awesome del repo"""
+
+    def __init__(self, missing):
+        self.missing = missing
+        lines = [f"{len(missing)} iconos no estan en {ICON_SET_FILE.relative_to(BASE_DIR).as_posix()}:"]
+        for source, icon in missing[:MAX_REPORTED]:
+            lines.append(f"  {source}  {icon}")
+        if len(missing) > MAX_REPORTED:
+            lines.append(f"  ... y {len(missing) - MAX_REPORTED} mas")
+        lines.append("  (agregarlos con: python scripts/build_icons.py --vendor <Font Awesome Free> fas:nombre)")
+        super().__init__("\n".join(lines))
+
+
+class IconSet:
+    """Subconjunto de Font Awesome guardado en el repo"""
+
+    def __init__(self, path=ICON_SET_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.source = data['fuente']
+        self.icons = data['iconos']  # 'solid/bolt' -> {alias, viewBox, svg}
+        self.names = {}
+        for key, icon in self.icons.items():
+            family, name = key.split('/')
+            for alias in [name] + icon['alias']:
+                self.names[(family, alias)] = key
+
+    def resolve(self, family, name):
+        """Clave del ícono ('solid/shield-halved') o None si no está"""
+        return self.names.get((family, name))
+
+    def symbol_id(self, key):
+        """id del <symbol> de un ícono: 'solid/shield-halved' -> 'fas-shield-halved'"""
+        family, name = key.split('/')
+        return f"{SYMBOL_PREFIX[family]}-{name}"
+
+    def symbol(self, symbol_id, key):
+        icon = self.icons[key]
+        return f'<symbol id="{symbol_id}" viewBox="{icon["viewBox"]}">{icon["svg"]}</symbol>'
+
+
+def icon_classes(classes):
+    """(familia, nombre, otras clases) de un <i> de Font Awesome, o None si no lo es"""
+    family = None
+    names = []
+    rest = []
+    for cls in classes:
+        if cls in STYLES:
+            family = family or STYLES[cls]
+        elif cls.startswith('fa-'):
+            names.append(cls[3:])
+        else:
+            rest.append(cls)
+    if family is None and not names:
+        return None
+    return family or 'solid', ' '.join(names), rest
+
+
+def sprite_href():
+    """URL del sprite vigente (el que referencian las páginas)"""
+    try:
+        with open(SPRITE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)['href']
+    except FileNotFoundError:
+        return f"{SPRITE_URL}/iconos.svg"
+
+
+class IconRewriter:
+    """Reemplaza los <i> de Font Awesome por referencias al sprite"""
+
+    def __init__(self, icon_set=None, href=None):
+        self.icon_set = icon_set or IconSet()
+        self.href = href or sprite_href()
+        self.used = {}      # id de símbolo -> clave del ícono
+        self.missing = []   # (origen, clases del <i>)
+
+    def rewrite(self, html, source='?'):
+        """HTML con los íconos reemplazados; los que faltan se anotan en missing"""
+        def replace(match):
+            classes = (match.group(1) if match.group(1) is not None else match.group(2)).split()
+            parsed = icon_classes(classes)
+            if parsed is None:
+                return match.group(0)
+            family, name, rest = parsed
+            key = self.icon_set.resolve(family, name)
+            if key is None:
+                self.missing.append((source, ' '.join(classes)))
+                return match.group(0)
+            symbol_id = self.icon_set.symbol_id(key)
+            self.used[symbol_id] = key
+            view_box = self.icon_set.icons[key]['viewBox']
+            return (f'<svg class="{" ".join(["icono"] + rest)}" viewBox="{view_box}" aria-hidden="true">'
+                    f'<use href="{self.href}#{symbol_id}"></use></svg>')
+
+        return ICON_TAG_RE.sub(replace, html)
+
+    def collect(self, html, source='?'):
+        """Anota los íconos de un HTML ya escrito (con <i> o con <use> al sprite)"""
+        self.rewrite(html, source)
+        for match in USE_RE.finditer(html):
+            symbol_id = match.group(1)
+            prefix, name = symbol_id.split('-', 1)
+            key = self.icon_set.resolve(STYLES[prefix], name)
+            if key is None:
+                self.missing.append((source, symbol_id))
+            else:
+                self.used[symbol_id] = key
+
+    def check(self):
+        """Lanza MissingIconsError si algún ícono no está en el subconjunto"""
+        if self.missing:
+            missing, self.missing = self.missing, []
+            raise MissingIconsError(missing)
+
+    def sprite(self):
+        """Sprite SVG con los íconos usados"""
+        symbols = ''.join(self.icon_set.symbol(symbol_id, self.used[symbol_id]) for symbol_id in sorted(self.used))
+        return (f'<svg xmlns="http://www.w3.org/2000/svg"><!-- {self.icon_set.source} -->'
+                f'{symbols}</svg>\n')
+
+
+def collect_icons(rewriter, public_dir=PUBLIC_DIR):
+    """Íconos usados en public/, en las plantillas y en los fragmentos de IA"""
+    for root, dirs, names in os.walk(public_dir):
+        for name in names:
+            if name.endswith('.html'):
+                path = Path(root) / name
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    rewriter.collect(f.read(), path.relative_to(public_dir).as_posix())
+    for template_dir in TEMPLATE_DIRS:
+        for path in template_dir.glob('*.html'):
+            rewriter.collect(path.read_text(encoding='utf-8'), path.relative_to(BASE_DIR).as_posix())
+    with ContentStore() as store:
+        for key in store:
+            rewriter.collect(store[key], key)
+
+
+def update_static_pages(rewriter, public_dir=PUBLIC_DIR):
+    """Reescribe los íconos de las páginas escritas a mano y las apunta al sprite nuevo"""
+    pattern = re.compile(re.escape(SPRITE_URL) + r'/iconos(?:\.[0-9a-f]+)?\.svg(?=#)')
+    updated = 0
+    for name in STATIC_PAGES:
+        path = public_dir / name
+        if not path.exists():
+            continue
+        content = path.read_text(encoding='utf-8')
+        new_content = pattern.sub(rewriter.href, rewriter.rewrite(content, name))
+        if new_content != content:
+            write_atomic(path, new_content)
+            updated += 1
+    return updated
+
+
+def build_icons():
+    """Genera el sprite con los íconos usados; devuelve su URL"""
+    print("[*] Generando sprite de iconos...")
+    icon_set = IconSet()
+    collector = IconRewriter(icon_set)
+    collect_icons(collector)
+    collector.check()
+
+    sprite = collector.sprite()
+    digest = hashlib.sha256(sprite.encode('utf-8')).hexdigest()[:10]
+    filename = f"iconos.{digest}.svg"
+    href = f"{SPRITE_URL}/{filename}"
+
+    SPRITE_DIR.mkdir(parents=True, exist_ok=True)
+    path = SPRITE_DIR / filename
+    if not path.exists():
+        write_atomic(path, sprite)
+    for old in SPRITE_DIR.glob('iconos.*.svg'):
+        if old.name != filename:
+            old.unlink()
+
+    previous = sprite_href()
+    if previous != href:
+        write_atomic(SPRITE_FILE, json.dumps({'href': href}, indent=2) + '\n')
+    updated = update_static_pages(IconRewriter(icon_set, href))
+
+    print(f"[OK] {href} ({len(sprite.encode('utf-8')):,d} bytes, {len(collector.used)} iconos)")
+    if updated:
+        print(f"[OK] Paginas estaticas actualizadas: {updated}")
+    if previous != href:
+        print("[INFO] El sprite cambio: volver a ejecutar los generadores para actualizar los iconos de las paginas")
+    return href
+
+
+def vendor_icons(source_dir, specs):
+    """Agrega íconos (fas:nombre) de una descarga de Font Awesome Free a ICON_SET_FILE"""
+    source_dir = Path(source_dir)
+    with open(source_dir / 'metadata' / 'icons.json', 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    aliases = {}
+    for name, meta in metadata.items():
+        for alias in meta.get('aliases', {}).get('names', []):
+            aliases[alias] = name
+
+    try:
+        with open(ICON_SET_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {'fuente': '', 'iconos': {}}
+    for spec in specs:
+        style, _, name = spec.partition(':')
+        family = STYLES.get(style) or STYLES.get(f"fa-{style}")
+        if family is None or not name:
+            raise ValueError(f"Icono invalido: {spec} (usar fas:nombre, far:nombre o fab:nombre)")
+        name = name[3:] if name.startswith('fa-') else name
+        canonical = name if name in metadata else aliases.get(name)
+        path = source_dir / 'svgs' / family / f"{canonical}.svg"
+        if canonical is None or not path.exists():
+            raise ValueError(f"{spec}: no existe en {source_dir}")
+        svg = path.read_text(encoding='utf-8')
+        match = SVG_PATH_RE.search(svg)
+        # Atribución de la licencia (CC BY 4.0): el comentario de los SVG originales
+        comment = SVG_COMMENT_RE.search(svg)
+        if comment:
+            data['fuente'] = comment.group(0)[4:-3].lstrip('!').strip()
+        data['iconos'][f"{family}/{canonical}"] = {
+            'alias': sorted(metadata[canonical].get('aliases', {}).get('names', [])),
+            'viewBox': match.group(1),
+            'svg': SVG_COMMENT_RE.sub('', match.group(2)).strip(),
+        }
+        print(f"[OK] {family}/{canonical}")
+
+    # Un ícono por línea: diffs legibles en git
+    lines = [f'  {json.dumps(key)}: {json.dumps(data["iconos"][key])}' for key in sorted(data['iconos'])]
+    write_atomic(ICON_SET_FILE, '{\n'
+                 f' "fuente": {json.dumps(data["fuente"])},\n'
+                 ' "iconos": {\n' + ',\n'.join(lines) + ('\n' if lines else '') + ' }\n}\n')
+
+
+if __name__ == "__main__":
+    ensure_staged()
+    try:
+        if "--vendor" in sys.argv:
+            idx = sys.argv.index("--vendor")
+            vendor_icons(sys.argv[idx + 1], sys.argv[idx + 2:])
+        else:
+            build_icons()
+    except (OSError, ValueError, MissingIconsError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+
+import build_icons
+import build_profile
+import html_minify
+from build_icons import IconRewriter
+from content_store import write_atomic
+from html_minify import MinifyStats, minify_html
+from link_graph import LinkGraph
+from publish import live_path, output_dir
+
+# Manifiesto de compilación incremental
+#
+# Para cada archivo de salida se guarda el hash de sus entradas (entrada del
+# catálogo, fragmento de caché, hash de la plantilla y versión del
+# generador) y el hash de los bytes escritos. Una página cuyas entradas no
+# cambiaron no se vuelve a renderizar, y un archivo cuyo contenido
+# renderizado es idéntico no se vuelve a escribir.
+#
+# Las páginas renderizadas quedan en espera hasta save(): antes de escribir
+# se valida el grafo de enlaces del generador (ver link_graph.py) y, si
+# algún enlace interno no tiene destino, la compilación falla sin tocar
+# public/. Los íconos <i class="fas fa-..."> se reemplazan por referencias
+# al sprite SVG (ver build_icons.py); un ícono que no está en el subconjunto
+# de Font Awesome del repo también hace fallar la compilación antes de
+# escribir. Con minify=True (--minify en los generadores) cada página se
+# minifica al escribirla (ver html_minify.py).
+#
+# Las páginas se escriben en la carpeta de salida vigente (la preparación de
+# publish.py durante una compilación), pero las claves del manifiesto son
+# siempre las rutas bajo public/.
+
+BASE_DIR = Path(__file__).parent.parent
+BUILD_CACHE_DIR = BASE_DIR / '.build_cache'
+
+# Motivos por los que una página se salta o se reconstruye
+SKIP_UNCHANGED = 'entradas sin cambios'
+SKIP_IDENTICAL = 'bytes identicos'
+REBUILD_NEW = 'nueva'
+REBUILD_INPUTS = 'entradas cambiadas'
+REBUILD_MISSING = 'salida ausente'
+REBUILD_EDITED = 'salida modificada'
+REBUILD_FORCED = 'forzada'
+
+
+def hash_text(text):
+    """Hash SHA-256 de un texto"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _json_default(value):
+    """Dataclasses del catálogo (Brand, Model...) como objetos JSON"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"{type(value).__name__} no es serializable en JSON")
+
+
+def hash_inputs(*parts):
+    """Hash estable de un conjunto de entradas serializables en JSON (o dataclasses)"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=_json_default).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def generator_version(*paths):
+    """Versión de un generador: hash del código fuente de sus módulos"""
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _read_text(path):
+    """Lee un archivo de salida, o None si no existe"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+class BuildManifest:
+    """Manifiesto de entradas/salidas de un generador"""
+
+    def __init__(self, generator, version, base_dir=BASE_DIR, force=False, minify=False):
+        if minify:
+            # La salida minificada es otra salida: cambia el hash de entradas de
+            # todas las páginas (y también si cambia el minificador)
+            version = f"{version}-min-{generator_version(html_minify.__file__)}"
+        # Los íconos apuntan al sprite vigente: un sprite nuevo (o otro
+        # reemplazo de íconos) cambia todas las páginas
+        self.icons = IconRewriter()
+        version = f"{version}-iconos-{generator_version(build_icons.__file__)}-{self.icons.href}"
+        self.generator = generator
+        self.version = version
+        self.base_dir = Path(base_dir)
+        self.force = force
+        self.minify = minify
+        self.minify_stats = MinifyStats()
+        self.path = BUILD_CACHE_DIR / f'manifest_{generator}.json'
+        self.entries = {}
+        self.stats = Counter()
+        self.graph = LinkGraph(generator, output_dir(self.base_dir))
+        self.pending = []
+
+        # La versión del generador forma parte del hash de entradas, así que
+        # un manifiesto de otra versión simplemente marca todo como cambiado
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+
+    def _key(self, path):
+        """Clave del manifiesto: ruta relativa a la raíz del repo"""
+        path = live_path(path)
+        try:
+            return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def inputs(self, *parts):
+        """Hash de entradas de una página, incluyendo la versión del generador"""
+        return hash_inputs(self.version, *parts)
+
+    def _output_matches(self, path, entry):
+        """Verifica que el archivo en disco sigue siendo el que se escribió"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if st.st_size == entry.get('size') and st.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        content = _read_text(path)
+        if content is None or hash_text(content) != entry.get('output'):
+            return False
+        # Mismo contenido con otra fecha (p. ej. checkout de git): refrescar stat
+        entry['size'] = st.st_size
+        entry['mtime_ns'] = st.st_mtime_ns
+        return True
+
+    def stale_reason(self, path, inputs_hash):
+        """Motivo por el que hay que reconstruir una página, o None si está al día"""
+        if self.force:
+            return REBUILD_FORCED
+        entry = self.entries.get(self._key(path))
+        if entry is None:
+            return REBUILD_NEW
+        if entry.get('inputs') != inputs_hash:
+            return REBUILD_INPUTS
+        if not Path(path).exists():
+            return REBUILD_MISSING
+        if not self._output_matches(path, entry):
+            return REBUILD_EDITED
+        return None
+
+    def write(self, path, content, inputs_hash):
+        """Escribe una salida solo si sus bytes cambiaron; devuelve True si escribió"""
+        path = Path(path)
+        key = self._key(path)
+        output_hash = hash_text(content)
+
+        if _read_text(path) == content:
+            written = False
+        else:
+            write_atomic(path, content)
+            written = True
+            build_profile.record_write(path, len(content.encode('utf-8')))
+
+        st = os.stat(path)
+        self.entries[key] = {
+            'inputs': inputs_hash,
+            'output': output_hash,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+        }
+        return written
+
+    def check(self, path, inputs_hash):
+        """Como stale_reason(), pero contabiliza las páginas al día como saltadas"""
+        reason = self.stale_reason(path, inputs_hash)
+        if reason is None:
+            self.stats[SKIP_UNCHANGED] += 1
+            self.graph.add_page(path)
+        return reason
+
+    def record(self, path, content, inputs_hash, reason):
+        """Registra una página ya renderizada; se escribe en save()"""
+        self.pending.append((path, content, inputs_hash, reason))
+        self.graph.add_page(path, content)
+
+    def build(self, path, inputs_hash, render):
+        """Renderiza una página solo si hace falta; devuelve True si la renderizó"""
+        reason = self.check(path, inputs_hash)
+        if reason is None:
+            return False
+        start = time.perf_counter()
+        content = render()
+        build_profile.record_page(path, time.perf_counter() - start)
+        self.record(path, content, inputs_hash, reason)
+        return True
+
+    def save(self):
+        """Valida los enlaces, escribe las páginas en espera y guarda el manifiesto
+
+        Lanza DanglingLinksError (sin escribir ninguna página) si algún
+        enlace interno apunta a una página que no existe, y MissingIconsError
+        si algún ícono no está en el subconjunto de Font Awesome.
+        """
+        self.graph.check()
+        pending = [(path, self.icons.rewrite(content, self._key(path)), inputs_hash, reason)
+                   for path, content, inputs_hash, reason in self.pending]
+        self.icons.check()
+        for path, content, inputs_hash, reason in pending:
+            if self.minify:
+                minified = minify_html(content)
+                self.minify_stats.add(self.graph.page_key(path) or self._key(path), content, minified)
+                content = minified
+            written = self.write(path, content, inputs_hash)
+            self.stats[reason if written else SKIP_IDENTICAL] += 1
+        self.pending = []
+        write_atomic(self.path, json.dumps({'version': self.version, 'entries': self.entries},
+                                           ensure_ascii=False, indent=1, sort_keys=True))
+        self.graph.save()
+
+    def print_summary(self):
+        """Imprime cuántas páginas se escribieron y cuántas se saltaron, y por qué"""
+        skipped = self.stats[SKIP_UNCHANGED] + self.stats[SKIP_IDENTICAL]
+        written = sum(self.stats.values()) - skipped
+        print(f"[*] Paginas escritas: {written}")
+        for reason in (REBUILD_NEW, REBUILD_INPUTS, REBUILD_MISSING, REBUILD_EDITED, REBUILD_FORCED):
+            if self.stats[reason]:
+                print(f"    - {reason}: {self.stats[reason]}")
+        print(f"[*] Paginas saltadas: {skipped}")
+        for reason in (SKIP_UNCHANGED, SKIP_IDENTICAL):
+            if self.stats[reason]:
+                print(f"    - {reason}: {self.stats[reason]}")
+        self.minify_stats.print_summary()
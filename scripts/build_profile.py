@@ -0,0 +1,267 @@
+import cProfile
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from content_store import split_key
+from publish import live_path
+
+# Perfil de una compilación (--profile en los generadores)
+#
+#   python scripts/build_all_sections.py --profile [--cprofile]
+#
+# Con --profile el generador mide:
+#   - tiempo real y CPU de cada fase (cada phase('...') termina la fase
+#     anterior), con el pico de memoria de Python de la fase (tracemalloc)
+#   - tiempo de render de cada página y bytes escritos (BuildManifest,
+#     render_pages)
+#   - latencia de cada petición a la API (percentiles), reintentos,
+#     peticiones limitadas (429/503) y fallidas (gemini_client)
+#   - aciertos del almacén de contenido por tipo de fragmento
+#
+# y escribe un informe JSON en .build_cache/profiles/<generador>.json.
+# Cada informe se agrega además a .build_cache/profiles/historial.jsonl con
+# el commit y la fecha, para comparar compilaciones entre commits. Con
+# --cprofile se guarda también el volcado de cProfile en
+# .build_cache/profiles/<generador>.prof (python -m pstats ...).
+#
+# Sin --profile todas las funciones de registro son no-ops. La CPU de cada
+# fase incluye la de los procesos de render ya terminados (os.times); la
+# memoria solo cuenta el proceso principal. tracemalloc hace más lento el
+# generador, así que los tiempos de un perfil se comparan con otros perfiles.
+
+BASE_DIR = Path(__file__).parent.parent
+PROFILE_DIR = BASE_DIR / '.build_cache' / 'profiles'
+HISTORY_FILE = PROFILE_DIR / 'historial.jsonl'
+REPORT_VERSION = 1
+SLOWEST_PAGES = 10
+
+_current = None
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (values ordenados), o None si no hay valores"""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def distribution(values):
+    """Cantidad, total, percentiles y máximo de una lista de segundos"""
+    values = sorted(round(value, 6) for value in values)
+    return {
+        'n': len(values),
+        'total': round(sum(values), 6),
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else None,
+    }
+
+
+def _cpu_seconds():
+    """CPU del proceso y de los procesos hijos ya terminados"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class BuildProfile:
+    """Mediciones de una ejecución de un generador"""
+
+    def __init__(self, generator, argv, use_cprofile=False):
+        self.generator = generator
+        self.argv = list(argv)
+        self.phases = []
+        self.pages = {}
+        self.writes = {}
+        self.api_latencies = []
+        self.api_stats = Counter()
+        self.cache = defaultdict(Counter)
+        self.current = None
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+
+    def start(self):
+        tracemalloc.start()
+        self.started = time.perf_counter()
+        self.cpu_started = _cpu_seconds()
+        if self.cprofile:
+            self.cprofile.enable()
+
+    def phase(self, name):
+        """Termina la fase en curso (si hay una) y empieza otra"""
+        self.end_phase()
+        tracemalloc.reset_peak()
+        self.current = (name, time.perf_counter(), _cpu_seconds())
+
+    def end_phase(self):
+        if self.current is None:
+            return
+        name, start, cpu = self.current
+        self.phases.append({
+            'nombre': name,
+            'segundos': round(time.perf_counter() - start, 6),
+            'cpu': round(_cpu_seconds() - cpu, 6),
+            'memoria_pico': tracemalloc.get_traced_memory()[1],
+        })
+        self.current = None
+
+    def report(self):
+        pages = sorted(self.pages.items(), key=lambda item: -item[1])
+        return {
+            'version': REPORT_VERSION,
+            'generador': self.generator,
+            'comando': self.argv,
+            'commit': _git_commit(),
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'total': {
+                'segundos': round(time.perf_counter() - self.started, 6),
+                'cpu': round(_cpu_seconds() - self.cpu_started, 6),
+                'memoria_pico': max([tracemalloc.get_traced_memory()[1]]
+                                    + [phase['memoria_pico'] for phase in self.phases]),
+            },
+            'fases': self.phases,
+            'paginas': dict(distribution(list(self.pages.values())),
+                            mas_lentas=[[path, seconds] for path, seconds in pages[:SLOWEST_PAGES]]),
+            'escritura': {'archivos': len(self.writes), 'bytes': sum(self.writes.values())},
+            'api': dict(self.api_stats, latencia=distribution(self.api_latencies)),
+            'cache': {kind: {'aciertos': counts['hit'], 'fallos': counts['miss'],
+                             'ratio': round(counts['hit'] / (counts['hit'] + counts['miss']), 4)}
+                      for kind, counts in sorted(self.cache.items())},
+        }
+
+    def finish(self):
+        """Escribe el informe (y el volcado de cProfile); devuelve la ruta del informe"""
+        if self.cprofile:
+            self.cprofile.disable()
+        self.end_phase()
+        report = self.report()
+        tracemalloc.stop()
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f'{self.generator}.json'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False, separators=(',', ':')) + '\n')
+        if self.cprofile:
+            self.cprofile.dump_stats(PROFILE_DIR / f'{self.generator}.prof')
+
+        total = report['total']
+        print(f"\n[*] Perfil: {total['segundos']:.2f}s reales, {total['cpu']:.2f}s CPU, "
+              f"pico de memoria {total['memoria_pico'] / 1024 / 1024:.1f} MB")
+        for phase in report['fases']:
+            print(f"    - {phase['nombre']:40s} {phase['segundos']:8.3f}s  CPU {phase['cpu']:8.3f}s")
+        if report['paginas']['n']:
+            print(f"[*] Render: {report['paginas']['n']} paginas, p50 {report['paginas']['p50'] * 1000:.2f} ms, "
+                  f"max {report['paginas']['max'] * 1000:.2f} ms")
+        if report['api']['latencia']['n']:
+            latency = report['api']['latencia']
+            print(f"[*] API: p50 {latency['p50']:.2f}s, p90 {latency['p90']:.2f}s, "
+                  f"{report['api'].get('reintentos', 0)} reintentos")
+        print(f"[OK] Informe en {path.relative_to(BASE_DIR).as_posix()}")
+        return path
+
+
+# Registro (no-ops sin --profile)
+
+def active():
+    return _current is not None
+
+
+def phase(name):
+    """Marca el comienzo de una fase del generador (la anterior termina acá)"""
+    if _current:
+        _current.phase(name)
+
+
+def record_page(path, seconds):
+    if _current:
+        _current.pages[_page_key(path)] = round(seconds, 6)
+
+
+def record_write(path, size):
+    if _current:
+        _current.writes[_page_key(path)] = size
+
+
+def record_api(latencies, stats):
+    """Latencias (segundos por petición HTTP) y contadores de un GeminiClient"""
+    if _current:
+        _current.api_latencies.extend(latencies)
+        _current.api_stats.update({'peticiones': stats['requests'], 'ok': stats['ok'],
+                                   'fallidas': stats['failed'], 'limitadas': stats['throttled'],
+                                   'reintentos': stats['retries'], 'lotes': stats['batches']})
+
+
+def record_cache(key, hit):
+    """Un fragmento del almacén que el generador necesita: en caché o no"""
+    if _current:
+        _current.cache[split_key(key)[0]]['hit' if hit else 'miss'] += 1
+
+
+def _page_key(path):
+    path = live_path(path)
+    try:
+        return path.resolve().relative_to(BASE_DIR.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+@contextmanager
+def profiled(generator, argv):
+    """Activa el perfil si argv tiene --profile (o --cprofile) y escribe el informe al salir"""
+    global _current
+    if "--profile" not in argv and "--cprofile" not in argv:
+        yield None
+        return
+    _current = BuildProfile(generator, argv, use_cprofile="--cprofile" in argv)
+    _current.start()
+    try:
+        yield _current
+    finally:
+        profile, _current = _current, None
+        profile.finish()
+
+
+if __name__ == "__main__":
+    # python scripts/build_profile.py [generador]: compara los dos últimos perfiles del historial
+    try:
+        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+            history = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"[ERROR] No hay perfiles en {HISTORY_FILE}")
+        sys.exit(1)
+    if len(sys.argv) > 1:
+        history = [report for report in history if report['generador'] == sys.argv[1]]
+    generators = dict.fromkeys(report['generador'] for report in history)
+    for generator in generators:
+        runs = [report for report in history if report['generador'] == generator][-2:]
+        print(f"{generator}:")
+        for report in runs:
+            total = report['total']
+            print(f"    {report['fecha']}  {report['commit'] or '-':10s} {total['segundos']:8.2f}s  "
+                  f"CPU {total['cpu']:8.2f}s  {total['memoria_pico'] / 1024 / 1024:6.1f} MB  "
+                  f"{report['escritura']['archivos']} archivos, {report['escritura']['bytes']:,d} bytes")
+        if len(runs) == 2 and runs[0]['total']['segundos']:
+            change = runs[1]['total']['segundos'] / runs[0]['total']['segundos'] - 1
+            print(f"    {'+' if change >= 0 else ''}{change * 100:.1f}% de tiempo real")
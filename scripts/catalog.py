@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from content_store import write_atomic
+
+# Catálogo de marcas y modelos, validado e indexado
+#
+#   python scripts/catalog.py      (valida data/brands.json y data/catalog.json)
+#
+# Todos los generadores leen el catálogo con load_catalog() en lugar de
+# parsear los JSON cada uno y armar su propio {marca: item}. Los datos se
+# validan una sola vez y se convierten en dataclasses inmutables (Brand,
+# Model, Specs, ErrorCode, Maintenance); cualquier error de esquema (campo
+# faltante, de otro tipo o desconocido, marca sin listar, id repetido) es
+# un CatalogError con la ruta del dato, antes de pedir nada a la IA o
+# renderizar una página.
+#
+# El catálogo validado se guarda como instantánea binaria (pickle) en
+# .build_cache/catalog.pickle junto con el tamaño, la fecha y el hash de cada
+# JSON y la versión de este módulo: si los archivos no cambiaron, la
+# siguiente compilación carga la instantánea sin leer ni validar los JSON.
+# Si solo cambió la fecha (checkout de git) se compara el hash.
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / 'data'
+BUILD_CACHE_DIR = BASE_DIR / '.build_cache'
+
+BRANDS_FILE = DATA_DIR / 'brands.json'
+CATALOG_FILE = DATA_DIR / 'catalog.json'
+SNAPSHOT_FILE = BUILD_CACHE_DIR / 'catalog.pickle'
+
+MODEL_ID_RE = re.compile(r'^[a-z0-9]+(?:-[a-z0-9]+)*$')
+
+
+class CatalogError(Exception):
+    """Error de esquema en brands.json o catalog.json"""
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorCode:
+    code: str
+    desc: str
+    sol: str
+
+
+@dataclass(frozen=True, slots=True)
+class Specs:
+    resistencia: str = None
+    termostato: str = None
+    anodo: str = None
+    herramientas: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Maintenance:
+    anodo: str = None
+    limpieza: str = None
+    valvula: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class Model:
+    id: str
+    name: str
+    description: str
+    specs: Specs = Specs()
+    error_codes: tuple = ()
+    maintenance: Maintenance = Maintenance()
+    video_keywords: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class Brand:
+    name: str
+    slug: str
+    models: tuple = ()
+
+
+def brand_slug(name):
+    """Slug de una marca ('Zero Watt' -> 'zero-watt')"""
+    return name.replace(' ', '-').lower()
+
+
+class Catalog:
+    """Marcas en el orden de brands.json, con índices por nombre, slug y modelo"""
+
+    __slots__ = ('brands', 'by_name', 'by_slug', 'models')
+
+    def __init__(self, brands):
+        self.brands = tuple(brands)
+        self.by_name = {brand.name: brand for brand in self.brands}
+        self.by_slug = {brand.slug: brand for brand in self.brands}
+        self.models = {(brand.slug, model.id): model for brand in self.brands for model in brand.models}
+
+    def __iter__(self):
+        return iter(self.brands)
+
+    def __len__(self):
+        return len(self.brands)
+
+    def names(self):
+        """Nombres de las marcas, en orden"""
+        return [brand.name for brand in self.brands]
+
+    def with_models(self):
+        """Marcas que tienen modelos en el catálogo"""
+        return [brand for brand in self.brands if brand.models]
+
+
+# Validación
+
+def _expect(value, kind, path):
+    if not isinstance(value, kind) or (kind is str and not value.strip()):
+        expected = {str: 'un texto no vacío', list: 'una lista', dict: 'un objeto'}[kind]
+        raise CatalogError(f"{path}: se esperaba {expected}, hay {json.dumps(value, ensure_ascii=False)[:60]}")
+    return value
+
+
+def _fields(data, allowed, path, required=()):
+    """Campos de un objeto JSON: sin claves desconocidas ni faltantes"""
+    _expect(data, dict, path)
+    unknown = sorted(data.keys() - allowed)
+    if unknown:
+        raise CatalogError(f"{path}: campos desconocidos: {', '.join(unknown)} (validos: {', '.join(allowed)})")
+    missing = [name for name in required if name not in data]
+    if missing:
+        raise CatalogError(f"{path}: faltan campos: {', '.join(missing)}")
+    return data
+
+
+def _texts(data, cls, path, required=()):
+    """Objeto de solo textos (Specs salvo herramientas, Maintenance, ErrorCode)"""
+    return {name: _expect(value, str, f"{path}.{name}")
+            for name, value in _fields(data, cls.__dataclass_fields__.keys(), path, required).items()}
+
+
+def _model(data, path):
+    data = _fields(data, Model.__dataclass_fields__.keys(), path, required=('id', 'name', 'description'))
+    model_id = _expect(data['id'], str, f"{path}.id")
+    if not MODEL_ID_RE.match(model_id):
+        raise CatalogError(f"{path}.id: '{model_id}' no sirve como nombre de archivo (solo a-z, 0-9 y guiones)")
+
+    specs = dict(_expect(data.get('specs', {}), dict, f"{path}.specs"))
+    tools = _expect(specs.pop('herramientas', []), list, f"{path}.specs.herramientas")
+    specs = _texts(specs, Specs, f"{path}.specs")
+    specs['herramientas'] = tuple(_expect(tool, str, f"{path}.specs.herramientas[{idx}]")
+                                  for idx, tool in enumerate(tools))
+
+    errors = _expect(data.get('error_codes', []), list, f"{path}.error_codes")
+    return Model(
+        id=model_id,
+        name=_expect(data['name'], str, f"{path}.name"),
+        description=_expect(data['description'], str, f"{path}.description"),
+        specs=Specs(**specs),
+        error_codes=tuple(ErrorCode(**_texts(err, ErrorCode, f"{path}.error_codes[{idx}]", required=('code', 'desc', 'sol')))
+                          for idx, err in enumerate(errors)),
+        maintenance=Maintenance(**_texts(data.get('maintenance', {}), Maintenance, f"{path}.maintenance")),
+        video_keywords=(_expect(data['video_keywords'], str, f"{path}.video_keywords")
+                        if 'video_keywords' in data else None),
+    )
+
+
+def validate(brands_data, catalog_data):
+    """Catalog a partir del contenido de brands.json y catalog.json"""
+    names = _expect(brands_data, list, BRANDS_FILE.name)
+    slugs = {}
+    for idx, name in enumerate(names):
+        _expect(name, str, f"{BRANDS_FILE.name}[{idx}]")
+        slug = brand_slug(name)
+        if slug in slugs:
+            raise CatalogError(f"{BRANDS_FILE.name}[{idx}]: '{name}' repite el slug '{slug}' de '{slugs[slug]}'")
+        slugs[slug] = name
+
+    models = {}
+    for idx, item in enumerate(_expect(catalog_data, list, CATALOG_FILE.name)):
+        path = f"{CATALOG_FILE.name}[{idx}]"
+        item = _fields(item, ('brand', 'models'), path, required=('brand', 'models'))
+        name = _expect(item['brand'], str, f"{path}.brand")
+        if name not in names:
+            raise CatalogError(f"{path}.brand: '{name}' no esta en {BRANDS_FILE.name}")
+        if name in models:
+            raise CatalogError(f"{path}.brand: '{name}' aparece dos veces")
+        brand_models = []
+        for model_idx, model_data in enumerate(_expect(item['models'], list, f"{path}.models")):
+            model = _model(model_data, f"{path}.models[{model_idx}]")
+            if any(m.id == model.id for m in brand_models):
+                raise CatalogError(f"{path}.models[{model_idx}].id: '{model.id}' repetido en {name}")
+            brand_models.append(model)
+        models[name] = tuple(brand_models)
+
+    return Catalog(Brand(name=name, slug=brand_slug(name), models=models.get(name, ()))
+                   for name in names)
+
+
+# Instantánea
+
+def _source_version():
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _stat(path):
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write_snapshot(path, snapshot):
+    write_atomic(path, pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_catalog(brands_file=BRANDS_FILE, catalog_file=CATALOG_FILE, snapshot_file=SNAPSHOT_FILE):
+    """Catálogo validado; usa la instantánea si los JSON no cambiaron"""
+    sources = (Path(brands_file), Path(catalog_file))
+    for path in sources:
+        if not path.exists():
+            raise CatalogError(f"no existe {path}")
+    version = _source_version()
+    stats = [_stat(path) for path in sources]
+
+    snapshot = _read_snapshot(snapshot_file)
+    if snapshot and snapshot.get('version') == version and snapshot.get('stats') == stats:
+        return snapshot['catalog']
+
+    raw = [path.read_bytes() for path in sources]
+    hashes = [hashlib.sha256(data).hexdigest() for data in raw]
+    if snapshot and snapshot.get('version') == version and snapshot.get('hashes') == hashes:
+        catalog = snapshot['catalog']  # mismo contenido con otra fecha
+    else:
+        try:
+            brands_data, catalog_data = (json.loads(data.decode('utf-8-sig')) for data in raw)
+        except ValueError as e:
+            raise CatalogError(f"JSON invalido: {e}") from None
+        catalog = validate(brands_data, catalog_data)
+    try:
+        _write_snapshot(snapshot_file, {'version': version, 'stats': stats, 'hashes': hashes, 'catalog': catalog})
+    except OSError:
+        pass  # sin caché se sigue funcionando, solo más lento
+    return catalog
+
+
+if __name__ == "__main__":
+    try:
+        catalog = load_catalog()
+    except CatalogError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    print(f"[OK] Catalogo valido: {len(catalog)} marcas, {len(catalog.with_models())} con modelos, "
+          f"{len(catalog.models)} modelos")
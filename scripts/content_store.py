@@ -0,0 +1,886 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Almacén único de fragmentos HTML generados por IA
+#
+# Cada fragmento se identifica por (tipo, marca, modelo, reparación):
+#   brand_intro    (marca)                 introducción de la marca
+#   model_intro    (marca, modelo)         introducción completa del modelo
+#   model_lead     (marca, modelo)         párrafo propio del modelo (sin la
+#                                          parte técnica, ver spec_plan)
+#   spec_block     (-, firma)              bloque técnico compartido por los
+#                                          modelos con las mismas
+#                                          especificaciones (sin marca)
+#   diagnosis      (marca)                 tarjetas de diagnóstico
+#   repair_guides  (marca)                 resumen de guías de reparación
+#   repair_guide   (marca, reparación)     guía de una reparación (incluye
+#                                          'cambiar-valvula')
+#
+# data/content_store.jsonl es un registro de solo-anexado (una línea JSON por
+# fragmento; la última gana). Cada escritura es un único write() + fsync bajo
+# un bloqueo de archivo entre procesos, así que un corte solo puede dejar una
+# última línea incompleta, que se ignora. En .build_cache/ se mantiene un
+# índice SQLite clave -> (offset, longitud) sobre el registro: leer un
+# fragmento es una búsqueda en el índice y un seek, sin parsear el resto, y
+# abrir el almacén no depende de su tamaño (solo se indexa lo anexado desde
+# la última vez). El índice se reconstruye solo si el registro cambió por
+# fuera (checkout, compactación en otro proceso); un lector que todavía
+# tiene abierto el archivo reemplazado lo detecta al leer (otro inodo, o un
+# registro que no se puede leer en su offset) y se resincroniza.
+#
+# Cada almacén abierto toma un bloqueo compartido sobre <registro>.users.
+# Al cerrar, solo se compacta si se consigue ese bloqueo en exclusiva, es
+# decir, si ningún otro proceso (p. ej. los generadores que el pipeline
+# corre en paralelo) tiene el almacén abierto. msvcrt (Windows) no tiene
+# bloqueos compartidos: cada almacén toma uno de los USER_SLOTS primeros
+# bytes del archivo, y queda en exclusiva quien consigue todos los demás.
+# En Windows los bloqueos se reintentan cada LOCK_RETRY_SECONDS hasta
+# conseguirlos (LK_LOCK se rinde a los 10 segundos).
+#
+# Cada registro guarda además la huella de lo que lo produjo (hash del
+# prompt, modelo y generationConfig, ver gemini_client.prompt_fingerprint).
+# Un fragmento cuya huella no coincide con la del prompt actual está
+# desactualizado y se puede regenerar de forma selectiva (regenerate.py).
+#
+# El cuerpo de cada fragmento se guarda comprimido (zlib, base64) y direccionado
+# por contenido: el registro lleva el hash del HTML y, solo la primera vez que
+# aparece ese hash, el cuerpo. Los fragmentos idénticos guardan únicamente la
+# referencia. La compresión usa un diccionario entrenado con los propios
+# fragmentos (las líneas que más se repiten entre ellos: clases de Tailwind,
+# estructura de las guías), guardado como un registro más al comienzo del
+# archivo; compact --retrain lo vuelve a entrenar y recomprime todo. El cuerpo
+# se descomprime recién al leer el fragmento. Los registros con 'html' plano
+# (formato anterior) se siguen leyendo y la compactación los convierte.
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / 'data'
+BUILD_CACHE_DIR = BASE_DIR / '.build_cache'
+
+CONTENT_STORE_FILE = DATA_DIR / 'content_store.jsonl'
+
+# Versión del esquema del índice (al cambiar se reconstruye)
+INDEX_VERSION = 3
+
+# Diccionario de compresión: tamaño máximo (la ventana de zlib) y fragmentos
+# mínimos para entrenarlo
+DICT_SIZE = 32 * 1024
+DICT_MIN_FRAGMENTS = 8
+DICT_MIN_LINE = 8
+COMPRESS_LEVEL = 9
+
+# Bloqueos en Windows (ver file_lock y ContentStore._sole_user)
+USER_SLOTS = 64
+LOCK_RETRY_SECONDS = 0.1
+
+KINDS = ('brand_intro', 'model_intro', 'model_lead', 'spec_block', 'diagnosis', 'repair_guides', 'repair_guide')
+
+# Archivos de caché anteriores (uno por generador, con claves distintas)
+LEGACY_FILES = {
+    'generated_content': DATA_DIR / 'generated_content.json',
+    'sections_content': DATA_DIR / 'sections_content.json',
+    'repair_pages_content': DATA_DIR / 'repair_pages_content.json',
+    'valvula_content': DATA_DIR / 'valvula_content.json',
+}
+
+
+def content_key(kind, brand, model=None, repair=None):
+    """Clave de un fragmento: 'tipo|marca|modelo|reparación' (marca = slug)"""
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de contenido desconocido: {kind}")
+    return '|'.join((kind, brand, model or '', repair or ''))
+
+
+def split_key(key):
+    """Inversa de content_key(): (tipo, marca, modelo, reparación)"""
+    kind, brand, model, repair = key.split('|')
+    return kind, brand, model or None, repair or None
+
+
+def key_brand(key):
+    """Marca de una clave (las peticiones a la IA se agrupan por marca)"""
+    return key.split('|', 2)[1]
+
+
+def _try_lock_byte(f, offset):
+    """Windows: bloquea un byte del archivo sin esperar; False si está tomado"""
+    f.seek(offset)
+    try:
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock_byte(f, offset):
+    f.seek(offset)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    """Bloqueo exclusivo entre procesos sobre un archivo .lock (espera lo que haga falta)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            while not _try_lock_byte(f, 0):
+                time.sleep(LOCK_RETRY_SECONDS)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                _unlock_byte(f, 0)
+
+
+def write_atomic(path, data, newline=None):
+    """Escribe texto (utf-8) o bytes vía archivo temporal + os.replace
+
+    Nunca abre el archivo existente para escribir: quien lo lee ve la versión
+    anterior o la nueva entera, y en una preparación de publish.py el enlace
+    duro a la generación publicada queda intacto. newline como en open().
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if isinstance(data, bytes):
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path, data):
+    """Escribe un JSON con el formato de save_json() de forma atómica"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def content_hash(html):
+    """Hash del HTML de un fragmento (identifica los cuerpos idénticos)"""
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()[:32]
+
+
+def train_dictionary(htmls, size=DICT_SIZE):
+    """Diccionario de zlib con las líneas que más bytes se repiten entre fragmentos
+
+    Las más valiosas van al final, donde zlib las alcanza con distancias cortas.
+    """
+    counts = Counter()
+    for html in htmls:
+        counts.update({line.strip() for line in html.splitlines() if len(line.strip()) >= DICT_MIN_LINE})
+    candidates = sorted(((n - 1) * len(line.encode('utf-8')), line) for line, n in counts.items() if n > 1)
+    chosen = []
+    total = 0
+    for _, line in reversed(candidates):
+        length = len(line.encode('utf-8')) + 1
+        if total + length <= size:
+            chosen.append(line)
+            total += length
+    return '\n'.join(reversed(chosen)).encode('utf-8')
+
+
+def dictionary_id(zdict):
+    return hashlib.sha256(zdict).hexdigest()[:16]
+
+
+def compress(html, zdict=None):
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zdict=zdict) if zdict else zlib.compressobj(COMPRESS_LEVEL)
+    return compressor.compress(html.encode('utf-8')) + compressor.flush()
+
+
+def decompress(body, zdict=None):
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(body) + decompressor.flush()).decode('utf-8')
+
+
+def _fragment_line(key, fingerprint, sha, body=None, dict_id=None):
+    """Registro de un fragmento: con su cuerpo comprimido, o solo el hash si el cuerpo ya está"""
+    kind, brand, model, repair = split_key(key)
+    record = {'kind': kind, 'brand': brand, 'model': model, 'repair': repair,
+              'fingerprint': fingerprint, 'sha': sha}
+    if body is not None:
+        record['dict'] = dict_id
+        record['z'] = base64.b64encode(body).decode('ascii')
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _dictionary_line(dict_id, zdict):
+    record = {'dictionary': dict_id, 'data': base64.b64encode(zdict).decode('ascii')}
+    return (json.dumps(record) + '\n').encode('utf-8')
+
+
+def _record_line(key, html=None, fingerprint=None, deleted=False):
+    """Registro sin comprimir (formato anterior) o de borrado"""
+    kind, brand, model, repair = split_key(key)
+    record = {'kind': kind, 'brand': brand, 'model': model, 'repair': repair}
+    if deleted:
+        record['deleted'] = True
+    else:
+        record['fingerprint'] = fingerprint
+        record['html'] = html
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class IndexMismatch(Exception):
+    """El índice apunta a un registro que no está donde dice (el archivo cambió por fuera)"""
+
+
+class ContentStore(MutableMapping):
+    """Registro de fragmentos + índice de offsets; se usa como un dict clave -> HTML"""
+
+    def __init__(self, path=CONTENT_STORE_FILE, cache_dir=BUILD_CACHE_DIR):
+        self.path = Path(path)
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.lock_path = cache_dir / f'{self.path.stem}.lock'
+        self._db = sqlite3.connect(cache_dir / f'{self.path.stem}.idx')
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._db.executescript(f"""
+                DROP TABLE IF EXISTS entries;
+                DROP TABLE IF EXISTS bodies;
+                DROP TABLE IF EXISTS dictionaries;
+                DROP TABLE IF EXISTS meta;
+                PRAGMA user_version = {INDEX_VERSION};
+            """)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, kind TEXT, brand TEXT, fingerprint TEXT, sha TEXT,
+                offset INTEGER, length INTEGER);
+            CREATE INDEX IF NOT EXISTS entries_kind_brand ON entries (kind, brand);
+            CREATE TABLE IF NOT EXISTS bodies (sha TEXT PRIMARY KEY, offset INTEGER, length INTEGER);
+            CREATE TABLE IF NOT EXISTS dictionaries (id TEXT PRIMARY KEY, offset INTEGER, length INTEGER);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+        """)
+        self._reader = None
+        self._dictionaries = {}
+        self._users = open(cache_dir / f'{self.path.stem}.users', 'a+b')
+        self._slot = None
+        if fcntl:
+            fcntl.flock(self._users.fileno(), fcntl.LOCK_SH)
+        else:
+            self._slot = self._take_user_slot()
+        with file_lock(self.lock_path):
+            self._sync_index()
+
+    # --- Índice ---
+
+    def _meta(self, name):
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, size, mtime_ns):
+        self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             [('size', size), ('mtime_ns', mtime_ns)])
+
+    def _sync_index(self):
+        """Pone el índice al día con el registro (llamar con el bloqueo tomado)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        size = st.st_size if st else 0
+        mtime_ns = st.st_mtime_ns if st else 0
+        indexed = self._meta('size') or 0
+
+        if indexed == size and self._meta('mtime_ns') == mtime_ns:
+            return
+        if 0 < indexed < size and self._byte_at(indexed - 1) == b'\n':
+            # Solo se anexaron registros: indexar la cola
+            start = indexed
+        else:
+            # Registro reescrito o desconocido: reconstruir
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM bodies")
+            self._db.execute("DELETE FROM dictionaries")
+            start = 0
+
+        end = self._index_from(start)
+        self._set_meta(end, mtime_ns if end == size else 0)
+        self._db.commit()
+        self._close_reader()
+
+    def _byte_at(self, offset):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(1)
+
+    def _index_from(self, offset):
+        """Indexa los registros completos desde `offset`; devuelve dónde termina el último"""
+        if not self.path.exists():
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # escritura interrumpida: se ignora
+                try:
+                    self._index_line(line, offset)
+                except (ValueError, KeyError):
+                    pass  # línea dañada (cerrada tras un corte)
+                offset += len(line)
+        return offset
+
+    def _index_line(self, line, offset):
+        record = json.loads(line)
+        if 'dictionary' in record:
+            self._db.execute("INSERT OR REPLACE INTO dictionaries VALUES (?, ?, ?)",
+                             (record['dictionary'], offset, len(line)))
+            return
+        key = content_key(record['kind'], record['brand'], record['model'], record['repair'])
+        if record.get('deleted'):
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return
+        kind, brand, _, _ = split_key(key)
+        sha = record.get('sha')
+        self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, kind, brand, record.get('fingerprint'), sha, offset, len(line)))
+        if 'z' in record:
+            self._db.execute("INSERT OR REPLACE INTO bodies VALUES (?, ?, ?)", (sha, offset, len(line)))
+
+    def _resync(self):
+        """Otro proceso compactó el registro: reconstruir el índice"""
+        with file_lock(self.lock_path):
+            self._db.execute("DELETE FROM meta")
+            self._sync_index()
+
+    # --- Lectura ---
+
+    def _close_reader(self):
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+        self._dictionaries.clear()
+
+    def _reader_replaced(self):
+        """El archivo abierto para leer ya no es el registro (otro proceso lo compactó)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self._reader.fileno())
+        return (opened.st_ino, opened.st_dev) != (st.st_ino, st.st_dev)
+
+    def _read_record(self, offset, length):
+        """Registro JSON en (offset, longitud); IndexMismatch si no coincide con el registro"""
+        if self._reader is not None and self._reader_replaced():
+            self._close_reader()
+        try:
+            if self._reader is None:
+                self._reader = open(self.path, 'rb')
+            self._reader.seek(offset)
+            return json.loads(self._reader.read(length))
+        except (OSError, ValueError) as e:
+            raise IndexMismatch(f"{self.path.name}@{offset}") from e
+
+    def _dictionary(self, dict_id):
+        """Diccionario de compresión por id (se lee una vez)"""
+        if dict_id is None:
+            return None
+        if dict_id not in self._dictionaries:
+            row = self._db.execute("SELECT offset, length FROM dictionaries WHERE id = ?", (dict_id,)).fetchone()
+            if row is None:
+                raise IndexMismatch(f"diccionario {dict_id}")
+            self._dictionaries[dict_id] = base64.b64decode(self._read_record(*row)['data'])
+        return self._dictionaries[dict_id]
+
+    def _current_dictionary(self):
+        """(id, datos) del último diccionario del registro, o (None, None)"""
+        row = self._db.execute("SELECT id FROM dictionaries ORDER BY offset DESC LIMIT 1").fetchone()
+        return (row[0], self._dictionary(row[0])) if row else (None, None)
+
+    def _load(self, key):
+        """HTML de un fragmento, o None si el índice no coincide con el registro"""
+        try:
+            return self._load_record(key)
+        except IndexMismatch:
+            self._close_reader()
+            return None
+
+    def _load_record(self, key):
+        row = self._db.execute("""
+            SELECT e.sha, e.offset, e.length, b.offset, b.length
+            FROM entries e LEFT JOIN bodies b ON b.sha = e.sha WHERE e.key = ?
+        """, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        sha, offset, length, body_offset, body_length = row
+        if sha is None:
+            # Registro sin comprimir (formato anterior)
+            record = self._read_record(offset, length)
+            if content_key(record['kind'], record['brand'], record['model'], record['repair']) != key:
+                return None
+            return record['html']
+        record = self._read_record(body_offset, body_length) if body_offset is not None else None
+        if record is None or record.get('sha') != sha:
+            return None
+        return decompress(base64.b64decode(record['z']), self._dictionary(record['dict']))
+
+    def __getitem__(self, key):
+        html = self._load(key)
+        if html is None:
+            self._resync()
+            html = self._load(key)
+            if html is None:
+                raise KeyError(key)
+        return html
+
+    def __contains__(self, key):
+        return self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def __iter__(self):
+        return iter([row[0] for row in self._db.execute("SELECT key FROM entries ORDER BY offset")])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def keys_for(self, kind=None, brand=None):
+        """Claves filtradas por tipo y/o marca, en orden de escritura"""
+        query = "SELECT key FROM entries WHERE (? IS NULL OR kind = ?) AND (? IS NULL OR brand = ?) ORDER BY offset"
+        return [row[0] for row in self._db.execute(query, (kind, kind, brand, brand))]
+
+    def fingerprint(self, key):
+        """Huella con la que se generó un fragmento (None si se desconoce)"""
+        row = self._db.execute("SELECT fingerprint FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def stale(self, expected):
+        """Claves presentes cuya huella no coincide con la esperada
+
+        expected: dict clave -> huella actual (las claves ausentes no cuentan)
+        """
+        return [key for key in expected if key in self and self.fingerprint(key) != expected[key]]
+
+    # --- Escritura ---
+
+    def _append(self, make_line):
+        """Anexa el registro que arma make_line() con el índice ya al día, y lo indexa"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            self._sync_index()
+            line = make_line()
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                offset = os.fstat(fd).st_size
+                # Una línea incompleta de un corte anterior se cierra antes de anexar
+                if offset and self._byte_at(offset - 1) != b'\n':
+                    os.write(fd, b'\n')
+                    offset += 1
+                os.write(fd, line)
+                os.fsync(fd)
+                st = os.fstat(fd)
+            finally:
+                os.close(fd)
+            self._index_line(line, offset)
+            self._set_meta(st.st_size, st.st_mtime_ns)
+            self._db.commit()
+
+    def put(self, key, html, fingerprint=None):
+        """Guarda un fragmento junto con la huella de su prompt"""
+        sha = content_hash(html)
+        row = self._db.execute("SELECT sha, fingerprint FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[1] == fingerprint and (row[0] == sha or row[0] is None and self[key] == html):
+            return
+
+        def make_line():
+            # Un cuerpo idéntico ya guardado se referencia por su hash
+            if self._db.execute("SELECT 1 FROM bodies WHERE sha = ?", (sha,)).fetchone():
+                return _fragment_line(key, fingerprint, sha)
+            dict_id, zdict = self._current_dictionary()
+            return _fragment_line(key, fingerprint, sha, compress(html, zdict), dict_id)
+
+        self._append(make_line)
+
+    def __setitem__(self, key, html):
+        self.put(key, html)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._append(lambda: _record_line(key, deleted=True))
+
+    # --- Mantenimiento ---
+
+    def live_bytes(self):
+        """Bytes de los registros vigentes: los de cada clave, los cuerpos que referencian y el diccionario"""
+        entries = self._db.execute("SELECT COALESCE(SUM(length), 0) FROM entries").fetchone()[0]
+        bodies = self._db.execute("""
+            SELECT COALESCE(SUM(length), 0) FROM bodies
+            WHERE sha IN (SELECT sha FROM entries) AND offset NOT IN (SELECT offset FROM entries)
+        """).fetchone()[0]
+        dictionary = self._db.execute(
+            "SELECT COALESCE(length, 0) FROM dictionaries ORDER BY offset DESC LIMIT 1").fetchone()
+        return entries + bodies + (dictionary[0] if dictionary else 0)
+
+    def compact(self, force=False, retrain=False):
+        """Reescribe el registro solo con la última versión de cada fragmento
+
+        Sin force, solo compacta si más de la mitad del registro son versiones
+        reemplazadas o borradas. Cada cuerpo queda una sola vez, comprimido
+        con el diccionario actual; con retrain (o si todavía no hay uno y hay
+        suficientes fragmentos) se entrena uno nuevo y se recomprime todo.
+        """
+        with file_lock(self.lock_path):
+            self._sync_index()
+            size = self.path.stat().st_size if self.path.exists() else 0
+            if not force and not retrain and size <= 2 * self.live_bytes():
+                return False
+            rows = self._db.execute("SELECT key, fingerprint, sha FROM entries ORDER BY offset").fetchall()
+            htmls = {key: self._load(key) for key, _, _ in rows}
+            dict_id, zdict = self._current_dictionary()
+            if retrain or (zdict is None and len(rows) >= DICT_MIN_FRAGMENTS):
+                zdict = train_dictionary(dict.fromkeys(htmls.values())) or None
+                # Sin líneas repetidas no hay diccionario: se comprime sin él
+                dict_id = dictionary_id(zdict) if zdict else None
+
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'wb') as dst:
+                if zdict:
+                    dst.write(_dictionary_line(dict_id, zdict))
+                written = set()
+                for key, fingerprint, _ in rows:
+                    sha = content_hash(htmls[key])
+                    if sha in written:
+                        dst.write(_fragment_line(key, fingerprint, sha))
+                    else:
+                        written.add(sha)
+                        dst.write(_fragment_line(key, fingerprint, sha, compress(htmls[key], zdict), dict_id))
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, self.path)
+            self._db.execute("DELETE FROM meta")
+            self._sync_index()
+            return True
+
+    def export_legacy(self, out_dir=DATA_DIR):
+        """Exporta los fragmentos a los cuatro JSON anteriores, con sus claves"""
+        files = {name: {} for name in LEGACY_FILES}
+        for key in self:
+            kind, brand, model, repair = split_key(key)
+            html = self[key]
+            if kind == 'brand_intro':
+                files['generated_content'][f"brand_intro_{brand}"] = html
+                files['sections_content'][f"brand_intro_{brand}"] = html
+            elif kind == 'model_intro':
+                files['generated_content'][f"model_intro_{brand}_{model}"] = html
+                files['sections_content'][f"model_intro_{brand}_{model}"] = html
+            elif kind in ('diagnosis', 'repair_guides'):
+                files['sections_content'][f"{kind}_{brand}"] = html
+            elif kind in ('model_lead', 'spec_block'):
+                continue  # Sin equivalente en los JSON anteriores
+            elif repair == 'cambiar-valvula':
+                files['valvula_content'][f"{brand}_cambiar_valvula"] = html
+            else:
+                files['repair_pages_content'][f"{brand}_{repair}"] = html
+        for name, data in files.items():
+            write_json_atomic(Path(out_dir) / LEGACY_FILES[name].name, data)
+        return {name: len(data) for name, data in files.items()}
+
+    def _take_user_slot(self):
+        """Windows: toma un byte libre de <registro>.users (el bloqueo compartido)"""
+        while True:
+            for slot in range(USER_SLOTS):
+                if _try_lock_byte(self._users, slot):
+                    return slot
+            time.sleep(LOCK_RETRY_SECONDS)
+
+    def _sole_user(self):
+        """True si ningún otro almacén abierto usa este registro (queda en exclusiva)"""
+        if fcntl:
+            try:
+                fcntl.flock(self._users.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+            return True
+        # Windows: tomar todos los demás bytes; los nuevos almacenes esperan
+        # a que se liberen al cerrar este
+        taken = []
+        for slot in range(USER_SLOTS):
+            if slot == self._slot:
+                continue
+            if not _try_lock_byte(self._users, slot):
+                for other in taken:
+                    _unlock_byte(self._users, other)
+                return False
+            taken.append(slot)
+        return True
+
+    def close(self):
+        # Compactar reemplaza el archivo: no mientras otros lo tengan abierto
+        if self._sole_user():
+            self.compact()
+        self._close_reader()
+        self._db.close()
+        self._users.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Migración desde los cuatro JSON anteriores ---
+
+def _split_slug(rest, slugs):
+    """Separa '<slug>_<resto>' usando la lista de slugs conocidos"""
+    for slug in sorted(slugs, key=len, reverse=True):
+        if rest.startswith(slug + '_'):
+            return slug, rest[len(slug) + 1:]
+    return None, None
+
+
+def legacy_key(source, key, slugs):
+    """Clave del almacén para una clave de los JSON anteriores, o None"""
+    for kind in ('brand_intro', 'diagnosis', 'repair_guides'):
+        if key.startswith(kind + '_') and key[len(kind) + 1:] in slugs:
+            return content_key(kind, key[len(kind) + 1:])
+    if key.startswith('model_intro_'):
+        slug, model = _split_slug(key[len('model_intro_'):], slugs)
+        return content_key('model_intro', slug, model) if slug else None
+    slug, repair = _split_slug(key, slugs)
+    if slug is None:
+        return None
+    if source == 'valvula_content' and repair == 'cambiar_valvula':
+        return content_key('repair_guide', slug, repair='cambiar-valvula')
+    if source == 'repair_pages_content':
+        return content_key('repair_guide', slug, repair=repair)
+    return None
+
+
+def published_page(key, public_dir):
+    """Página publicada que incluye el fragmento, si la hay"""
+    kind, brand, model, repair = split_key(key)
+    if kind == 'brand_intro':
+        return public_dir / brand / 'index.html'
+    if kind == 'model_intro':
+        return public_dir / brand / 'modelos' / f'{model}.html'
+    if kind == 'repair_guide':
+        return public_dir / brand / 'reparaciones' / f'{repair}.html'
+    return None
+
+
+def _is_published(key, html, public_dir):
+    page = published_page(key, public_dir)
+    if page is None or not page.exists():
+        return False
+    with open(page, 'r', encoding='utf-8') as f:
+        return html.strip() in f.read()
+
+
+def migrate_legacy(store, data_dir=DATA_DIR, public_dir=BASE_DIR / 'public'):
+    """Copia los cuatro JSON anteriores al almacén
+
+    Un mismo fragmento presente en dos archivos (p. ej. brand_intro_{slug} en
+    generated_content.json y sections_content.json) se guarda una sola vez.
+    Si las versiones difieren se conserva la que está publicada en public/,
+    o la del primer archivo si ninguna lo está. Devuelve un informe.
+    """
+    with open(Path(data_dir) / 'brands.json', 'r', encoding='utf-8-sig') as f:
+        slugs = {brand.replace(' ', '-').lower() for brand in json.load(f)}
+
+    merged = {}
+    origin = {}
+    report = {'migrated': 0, 'identical': [], 'conflicts': [], 'unknown': []}
+
+    for source, path in LEGACY_FILES.items():
+        path = Path(data_dir) / path.name
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            legacy = json.load(f)
+        for old_key, html in legacy.items():
+            key = legacy_key(source, old_key, slugs)
+            if key is None:
+                report['unknown'].append(f"{source}:{old_key}")
+                continue
+            if key not in merged:
+                merged[key] = html
+                origin[key] = source
+            elif merged[key] == html:
+                report['identical'].append(key)
+            else:
+                keep_new = _is_published(key, html, public_dir) and not _is_published(key, merged[key], public_dir)
+                kept = source if keep_new else origin[key]
+                report['conflicts'].append((key, origin[key], source, kept))
+                if keep_new:
+                    merged[key] = html
+                    origin[key] = source
+
+    for key, html in merged.items():
+        store[key] = html
+    report['migrated'] = len(merged)
+    return report
+
+
+def _check_fragments(tag, count, shared=True):
+    """Fragmentos de prueba; con shared comparten líneas (hay diccionario que entrenar)"""
+    common = ['<div class="bg-white rounded-xl shadow-sm border-2 border-gray-200 p-6">',
+              '<p class="text-gray-600 mb-5 leading-relaxed">Revisar la resistencia y el termostato.</p>']
+    fragments = {}
+    for i in range(count):
+        body = f'<h3>{tag} {i}</h3>\n<p>Fragmento {tag}-{i}: {"x" * (i % 7)}</p>'
+        fragments[content_key('diagnosis', f'marca-{i}')] = '\n'.join(common + [body, '</div>']) if shared else body
+    return fragments
+
+
+def self_check():
+    """Recorre anexado, deduplicación, borrado, compactación, rotación del
+    diccionario y resincronización en un directorio temporal; devuelve los
+    fallos
+    """
+    failures = []
+
+    def check(name, ok):
+        print(f"  {'[OK]' if ok else '[ERROR]'} {name}")
+        if not ok:
+            failures.append(name)
+
+    def reads(store, expected):
+        try:
+            return len(store) == len(expected) and all(store[key] == html for key, html in expected.items())
+        except KeyError:
+            return False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        path, cache = tmp / 'prueba.jsonl', tmp / 'cache'
+        expected = _check_fragments('a', 40)
+
+        with ContentStore(path, cache) as store:
+            for key, html in expected.items():
+                store[key] = html
+            check("anexar y leer", reads(store, expected))
+
+            # Mismo HTML en otra clave: solo se anexa la referencia
+            twin = content_key('diagnosis', 'gemela')
+            size = path.stat().st_size
+            store[twin] = expected[content_key('diagnosis', 'marca-0')]
+            expected[twin] = store[twin]
+            bodies = store._db.execute("SELECT COUNT(*) FROM bodies").fetchone()[0]
+            check("deduplicar cuerpos identicos",
+                  bodies == len(set(expected.values())) and path.stat().st_size - size < 300)
+
+            del store[twin]
+            del expected[twin]
+            updated = _check_fragments('b', 10)
+            for key, html in updated.items():
+                store[key] = html
+            expected.update(updated)
+            check("reemplazar y borrar (la ultima version gana)", reads(store, expected) and twin not in store)
+
+            size = path.stat().st_size
+            check("compactar", store.compact(force=True) and path.stat().st_size < size and reads(store, expected))
+            first_dict = store._current_dictionary()[0]
+            check("entrenar diccionario al compactar", first_dict is not None)
+
+        # Índice reconstruido desde cero sobre el registro compactado
+        (cache / 'prueba.idx').unlink()
+        with ContentStore(path, cache) as store:
+            check("reconstruir el indice", reads(store, expected))
+
+            rotated = _check_fragments('c', 40)
+            for key, html in rotated.items():
+                store[key] = html.replace('shadow-sm', 'shadow-lg')
+                expected[key] = store[key]
+            store.compact(retrain=True)
+            check("rotar el diccionario", store._current_dictionary()[0] not in (None, first_dict)
+                  and reads(store, expected))
+
+        # Otro almacén compacta mientras este tiene el registro abierto
+        reader = ContentStore(path, cache)
+        reader[next(iter(expected))]  # abre el lector sobre el archivo actual
+        with ContentStore(path, cache) as other:
+            other[content_key('diagnosis', 'otra')] = expected[content_key('diagnosis', 'otra')] = '<p>otra</p>'
+            other.compact(force=True)
+        check("resincronizar tras una compactacion ajena", reads(reader, expected))
+        reader.close()
+
+        # Una línea incompleta (corte durante una escritura) se ignora
+        with open(path, 'ab') as f:
+            f.write(b'{"kind": "diagnosis", "brand": "cort')
+        with ContentStore(path, cache) as store:
+            store[content_key('diagnosis', 'tras-corte')] = expected[content_key('diagnosis', 'tras-corte')] = '<p>ok</p>'
+            check("ignorar una linea incompleta", reads(store, expected))
+
+        # Sin líneas repetidas no hay diccionario, y se lee igual
+        plain_path = tmp / 'plano.jsonl'
+        plain = _check_fragments('d', 20, shared=False)
+        with ContentStore(plain_path, cache) as store:
+            for key, html in plain.items():
+                store[key] = html
+            store.compact(retrain=True)
+        with ContentStore(plain_path, cache) as store:
+            check("compactar sin diccionario", reads(store, plain))
+    return failures
+
+
+if __name__ == "__main__":
+    # python scripts/content_store.py migrate        (JSON anteriores -> almacén)
+    # python scripts/content_store.py export [dir]   (almacén -> JSON anteriores)
+    # python scripts/content_store.py compact [--retrain]
+    # python scripts/content_store.py check          (prueba el almacén en un directorio temporal)
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command not in ('migrate', 'export', 'compact', 'check'):
+        print("Uso: content_store.py migrate | export [directorio] | compact [--retrain] | check")
+        sys.exit(1)
+
+    if command == 'check':
+        print("[*] Verificando el almacen de fragmentos...")
+        failures = self_check()
+        if failures:
+            print(f"[ERROR] {len(failures)} comprobaciones fallaron")
+            sys.exit(1)
+        print("[OK] Almacen verificado")
+        sys.exit(0)
+
+    store = ContentStore()
+    if command == 'migrate':
+        report = migrate_legacy(store)
+        print(f"[OK] {report['migrated']} fragmentos en {store.path}")
+        print(f"[*] Duplicados identicos: {len(report['identical'])}")
+        print(f"[*] Duplicados con contenido distinto: {len(report['conflicts'])}")
+        for key, first, second, kept in report['conflicts']:
+            print(f"    - {key}: {first} vs {second} -> se conserva {kept}")
+        for item in report['unknown']:
+            print(f"[!] Clave no reconocida: {item}")
+    elif command == 'export':
+        out_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else DATA_DIR
+        for name, count in store.export_legacy(out_dir).items():
+            print(f"[OK] {name}.json: {count} entradas")
+    else:
+        before = store.path.stat().st_size if store.path.exists() else 0
+        if store.compact(force=True, retrain="--retrain" in sys.argv):
+            print(f"[OK] Registro compactado: {before:,d} -> {store.path.stat().st_size:,d} bytes")
+        else:
+            print("[*] Nada que compactar")
+    store.close()
@@ -0,0 +1,493 @@
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import build_profile
+
+# Cliente asíncrono compartido para la API de Gemini
+#
+# Todos los generadores piden su contenido a través de este módulo. Las
+# peticiones se lanzan en paralelo (cada POST corre en un hilo propio) con:
+#   - un límite de concurrencia,
+#   - una cubeta de tokens sobre peticiones por minuto y otra sobre tokens
+#     por minuto, para que el tiempo total lo marque la cuota y no la
+#     latencia × cantidad de peticiones,
+#   - control AIMD: ante un 429/503 la concurrencia y el ritmo se reducen a
+#     la mitad y todas las peticiones se pausan (Retry-After si el servidor
+#     lo indica); cada respuesta correcta los vuelve a subir de a poco.
+# Con generate_all(..., group_by=...) los prompts de un mismo grupo (p. ej.
+# las secciones de una marca) se piden juntos en una sola petición con
+# respuesta JSON (responseSchema: una propiedad de texto por sección) y se
+# separan de nuevo en fragmentos individuales; las partes que faltan o no
+# validan se vuelven a pedir una por una. Cada fragmento conserva la huella
+# de su prompt individual, así que el almacén no distingue cómo se generó.
+# La clave se lee de GEMINI_API_KEY y no tiene valor por defecto: si hay
+# que pedir algo a la API y no está definida, el cliente falla con
+# MissingApiKeyError antes de la primera petición. GEMINI_API_URL permite
+# apuntar el cliente a un servidor local de pruebas (ver
+# gemini_stub_server.py), que no necesita clave.
+
+DEFAULT_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+GEMINI_API_URL = os.environ.get('GEMINI_API_URL', DEFAULT_API_URL)
+# Nombre del modelo (forma parte de la huella de cada fragmento generado)
+_model_match = re.search(r'models/([^/:]+)', GEMINI_API_URL)
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL') or (_model_match.group(1) if _model_match else GEMINI_API_URL)
+
+# Límites por defecto (se pueden ajustar a la cuota de la cuenta)
+DEFAULT_CONCURRENCY = int(os.environ.get('GEMINI_CONCURRENCY', 8))
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get('GEMINI_RPM', 30))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get('GEMINI_TPM', 1000000))
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 2048,
+}
+
+# Peticiones por lotes: la salida de un lote no puede superar el máximo del
+# modelo, así que cada lote lleva como mucho BATCH_MAX_OUTPUT_TOKENS //
+# maxOutputTokens secciones (GEMINI_BATCH_PARTS=1 desactiva los lotes)
+BATCH_MAX_OUTPUT_TOKENS = 8192
+DEFAULT_BATCH_PARTS = int(os.environ.get('GEMINI_BATCH_PARTS',
+                                         BATCH_MAX_OUTPUT_TOKENS // GENERATION_CONFIG['maxOutputTokens']))
+BATCH_PROMPT_HEADER = (
+    "Vas a redactar varias secciones independientes. Cada sección empieza con una "
+    "línea '=== id ===' seguida de sus instrucciones; cumplí cada una por separado. "
+    "Respondé SOLO con un objeto JSON cuyas claves son los id y cuyo valor es el "
+    "texto pedido por esa sección."
+)
+
+# Códigos que indican saturación o cuota agotada (reducen el ritmo)
+THROTTLE_STATUS = (429, 503)
+# Códigos que se reintentan sin tocar el ritmo
+RETRY_STATUS = (500, 502, 504)
+
+# finishReason de un candidato bloqueado por los filtros (no se reintenta)
+BLOCK_FINISH_REASONS = ('SAFETY', 'RECITATION', 'BLOCKLIST', 'PROHIBITED_CONTENT', 'SPII')
+
+# AIMD: fracción mínima del ritmo configurado y aumento por respuesta correcta
+MIN_RATE_FACTOR = 1 / 16
+RATE_FACTOR_STEP = 0.05
+# Pausa base cuando el servidor no envía Retry-After
+THROTTLE_BASE_DELAY = 2.0
+MAX_BACKOFF = 60.0
+
+
+def prompt_fingerprint(prompt, model=GEMINI_MODEL, config=GENERATION_CONFIG):
+    """Huella de una petición: hash del prompt completo, el modelo y generationConfig
+
+    Dos peticiones con la misma huella producen contenido intercambiable;
+    si cambia el texto del prompt (plantilla o datos), el modelo o los
+    parámetros de muestreo, el fragmento guardado queda desactualizado.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps({'model': model, 'config': config}, sort_keys=True).encode('utf-8'))
+    h.update(b'\0')
+    h.update(prompt.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def estimate_tokens(prompt, max_output_tokens=GENERATION_CONFIG['maxOutputTokens']):
+    """Estimación de tokens de una petición (~4 caracteres por token + salida máxima)"""
+    return len(prompt) // 4 + max_output_tokens
+
+
+def batch_prompt(parts):
+    """Prompt combinado de un lote: parts es una lista de (id, prompt)"""
+    sections = [f"=== {part_id} ===\n{prompt.strip()}" for part_id, prompt in parts]
+    return BATCH_PROMPT_HEADER + "\n\n" + "\n\n".join(sections)
+
+
+def batch_generation_config(part_ids):
+    """generationConfig de un lote: salida JSON con una propiedad de texto por sección"""
+    return dict(
+        GENERATION_CONFIG,
+        maxOutputTokens=min(BATCH_MAX_OUTPUT_TOKENS, GENERATION_CONFIG['maxOutputTokens'] * len(part_ids)),
+        responseMimeType="application/json",
+        responseSchema={
+            "type": "OBJECT",
+            "properties": {part_id: {"type": "STRING"} for part_id in part_ids},
+            "required": list(part_ids),
+        },
+    )
+
+
+def parse_batch_response(text, part_ids):
+    """Separa la respuesta JSON de un lote: dict id -> texto (solo las partes válidas)"""
+    if not text:
+        return {}
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {part_id: data[part_id] for part_id in part_ids
+            if isinstance(data.get(part_id), str) and data[part_id].strip()}
+
+
+def plan_batches(keys, group_by=None, max_parts=DEFAULT_BATCH_PARTS):
+    """Agrupa las claves en lotes de como mucho max_parts claves del mismo grupo
+
+    Un grupo más grande se reparte en lotes de tamaño parejo (5 -> 3 + 2).
+    Sin group_by, o con max_parts <= 1, cada clave va en su propia petición.
+    """
+    if group_by is None or max_parts <= 1:
+        return [[key] for key in keys]
+    groups = {}
+    for key in keys:
+        groups.setdefault(group_by(key), []).append(key)
+    batches = []
+    for members in groups.values():
+        count = -(-len(members) // max_parts)
+        size, extra = divmod(len(members), count)
+        start = 0
+        for i in range(count):
+            end = start + size + (1 if i < extra else 0)
+            batches.append(members[start:end])
+            start = end
+    return batches
+
+
+def parse_retry_after(headers, body=None):
+    """Segundos a esperar según Retry-After o el RetryInfo de la respuesta, o None"""
+    value = headers.get('Retry-After') if headers else None
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, when.timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    # Gemini también informa la espera en error.details[].retryDelay ("37s")
+    if isinstance(body, dict):
+        for detail in body.get('error', {}).get('details', []):
+            match = re.fullmatch(r'([\d.]+)s', str(detail.get('retryDelay', '')))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def response_text(body):
+    """Texto del primer candidato de una respuesta, o None si viene vacía o incompleta"""
+    try:
+        text = body['candidates'][0]['content']['parts'][0]['text']
+    except (KeyError, IndexError, TypeError):
+        return None
+    return text if isinstance(text, str) and text.strip() else None
+
+
+def block_reason(body):
+    """Motivo por el que los filtros bloquearon el prompt o la respuesta, o None"""
+    reason = (body.get('promptFeedback') or {}).get('blockReason')
+    if reason:
+        return reason
+    candidates = body.get('candidates') or []
+    if candidates and isinstance(candidates[0], dict) and candidates[0].get('finishReason') in BLOCK_FINISH_REASONS:
+        return candidates[0]['finishReason']
+    return None
+
+
+class TokenBucket:
+    """Cubeta de tokens: se recarga a `per_minute` unidades por minuto"""
+
+    def __init__(self, per_minute, burst=None):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        # Ráfaga pequeña: en cualquier ventana de 60 s no se supera mucho la cuota
+        self.capacity = burst or max(1, per_minute // 10)
+        self.level = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, per_minute):
+        """Cambia el ritmo de recarga (usado por el control AIMD)"""
+        self._refill()
+        self.rate = per_minute / 60.0
+
+    async def acquire(self, amount=1):
+        """Espera hasta poder consumir `amount` unidades"""
+        # Una petición mayor que la ráfaga se admite cuando la cubeta está llena
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def adjust(self, amount):
+        """Devuelve (positivo) o descuenta (negativo) unidades tras conocer el consumo real"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class MissingApiKeyError(Exception):
+    """Hay contenido que pedir a la API de Gemini y no hay clave configurada"""
+
+
+class GeminiClient:
+    """Cliente de Gemini con concurrencia acotada y control de ritmo adaptativo"""
+
+    def __init__(self, api_url=GEMINI_API_URL, api_key=GEMINI_API_KEY,
+                 concurrency=DEFAULT_CONCURRENCY,
+                 requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries=5, timeout=60):
+        if not api_key and api_url == DEFAULT_API_URL:
+            raise MissingApiKeyError("GEMINI_API_KEY no esta definida: exportarla (o apuntar "
+                                     "GEMINI_API_URL a un servidor de pruebas) para generar contenido")
+        self.api_url = api_url
+        self.api_key = api_key
+        self.max_concurrency = max(1, concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute, burst=max(tokens_per_minute // 10, estimate_tokens('')))
+
+        # Estado AIMD: fracción del ritmo/concurrencia configurados
+        self.rate_factor = 1.0
+        self.concurrency_limit = self.max_concurrency
+        self.in_flight = 0
+        self.paused_until = 0.0
+        # Cada reducción abre una nueva época: los 429 de peticiones lanzadas
+        # antes de la última reducción no vuelven a reducir
+        self.epoch = 0
+        self._slots = asyncio.Condition()
+
+        self.stats = Counter()
+        self.latencies = []  # segundos de cada petición HTTP (también las que fallan)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._local = threading.local()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    # --- HTTP (en hilos del pool) ---
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _post(self, payload):
+        """POST bloqueante; devuelve (status, headers, cuerpo JSON o None)"""
+        response = self._session().post(
+            f"{self.api_url}?key={self.api_key}",
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self.timeout,
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, response.headers, body
+
+    # --- Control de concurrencia y ritmo ---
+
+    async def _acquire_slot(self):
+        """Espera una pausa global pendiente y un lugar libre en la ventana de concurrencia"""
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with self._slots:
+                if self.in_flight < self.concurrency_limit and self.paused_until <= time.monotonic():
+                    self.in_flight += 1
+                    return self.epoch
+                if self.in_flight >= self.concurrency_limit:
+                    await self._slots.wait()
+
+    async def _release_slot(self):
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    def _apply_rate_factor(self):
+        self.concurrency_limit = max(1, round(self.max_concurrency * self.rate_factor))
+        self.request_bucket.set_rate(self.requests_per_minute * self.rate_factor)
+
+    async def _on_success(self):
+        """Aumento aditivo"""
+        if self.rate_factor < 1.0:
+            self.rate_factor = min(1.0, self.rate_factor + RATE_FACTOR_STEP)
+            self._apply_rate_factor()
+            async with self._slots:
+                self._slots.notify_all()
+
+    def _on_throttle(self, epoch, retry_after, attempt):
+        """Reducción multiplicativa y pausa global"""
+        self.stats['throttled'] += 1
+        if epoch == self.epoch:
+            self.epoch += 1
+            self.rate_factor = max(MIN_RATE_FACTOR, self.rate_factor / 2)
+            self._apply_rate_factor()
+        if retry_after is None:
+            retry_after = min(MAX_BACKOFF, THROTTLE_BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.0)
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    # --- API pública ---
+
+    async def generate(self, prompt, generation_config=GENERATION_CONFIG):
+        """Genera texto para un prompt; devuelve None si la API falla tras los reintentos"""
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": generation_config,
+        }
+        estimate = estimate_tokens(prompt, generation_config['maxOutputTokens'])
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries):
+            if attempt:
+                self.stats['retries'] += 1
+            epoch = await self._acquire_slot()
+            sent = None
+            try:
+                await self.request_bucket.acquire()
+                await self.token_bucket.acquire(estimate)
+                self.stats['requests'] += 1
+                sent = time.monotonic()
+                status, headers, body = await loop.run_in_executor(self._executor, self._post, payload)
+            except requests.RequestException as e:
+                print(f"      [!] Exception: {str(e)[:50]}")
+                status, headers, body = None, {}, None
+            finally:
+                if sent is not None:
+                    self.latencies.append(time.monotonic() - sent)
+                await self._release_slot()
+
+            if status == 200:
+                if not isinstance(body, dict):
+                    body = {}
+                usage = body.get('usageMetadata', {}).get('totalTokenCount')
+                if usage:
+                    self.token_bucket.adjust(estimate - usage)
+                text = response_text(body)
+                if text:
+                    await self._on_success()
+                    self.stats['ok'] += 1
+                    return text
+                reason = block_reason(body)
+                if reason:
+                    # El mismo prompt se vuelve a bloquear: no se reintenta
+                    print(f"      [!] Respuesta bloqueada ({reason})")
+                    break
+                print("      [!] Respuesta sin texto")
+            elif status in THROTTLE_STATUS:
+                self._on_throttle(epoch, parse_retry_after(headers, body), attempt)
+                continue
+            elif status is not None and status not in RETRY_STATUS:
+                # Error del cliente (clave inválida, prompt rechazado...): no se reintenta
+                print(f"      [!] API Error {status}")
+                break
+            elif status is not None:
+                print(f"      [!] API Error {status}")
+
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(min(MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.0))
+
+        self.stats['failed'] += 1
+        return None
+
+    async def generate_batch(self, parts, validate=None):
+        """Genera varios prompts en una sola petición con respuesta JSON
+
+        parts: dict clave -> prompt; devuelve dict clave -> texto_o_None.
+        Las partes ausentes de la respuesta, o rechazadas por
+        validate(clave, texto), se piden de nuevo una por una.
+        """
+        if len(parts) == 1:
+            (key, prompt), = parts.items()
+            return {key: await self.generate(prompt)}
+
+        ids = {f"s{i}": key for i, key in enumerate(parts)}
+        text = await self.generate(batch_prompt([(part_id, parts[key]) for part_id, key in ids.items()]),
+                                   batch_generation_config(list(ids)))
+        self.stats['batches'] += 1
+        results = {ids[part_id]: part for part_id, part in parse_batch_response(text, ids).items()}
+        if validate:
+            results = {key: part for key, part in results.items() if validate(key, part)}
+
+        retry = [key for key in parts if key not in results]
+        if retry:
+            self.stats['split'] += len(retry)
+            texts = await asyncio.gather(*(self.generate(parts[key]) for key in retry))
+            results.update(zip(retry, texts))
+        return results
+
+    async def generate_many(self, prompts, on_result, batches=None, validate=None):
+        """Genera todos los prompts en paralelo
+
+        prompts: dict clave -> prompt
+        batches: lista de listas de claves que se piden juntas (ver
+        plan_batches); por defecto una petición por clave.
+        on_result(clave, texto_o_None) se llama en el hilo principal a medida
+        que se completa cada petición.
+        """
+        if batches is None:
+            batches = [[key] for key in prompts]
+
+        async def run(keys):
+            return await self.generate_batch({key: prompts[key] for key in keys}, validate)
+
+        tasks = [asyncio.create_task(run(keys)) for keys in batches]
+        for next_done in asyncio.as_completed(tasks):
+            for key, text in (await next_done).items():
+                on_result(key, text)
+
+    def print_summary(self, elapsed):
+        print(f"[*] API: {self.stats['ok']} ok, {self.stats['failed']} fallidas, "
+              f"{self.stats['throttled']} limitadas (429/503), {self.stats['requests']} peticiones "
+              f"({self.stats['retries']} reintentos) en {elapsed:.1f}s")
+        if self.stats['batches']:
+            print(f"[*] Lotes: {self.stats['batches']} peticiones combinadas, "
+                  f"{self.stats['split']} secciones pedidas de nuevo por separado")
+
+
+def generate_all(prompts, on_result, group_by=None, validate=None, batch_parts=DEFAULT_BATCH_PARTS, **options):
+    """Ejecuta generate_many() con un cliente nuevo y muestra el resumen
+
+    group_by(clave): las claves del mismo grupo se piden juntas, de a
+    batch_parts por petición (ver plan_batches).
+    validate(clave, texto): si devuelve False, la parte de un lote se pide
+    de nuevo por separado.
+    options: parámetros de GeminiClient (concurrency, requests_per_minute...)
+    """
+    if not prompts:
+        return
+    client = GeminiClient(**options)
+    batches = plan_batches(list(prompts), group_by, batch_parts)
+    print(f"[*] Generando {len(prompts)} secciones con IA en {len(batches)} peticiones "
+          f"(concurrencia {client.max_concurrency}, {client.requests_per_minute} peticiones/min)")
+    start = time.monotonic()
+    try:
+        asyncio.run(client.generate_many(prompts, on_result, batches, validate))
+    finally:
+        client.close()
+    client.print_summary(time.monotonic() - start)
+    build_profile.record_api(client.latencies, client.stats)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor local que imita generateContent de Gemini, para probar el cliente
+# y los generadores sin gastar cuota:
+#
+#   python scripts/gemini_stub_server.py --port 8765 --latency 1.5 --rpm 60 [--drop 0.1]
+#   GEMINI_API_URL=http://127.0.0.1:8765/v1beta/models/stub:generateContent \
+#       python scripts/build_repair_pages.py
+#
+# Responde cada prompt con un fragmento HTML determinista tras `latency`
+# segundos, y con 429 + Retry-After si se supera `rpm` en una ventana de 60 s.
+# Las peticiones por lotes (responseSchema) reciben un objeto JSON con el mismo
+# fragmento que habría recibido cada sección por separado; con --drop P cada
+# sección de un lote se omite con probabilidad P (prueba los reintentos).
+
+DEFAULT_PORT = 8765
+
+
+class StubState:
+    def __init__(self, latency, rpm, drop=0.0):
+        self.latency = latency
+        self.rpm = rpm
+        self.drop = drop
+        self.accepted = deque()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.served = 0
+        self.throttled = 0
+
+    def admit(self):
+        """Registra una petición; devuelve los segundos de Retry-After si se excede la cuota"""
+        with self.lock:
+            now = time.monotonic()
+            while self.accepted and now - self.accepted[0] >= 60:
+                self.accepted.popleft()
+            if self.rpm and len(self.accepted) >= self.rpm:
+                self.throttled += 1
+                return max(1, int(60 - (now - self.accepted[0])) + 1)
+            self.accepted.append(now)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return None
+
+    def done(self):
+        with self.lock:
+            self.in_flight -= 1
+            self.served += 1
+
+
+def fragment(prompt):
+    digest = hashlib.sha256(prompt.strip().encode('utf-8')).hexdigest()[:12]
+    return f'<p class="lead">Contenido de prueba {digest}.</p>'
+
+
+def batch_sections(prompt):
+    """Secciones de un prompt por lotes ('=== id ===' + instrucciones): dict id -> prompt"""
+    parts = re.split(r'^=== (\w+) ===\n', prompt, flags=re.MULTILINE)
+    return {parts[i]: parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+
+
+def make_handler(state):
+    class GeminiStubHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            prompt = payload.get('contents', [{}])[0].get('parts', [{}])[0].get('text', '')
+            schema = payload.get('generationConfig', {}).get('responseSchema')
+
+            retry_after = state.admit()
+            if retry_after is not None:
+                self._send(429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED'}},
+                           {'Retry-After': str(retry_after)})
+                return
+
+            try:
+                time.sleep(state.latency)
+                if schema:
+                    text = json.dumps({part_id: fragment(part) for part_id, part in batch_sections(prompt).items()
+                                       if random.random() >= state.drop})
+                else:
+                    text = fragment(prompt)
+                self._send(200, {
+                    'candidates': [{'content': {'parts': [{'text': text}]}}],
+                    'usageMetadata': {'totalTokenCount': len(prompt) // 4 + len(text) // 4},
+                })
+            finally:
+                state.done()
+
+        def log_message(self, format, *args):
+            pass
+
+    return GeminiStubHandler
+
+
+def arg_value(argv, name, default, cast):
+    if name in argv and argv.index(name) + 1 < len(argv):
+        return cast(argv[argv.index(name) + 1])
+    return default
+
+
+if __name__ == "__main__":
+    port = arg_value(sys.argv, "--port", DEFAULT_PORT, int)
+    state = StubState(latency=arg_value(sys.argv, "--latency", 1.0, float),
+                      rpm=arg_value(sys.argv, "--rpm", 0, int),
+                      drop=arg_value(sys.argv, "--drop", 0.0, float))
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    print(f"[*] Stub de Gemini en http://127.0.0.1:{port}/v1beta/models/stub:generateContent")
+    print(f"[*] Latencia {state.latency}s, cuota {state.rpm or 'sin limite'} peticiones/min")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n[*] Servidas: {state.served}, limitadas: {state.throttled}, "
+              f"concurrencia maxima: {state.max_in_flight}")
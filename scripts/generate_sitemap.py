@@ -1,86 +1,323 @@
+import gzip
+import hashlib
+import json
 import os
+import re
+import sys
+from collections import deque
+from datetime import date
 from pathlib import Path
-from datetime import datetime
+from xml.sax.saxutils import escape
+
+from content_store import write_atomic
+from publish import SITE_URL, ensure_staged, output_dir
+
+# Sitemap del sitio
+#
+#   python scripts/generate_sitemap.py
+#
+# El <lastmod> de cada URL sale del historial de su contenido: en
+# .build_cache/sitemap_lastmod.json se guarda, por página, el hash de su
+# contenido y la fecha en que ese hash apareció. El hash incluye el <head>
+# (título, descripción, canonical, JSON-LD), pero no lo que cambia con cada
+# compilación de recursos: la huella de las URLs (/assets/css/estilos.<hash>.css,
+# el sprite, las fuentes) ni las etiquetas <link rel="preload"> de fuentes y
+# estilos. Así una hoja de estilos nueva no cambia la fecha de todas las
+# páginas. Una página cuyo contenido no cambió conserva su fecha, y un
+# deploy solo anuncia como nuevas las páginas que realmente cambiaron.
+#
+# Las páginas se recorren ya en el orden de sus URL (portada primero) y
+# cada entrada se escribe apenas se lee, sin juntar la lista en memoria;
+# junto a cada sitemap se escribe su versión comprimida .xml.gz. Mientras
+# el sitio entra en un archivo (MAX_URLS URLs, MAX_BYTES bytes) se genera
+# un único sitemap.xml; por encima, sitemap.xml pasa a ser un índice de
+# sitemaps por sección (sitemap-marcas.xml, sitemap-modelos.xml,
+# sitemap-reparaciones.xml), numerados si una sección supera el límite.
+# Los dos formatos se escriben a la vez y al final se publica el que
+# corresponde.
 
 BASE_DIR = Path(__file__).parent.parent
-PUBLIC_DIR = BASE_DIR / 'public'
+PUBLIC_DIR = output_dir()
 SITEMAP_FILE = PUBLIC_DIR / 'sitemap.xml'
-BASE_URL = "https://arreglar-calefon-gratis-uruguay.pages.dev"
+LASTMOD_FILE = BASE_DIR / '.build_cache' / 'sitemap_lastmod.json'
+BASE_URL = SITE_URL
+
+# Límites del protocolo por archivo de sitemap
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024  # sin comprimir
+
+SECTIONS = ('marcas', 'modelos', 'reparaciones')
+
+URLSET_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+URLSET_FOOTER = '</urlset>'
+INDEX_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+INDEX_FOOTER = '</sitemapindex>'
+
+# Lo que cambia con cada compilación de recursos (ver content_hash)
+PRELOAD_RE = re.compile(rb'[ \t]*<link\b[^>]*\brel="preload"[^>]*>\n?', re.IGNORECASE)
+ASSET_HASH_RE = re.compile(rb'(/assets/[\w./-]+?)\.[0-9a-f]{8,}(\.(?:css|svg|woff2|js))\b')
+
+def page_info(url_path):
+    """Sección, prioridad y changefreq de una página según su ruta"""
+    if url_path == 'index.html':
+        return 'marcas', '1.0', 'weekly'
+    if '/modelos/' in url_path:
+        return 'modelos', '0.8', 'monthly'
+    if '/reparaciones/' in url_path:
+        return 'reparaciones', '0.7', 'monthly'
+    if url_path.endswith('/index.html'):
+        return 'marcas', '0.9', 'weekly'
+    return 'marcas', '0.6', 'monthly'
+
+def page_url(url_path):
+    """URL pública de una página (los index.html se publican como directorio)"""
+    if url_path == 'index.html':
+        return BASE_URL + '/'
+    if url_path.endswith('/index.html'):
+        return BASE_URL + '/' + url_path[:-len('index.html')]
+    return BASE_URL + '/' + url_path
+
+def content_hash(path):
+    """Hash de una página sin las huellas de recursos ni los preload"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    data = ASSET_HASH_RE.sub(rb'\1\2', PRELOAD_RE.sub(b'', data))
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def load_lastmod_index():
+    """Índice ruta -> [hash, lastmod] de la última generación"""
+    try:
+        with open(LASTMOD_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_lastmod_index(index):
+    """Guarda el índice con una página por línea (diffs legibles)"""
+    lines = [f' {json.dumps(rel)}: {json.dumps(index[rel])}' for rel in sorted(index)]
+    write_atomic(LASTMOD_FILE, '{\n' + ',\n'.join(lines) + ('\n' if lines else '') + '}\n')
+
+def url_entry(url):
+    """Bloque <url> de una página"""
+    return ('  <url>\n'
+            f'    <loc>{escape(url["loc"])}</loc>\n'
+            f'    <lastmod>{url["lastmod"]}</lastmod>\n'
+            f'    <changefreq>{url["changefreq"]}</changefreq>\n'
+            f'    <priority>{url["priority"]}</priority>\n'
+            '  </url>\n')
+
+def site_pages(root=None, prefix=''):
+    """Rutas relativas de las páginas .html, en el orden de sus URL (portada primero)
+
+    Un index.html se publica como su carpeta ('marca/'), así que va antes que
+    todo lo demás de esa carpeta; una subcarpeta se ordena como 'nombre/'.
+    """
+    root = PUBLIC_DIR if root is None else root
+    entries = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                entries.append((entry.name + '/', entry))
+            elif entry.name.endswith('.html'):
+                entries.append(('' if entry.name == 'index.html' else entry.name, entry))
+    entries.sort(key=lambda item: item[0])
+    for _, entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from site_pages(entry.path, prefix + entry.name + '/')
+        else:
+            yield prefix + entry.name
+
+class SitemapStream:
+    """Escribe un sitemap y su .xml.gz a la vez; se publica (o descarta) al final"""
+
+    def __init__(self, path):
+        self.path = path
+        self.gz_path = path.with_name(path.name + '.gz')
+        self.tmp = path.with_name(path.name + '.tmp')
+        self.gz_tmp = path.with_name(path.name + '.gz.tmp')
+        self.raw = open(self.tmp, 'wb')
+        self.gz_raw = open(self.gz_tmp, 'wb')
+        # mtime=0: el .gz solo cambia si cambia el XML
+        self.gz = gzip.GzipFile(filename='', mode='wb', fileobj=self.gz_raw, mtime=0)
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.raw.write(data)
+        self.gz.write(data)
+        self.size += len(data)
+
+    def finish(self):
+        """Cierra los archivos temporales (todavía sin publicar)"""
+        if not self.raw.closed:
+            self.raw.close()
+            self.gz.close()
+            self.gz_raw.close()
+
+    def publish(self, path=None):
+        """Reemplaza el sitemap (con otro nombre si se indica) por lo escrito"""
+        self.finish()
+        if path is not None:
+            self.path, self.gz_path = path, path.with_name(path.name + '.gz')
+        os.replace(self.tmp, self.path)
+        os.replace(self.gz_tmp, self.gz_path)
+
+    def discard(self):
+        self.finish()
+        os.unlink(self.tmp)
+        os.unlink(self.gz_tmp)
+
+    def close(self):
+        self.publish()
+
+class UrlsetWriter:
+    """Un urlset escrito como flujo; al llegar a los límites sigue en otra parte
+
+    Con split=False no se parte: add() devuelve False cuando la entrada ya
+    no entra. Las partes se publican en close(), numeradas solo si hay más
+    de una (name.xml o name-1.xml, name-2.xml...).
+    """
+
+    def __init__(self, name, split=True):
+        self.name = name
+        self.split = split
+        self.parts = []  # [(stream, lastmod máximo)]
+        self.count = 0
+        self.total = 0
+        self._open_part()
+
+    def _open_part(self):
+        self.stream = SitemapStream(PUBLIC_DIR / f"{self.name}-{len(self.parts) + 1}.xml")
+        self.stream.write(URLSET_HEADER)
+        self.count = 0
+        self.newest = ''
+
+    def _finish_part(self):
+        self.stream.write(URLSET_FOOTER)
+        self.stream.finish()
+        self.parts.append((self.stream, self.newest))
+
+    def add(self, entry, lastmod):
+        size = len(entry.encode('utf-8'))
+        if self.count >= MAX_URLS or self.stream.size + size + len(URLSET_FOOTER) > MAX_BYTES:
+            if not self.split:
+                return False
+            self._finish_part()
+            self._open_part()
+        self.stream.write(entry)
+        self.count += 1
+        self.total += 1
+        self.newest = max(self.newest, lastmod)
+        return True
+
+    def close(self):
+        """Publica las partes; devuelve [(archivo, lastmod máximo)]"""
+        self._finish_part()
+        numbered = len(self.parts) > 1
+        written = []
+        for idx, (stream, newest) in enumerate(self.parts, 1):
+            name = f"{self.name}-{idx}.xml" if numbered else f"{self.name}.xml"
+            stream.publish(PUBLIC_DIR / name)
+            written.append((name, newest))
+        return written
+
+    def discard(self):
+        if not self.stream.raw.closed:
+            self._finish_part()
+        for stream, _ in self.parts:
+            stream.discard()
+
+def write_index(sitemaps):
+    """Escribe sitemap.xml como índice de los sitemaps por sección"""
+    stream = SitemapStream(SITEMAP_FILE)
+    stream.write(INDEX_HEADER)
+    for name, lastmod in sitemaps:
+        stream.write('  <sitemap>\n'
+                     f'    <loc>{BASE_URL}/{name}</loc>\n'
+                     f'    <lastmod>{lastmod}</lastmod>\n'
+                     '  </sitemap>\n')
+    stream.write(INDEX_FOOTER)
+    stream.close()
+
+def remove_stale_sitemaps(keep):
+    """Borra los sitemaps por sección de una generación anterior que ya no se usan"""
+    for path in PUBLIC_DIR.glob('sitemap-*.xml*'):
+        if path.name not in keep:
+            path.unlink()
 
 def generate_sitemap():
     """Genera sitemap.xml con todas las URLs del sitio"""
     print("[*] Generando sitemap.xml...")
-    
-    urls = []
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    # Recopilar todas las páginas HTML
-    for html_file in PUBLIC_DIR.rglob('*.html'):
-        # Calcular URL relativa
-        rel_path = html_file.relative_to(PUBLIC_DIR)
-        url_path = str(rel_path).replace('\\', '/')
-        
-        # Prioridad según tipo de página
-        if url_path == 'index.html':
-            priority = '1.0'
-            changefreq = 'weekly'
-        elif '/modelos/' in url_path:
-            priority = '0.8'
-            changefreq = 'monthly'
-        elif '/reparaciones/' in url_path:
-            priority = '0.7'
-            changefreq = 'monthly'
-        elif url_path.endswith('/index.html'):
-            priority = '0.9'
-            changefreq = 'weekly'
-        else:
-            priority = '0.6'
-            changefreq = 'monthly'
-        
-        # Convertir a URL completa
-        if url_path == 'index.html':
-            full_url = BASE_URL + '/'
-        elif url_path.endswith('/index.html'):
-            full_url = BASE_URL + '/' + url_path.replace('/index.html', '/')
+    if not PUBLIC_DIR.is_dir():
+        print(f"[ERROR] No existe {PUBLIC_DIR}: ejecutar antes los generadores")
+        sys.exit(1)
+
+    today = date.today().isoformat()
+    previous = load_lastmod_index()
+    index = {}
+    changed = total = 0
+    first, last = [], deque(maxlen=3)
+
+    # Todo el sitio en un archivo mientras entre, y a la vez por sección
+    single = UrlsetWriter('sitemap', split=False)
+    sections = {section: UrlsetWriter(f"sitemap-{section}") for section in SECTIONS}
+    for url_path in site_pages():
+        digest = content_hash(PUBLIC_DIR / url_path)
+        entry = previous.get(url_path)
+        if entry and entry[0] == digest:
+            lastmod = entry[1]
         else:
-            full_url = BASE_URL + '/' + url_path
-        
-        urls.append({
-            'loc': full_url,
-            'lastmod': today,
-            'changefreq': changefreq,
-            'priority': priority
-        })
-    
-    # Ordenar URLs (homepage primero, luego alfabéticamente)
-    urls.sort(key=lambda x: (x['loc'] != BASE_URL + '/', x['loc']))
-    
-    # Generar XML
-    xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    for url in urls:
-        xml_content += '  <url>\n'
-        xml_content += f'    <loc>{url["loc"]}</loc>\n'
-        xml_content += f'    <lastmod>{url["lastmod"]}</lastmod>\n'
-        xml_content += f'    <changefreq>{url["changefreq"]}</changefreq>\n'
-        xml_content += f'    <priority>{url["priority"]}</priority>\n'
-        xml_content += '  </url>\n'
-    
-    xml_content += '</urlset>'
-    
-    # Guardar sitemap
-    with open(SITEMAP_FILE, 'w', encoding='utf-8') as f:
-        f.write(xml_content)
-    
-    print(f"[OK] Sitemap generado: {SITEMAP_FILE}")
-    print(f"[OK] Total de URLs: {len(urls)}")
+            lastmod = today
+            changed += 1
+        index[url_path] = [digest, lastmod]
+        section, priority, changefreq = page_info(url_path)
+        url = {'loc': page_url(url_path), 'lastmod': lastmod, 'changefreq': changefreq, 'priority': priority}
+
+        text = url_entry(url)
+        if single is not None and not single.add(text, lastmod):
+            single.discard()
+            single = None
+        sections[section].add(text, lastmod)
+        total += 1
+        if len(first) < 5:
+            first.append(url)
+        last.append(url)
+
+    indexed = single is None
+    if not indexed:
+        sitemaps = single.close()
+        for writer in sections.values():
+            writer.discard()
+        remove_stale_sitemaps(keep=set())
+    else:
+        sitemaps = []
+        for writer in sections.values():
+            if writer.total:
+                sitemaps.extend(writer.close())
+            else:
+                writer.discard()
+        write_index(sitemaps)
+        remove_stale_sitemaps(keep={name for name, _ in sitemaps} | {name + '.gz' for name, _ in sitemaps})
+
+    save_lastmod_index(index)
+
+    if not total:
+        print(f"[!] No hay paginas en {PUBLIC_DIR}: sitemap.xml queda vacio")
+    print(f"[OK] Sitemap generado: {SITEMAP_FILE} (+ .gz)")
+    if indexed:
+        print(f"[OK] Indice de {len(sitemaps)} sitemaps: {', '.join(name for name, _ in sitemaps)}")
+    print(f"[OK] Total de URLs: {total}")
+    print(f"[OK] lastmod actualizado: {changed} paginas con contenido nuevo, "
+          f"{total - changed} conservan su fecha")
     print("\nPrimeras 5 URLs:")
-    for url in urls[:5]:
+    for url in first:
         print(f"  - {url['loc']} (prioridad: {url['priority']})")
     print("\nÚltimas 3 URLs:")
-    for url in urls[-3:]:
+    for url in last:
         print(f"  - {url['loc']} (prioridad: {url['priority']})")
 
 if __name__ == "__main__":
+    ensure_staged()
     generate_sitemap()
@@ -0,0 +1,286 @@
+import re
+import sys
+from collections import defaultdict
+from html.parser import HTMLParser
+from pathlib import Path
+
+from publish import output_dir
+
+# Minificación de HTML en la escritura
+#
+#   python scripts/html_minify.py [carpeta]             (mide el ahorro sobre public/ sin escribir)
+#   python scripts/html_minify.py [carpeta] --verify    (comprueba las garantías en cada página)
+#
+# Los generadores la aplican con --minify (BuildManifest(minify=True) y
+# build_with_ai): las páginas se validan tal como se renderizan y se
+# minifican justo antes de escribirlas.
+#
+# Solo se hacen cambios que no alteran lo que muestra el navegador:
+# - se quitan los comentarios (salvo los condicionales <!--[if ...]>)
+# - cada tramo de espacios entre etiquetas se reduce a un solo carácter
+#   ('\n' si contenía un salto de línea, ' ' si no); nunca se quita del todo,
+#   porque entre elementos inline o inline-block el espacio se ve
+# - dentro de <head> (y antes de <body>) los tramos solo de espacios se
+#   eliminan: ahí no se renderizan
+# - dentro de las etiquetas se reducen los espacios entre atributos; los
+#   valores entre comillas no se tocan
+# <pre>, <textarea>, <script> (incluido el JSON-LD) y <style> se copian
+# tal cual. Solo cuentan como espacio los caracteres de espacio de HTML
+# (&nbsp; y U+00A0 se conservan). Un elemento con white-space: pre puesto
+# por CSS no se detecta: para eso hay que usar <pre>.
+#
+# --verify comprueba esas garantías sobre cada página, sin escribir: el
+# HTML original y el minificado, leídos con html.parser, dan la misma
+# secuencia de etiquetas, atributos y texto (salvo lo que la lista de
+# arriba permite quitar o reducir), y minificar dos veces da lo mismo que
+# una. Termina con código 1 si alguna página no cumple.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+
+SPACE_RE = re.compile(r'[ \t\n\r\f]+')
+# Dentro de una etiqueta, una comilla solo abre un valor si sigue a '='
+# (como en el tokenizador del navegador: en name" la comilla es parte del nombre)
+TAG_SCAN_RE = re.compile(r'''>|=[ \t\n\r\f]*(["'])''')
+TAG_PART_RE = re.compile(r'''(=[ \t\n\r\f]*(?:"[^"]*"|'[^']*'))|[ \t\n\r\f]+''')
+TAG_START_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)|<!')
+BOGUS_COMMENT_RE = re.compile(r'</(?![a-zA-Z])|<\?')
+RAW_CLOSE_RE = {name: re.compile('</' + name, re.IGNORECASE)
+                for name in ('pre', 'textarea', 'script', 'style')}
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def _collapse_tag(tag):
+    """Reduce los espacios entre atributos de una etiqueta"""
+    tag = TAG_PART_RE.sub(lambda m: m.group(1) or ' ', tag)
+    return tag[:-2] + '>' if tag.endswith(' >') else tag
+
+
+def _tag_end(html, pos):
+    """Posición siguiente al '>' que cierra la etiqueta que empieza en pos, o None"""
+    while True:
+        match = TAG_SCAN_RE.search(html, pos)
+        if match is None:
+            return None
+        if match.group(1) is None:
+            return match.end()
+        close = html.find(match.group(1), match.end())
+        if close < 0:
+            return None
+        pos = close + 1
+
+
+def minify_html(html):
+    """HTML minificado con el mismo árbol renderizado"""
+    out = []
+    text = []  # texto pendiente: un comentario quitado une el texto de ambos lados
+    before_body = True
+
+    def flush():
+        joined = ''.join(text)
+        text.clear()
+        if joined and not (before_body and not joined.strip(' \t\n\r\f')):
+            out.append(SPACE_RE.sub(_collapse, joined))
+
+    pos = 0
+    while pos < len(html):
+        start = html.find('<', pos)
+        if start < 0:
+            text.append(html[pos:])
+            break
+        text.append(html[pos:start])
+
+        if html.startswith('<!--', start):
+            end = html.find('-->', start + 4)
+            end = len(html) if end < 0 else end + 3
+            comment = html[start:end]
+            if comment.startswith('<!--[if') or comment.startswith('<!--<![endif]'):
+                flush()
+                out.append(comment)
+            pos = end
+            continue
+
+        if BOGUS_COMMENT_RE.match(html, start):
+            # '</' sin nombre o '<?': el navegador lo toma como comentario hasta '>'
+            flush()
+            end = html.find('>', start + 2)
+            end = len(html) if end < 0 else end + 1
+            out.append(html[start:end])
+            pos = end
+            continue
+
+        match = TAG_START_RE.match(html, start)
+        if match is None:
+            text.append('<')  # '<' suelto: es texto
+            pos = start + 1
+            continue
+        flush()
+        end = _tag_end(html, match.end())
+        if end is None:
+            out.append(html[start:])  # etiqueta sin cerrar hasta el final: se deja igual
+            pos = len(html)
+            break
+        tag = html[start:end]
+        name = (match.group(2) or '').lower()
+        if name in RAW_CLOSE_RE and not match.group(1):
+            # Contenido crudo hasta </nombre (se copia tal cual, con las etiquetas)
+            close = RAW_CLOSE_RE[name].search(html, end)
+            close_end = html.find('>', close.end()) + 1 if close else 0
+            close_end = close_end or len(html)
+            out.append(_collapse_tag(tag) + html[end:close_end])
+            pos = close_end
+            continue
+        if name == 'body' and not match.group(1):
+            before_body = False
+        out.append(_collapse_tag(tag))
+        pos = end
+    flush()
+    return ''.join(out).lstrip(' \t\n\r\f')
+
+
+class TokenStream(HTMLParser):
+    """Etiquetas, atributos y texto de una página, normalizados como los deja minify_html"""
+
+    RAW = ('pre', 'textarea', 'script', 'style')
+
+    def __init__(self, html):
+        super().__init__(convert_charrefs=True)
+        self.tokens = []
+        self.raw = []          # elementos de contenido crudo abiertos
+        self.before_body = True
+        self.feed(html)
+        self.close()
+        self._end_text()
+
+    def _end_text(self):
+        """Normaliza el texto pendiente (los comentarios quitados unen el de ambos lados)"""
+        if not self.tokens or self.tokens[-1][0] != 'texto' or self.tokens[-1][2]:
+            return
+        _, text, _ = self.tokens.pop()
+        if not self.raw:
+            if self.before_body and not text.strip(' \t\n\r\f'):
+                return
+            text = SPACE_RE.sub(' ', text)
+        if text:
+            self.tokens.append(('texto', text, True))
+
+    def handle_data(self, data):
+        if self.tokens and self.tokens[-1][0] == 'texto' and not self.tokens[-1][2]:
+            self.tokens[-1] = ('texto', self.tokens[-1][1] + data, False)
+        else:
+            self.tokens.append(('texto', data, False))
+
+    def handle_starttag(self, tag, attrs):
+        self._end_text()
+        if tag == 'body':
+            self.before_body = False
+        self.tokens.append(('abre', tag, tuple(attrs)))
+        if tag in self.RAW:
+            self.raw.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._end_text()
+        self.tokens.append(('abre', tag, tuple(attrs)))
+
+    def handle_endtag(self, tag):
+        self._end_text()
+        if self.raw and self.raw[-1] == tag:
+            self.raw.pop()
+        self.tokens.append(('cierra', tag, None))
+
+    def handle_comment(self, data):
+        # Solo sobreviven los condicionales (y su texto, dentro de un elemento crudo)
+        if self.raw or data.startswith('[if') or data.startswith('<![endif]'):
+            self._end_text()
+            self.tokens.append(('comentario', data, None))
+
+    def handle_decl(self, decl):
+        self._end_text()
+        self.tokens.append(('decl', decl, None))
+
+    def handle_pi(self, data):
+        self._end_text()
+        self.tokens.append(('pi', data, None))
+
+
+def verify_page(html):
+    """None si el minificado conserva los tokens y es idempotente; si no, el motivo"""
+    minified = minify_html(html)
+    if minify_html(minified) != minified:
+        return "minificar dos veces no da lo mismo que una"
+    before, after = TokenStream(html).tokens, TokenStream(minified).tokens
+    for i, (a, b) in enumerate(zip(before, after)):
+        if a != b:
+            return f"token {i}: {a[:2]!r} -> {b[:2]!r}"
+    if len(before) != len(after):
+        return f"{len(before)} tokens -> {len(after)}"
+    return None
+
+
+def page_type(rel):
+    """Tipo de página según su ruta relativa a public/ (para los reportes)"""
+    if '/modelos/' in rel:
+        return 'modelos'
+    if '/reparaciones/' in rel:
+        return 'reparaciones'
+    if rel.endswith('/index.html'):
+        return 'marcas'
+    return 'otras'
+
+
+class MinifyStats:
+    """Bytes antes y después de minificar, por tipo de página"""
+
+    def __init__(self):
+        self.types = defaultdict(lambda: [0, 0, 0])  # tipo -> [páginas, antes, después]
+
+    def add(self, rel, before, after):
+        entry = self.types[page_type(rel)]
+        entry[0] += 1
+        entry[1] += len(before.encode('utf-8'))
+        entry[2] += len(after.encode('utf-8'))
+
+    def print_summary(self):
+        if not self.types:
+            return
+        print("[*] Minificacion (bytes ahorrados por tipo de pagina):")
+        total_before = total_after = 0
+        for kind in sorted(self.types):
+            pages, before, after = self.types[kind]
+            total_before += before
+            total_after += after
+            print(f"    - {kind:13s} {pages:4d} paginas  {before:>10,d} -> {after:>10,d} bytes  "
+                  f"(-{before - after:,d}, -{100 * (before - after) / max(before, 1):.1f}%)")
+        print(f"    - {'total':13s}       {' ' * 7}{total_before:>10,d} -> {total_after:>10,d} bytes  "
+              f"(-{100 * (total_before - total_after) / max(total_before, 1):.1f}%)")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    public_dir = Path(args[0]) if args else PUBLIC_DIR
+    verify = "--verify" in sys.argv
+    stats = MinifyStats()
+    failed = []
+    checked = 0
+    for path in sorted(public_dir.rglob('*.html')):
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        rel = path.relative_to(public_dir).as_posix()
+        if verify:
+            checked += 1
+            reason = verify_page(html)
+            if reason:
+                failed.append(rel)
+                print(f"[!] {rel}: {reason}")
+        else:
+            stats.add(rel, html, minify_html(html))
+    if not verify:
+        stats.print_summary()
+    elif failed:
+        print(f"[ERROR] {len(failed)} paginas no conservan el arbol o no son idempotentes")
+        sys.exit(1)
+    else:
+        print(f"[OK] {checked} paginas verificadas en {public_dir}: mismos tokens e idempotente")
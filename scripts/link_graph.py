@@ -0,0 +1,156 @@
+import importlib
+import json
+from pathlib import Path
+
+from content_store import file_lock, write_atomic
+from link_checker import extract_links, line_column, resolve_link
+from publish import output_dir
+
+# Grafo de enlaces en tiempo de compilación
+#
+# Cada generador registra las páginas que emite y los enlaces internos que
+# renderiza en ellas. Antes de escribir nada se comprueba que todo destino
+# sea una página del sitio: las emitidas en esta ejecución, las que emitirán
+# los demás generadores (cada uno las lista con planned_pages() a partir de
+# data/, sin renderizar) o una página estática. Un destino colgante hace
+# fallar la compilación, así un enlace como cambiar-termostato.html nunca
+# llega a public/ ni al deploy, y no hace falta recorrer public/ después de
+# compilar.
+#
+# Los enlaces de las páginas al día (que el manifiesto no vuelve a
+# renderizar) se guardan en .build_cache/link_graph.json.
+#
+# BuildManifest usa el grafo automáticamente: record() deja la página en
+# espera y save() valida el grafo antes de escribir.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+GRAPH_FILE = BASE_DIR / '.build_cache' / 'link_graph.json'
+GRAPH_LOCK = BASE_DIR / '.build_cache' / 'link_graph.lock'
+
+# Páginas escritas a mano (no las emite ningún generador)
+STATIC_PAGES = ('index.html', '404.html')
+
+# Módulos con planned_pages(): entre todos cubren las páginas generadas del
+# sitio (build_with_ai y build_all_sections emiten las mismas que build)
+PAGE_PLANS = ('build', 'build_repair_pages', 'build_cambiar_valvula_pages')
+
+# Enlaces colgantes que se muestran en el error
+MAX_REPORTED = 20
+
+
+class DanglingLinksError(Exception):
+    """Hay enlaces internos a páginas que ningún generador emite"""
+
+    def __init__(self, dangling):
+        self.dangling = dangling
+        lines = [f"{len(dangling)} enlaces internos apuntan a paginas inexistentes:"]
+        for d in dangling[:MAX_REPORTED]:
+            where = f"{d['archivo']}:{d['linea']}:{d['columna']}" if d['linea'] else d['archivo']
+            lines.append(f"  {where}  {d['enlace']}  ->  {d['esperado']}")
+        if len(dangling) > MAX_REPORTED:
+            lines.append(f"  ... y {len(dangling) - MAX_REPORTED} mas")
+        super().__init__("\n".join(lines))
+
+
+def planned_pages():
+    """Páginas que emiten todos los generadores, según sus datos de entrada"""
+    pages = set(STATIC_PAGES)
+    for module_name in PAGE_PLANS:
+        pages.update(importlib.import_module(module_name).planned_pages())
+    return pages
+
+
+def _load_graph():
+    try:
+        with open(GRAPH_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+class LinkGraph:
+    """Páginas y enlaces internos que emite un generador"""
+
+    def __init__(self, generator, public_dir=PUBLIC_DIR):
+        self.generator = generator
+        self.public_dir = Path(public_dir)
+        self._public_root = self.public_dir.resolve()
+        self.previous = _load_graph().get(generator, {})
+        self.pages = {}     # página -> destinos (esta ejecución)
+        self.rendered = {}  # página -> HTML renderizado (para ubicar enlaces rotos)
+
+    def page_key(self, path):
+        """Ruta de una salida relativa a public/, o None si está fuera del sitio"""
+        try:
+            return Path(path).resolve().relative_to(self._public_root).as_posix()
+        except ValueError:
+            return None
+
+    def add_page(self, path, html=None):
+        """Registra una página emitida
+
+        Con html se extraen sus enlaces; sin él (página al día que no se
+        renderizó) se usan los enlaces registrados en la ejecución anterior o,
+        si no los hay, los del archivo en disco.
+        """
+        rel = self.page_key(path)
+        if rel is None:
+            return
+        if html is not None:
+            self.rendered[rel] = html
+        elif rel in self.previous:
+            self.pages[rel] = self.previous[rel]
+            return
+        else:
+            try:
+                with open(self.public_dir / rel, 'r', encoding='utf-8') as f:
+                    html = f.read()
+            except FileNotFoundError:
+                html = ''
+        targets = []
+        for href, _ in extract_links(html):
+            target = resolve_link(rel, href)
+            if target is not None and target not in targets:
+                targets.append(target)
+        self.pages[rel] = targets
+
+    def known_pages(self):
+        """Páginas de esta ejecución y de todos los generadores del sitio"""
+        return planned_pages().union(self.pages)
+
+    def dangling(self):
+        """Enlaces cuyo destino no es ninguna página conocida"""
+        known = self.known_pages()
+        result = []
+        for rel, targets in self.pages.items():
+            missing = [t for t in targets if t not in known]
+            if not missing:
+                continue
+            html = self.rendered.get(rel)
+            if html is None:
+                result.extend({'archivo': rel, 'linea': 0, 'columna': 0, 'enlace': t, 'esperado': t}
+                              for t in missing)
+                continue
+            for href, pos in extract_links(html):
+                target = resolve_link(rel, href)
+                if target in missing:
+                    line, column = line_column(html, pos)
+                    result.append({'archivo': rel, 'linea': line, 'columna': column,
+                                   'enlace': href, 'esperado': target})
+        return result
+
+    def check(self):
+        """Lanza DanglingLinksError si algún enlace no tiene destino"""
+        dangling = self.dangling()
+        if dangling:
+            raise DanglingLinksError(dangling)
+
+    def save(self, partial=False):
+        """Guarda las páginas del generador (partial: se suman a las anteriores)"""
+        pages = dict(self.previous, **self.pages) if partial else self.pages
+        # Releer bajo bloqueo: otro generador pudo guardar mientras tanto
+        with file_lock(GRAPH_LOCK):
+            graph = _load_graph()
+            graph[self.generator] = pages
+            write_atomic(GRAPH_FILE, json.dumps(graph, ensure_ascii=False, separators=(',', ':'), sort_keys=True))
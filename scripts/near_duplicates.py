@@ -0,0 +1,259 @@
+import hashlib
+import html as html_lib
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from catalog import CatalogError, load_catalog
+from content_store import ContentStore, split_key, write_json_atomic
+
+# Fragmentos casi duplicados en el almacén de contenido
+#
+#   python scripts/near_duplicates.py [--threshold 0.8] [--kind repair_guide[,diagnosis]]
+#
+# Las 42 variantes de cada guía de reparación suelen ser el mismo texto con
+# otra marca: infla el almacén y es contenido duplicado para los buscadores.
+# Este análisis compara los fragmentos de un mismo grupo (mismo tipo y, en
+# las guías, misma reparación) y agrupa los que se parecen más que el umbral:
+#
+#   1. Texto: sin etiquetas HTML, en minúsculas, y con el nombre de la marca
+#      (y del modelo) del propio fragmento cambiado por un comodín, para que
+#      'Bosch' y 'Ariston' no cuenten como diferencia.
+#   2. Shingles: secuencias de SHINGLE_WORDS palabras, con un hash de 64 bits.
+#   3. MinHash de una sola permutación: el hash de cada shingle elige uno de
+#      NUM_BINS compartimentos y cada compartimento guarda el menor valor
+#      (los vacíos se completan rotando desde el siguiente). La fracción de
+#      compartimentos iguales estima la similitud de Jaccard.
+#   4. LSH: la firma se parte en BANDS bandas; dos fragmentos con una banda
+#      idéntica son candidatos. Cada candidato se compara solo con el primer
+#      fragmento de su cubeta y se unen los que superan el umbral.
+#
+# Todo es lineal en la cantidad de fragmentos (salvo cubetas enormes, que
+# igual se recorren una sola vez), así que escala a miles de fragmentos.
+#
+# El informe queda en .build_cache/near_duplicates.json. En cada grupo el
+# primer fragmento (orden del almacén) es el de referencia; los demás se
+# pueden regenerar con un prompt de diversificación:
+#
+#   python scripts/regenerate.py --kind repair --diversify [--dry-run]
+
+BASE_DIR = Path(__file__).parent.parent
+REPORT_FILE = BASE_DIR / '.build_cache' / 'near_duplicates.json'
+
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_WORDS = 5
+NUM_BINS = 128
+BANDS = 32
+ROWS = NUM_BINS // BANDS
+
+BIN_BITS = 7  # 2**BIN_BITS == NUM_BINS
+VALUE_BITS = 64 - BIN_BITS
+VALUE_MASK = (1 << VALUE_BITS) - 1
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+')
+PLACEHOLDER = '_marca_'
+
+DIVERSIFY_INSTRUCTIONS = """
+
+DIVERSIFICACIÓN: ya existen textos casi idénticos a este para otras marcas. Escribe una versión propia{brand_part}: cambia la redacción, el orden de los consejos y los ejemplos, y no repitas frases genéricas. Mantén exactamente la misma estructura HTML, enlaces y clases."""
+
+
+def fragment_tokens(html, names=()):
+    """Palabras del texto visible, con los nombres dados cambiados por un comodín"""
+    text = html_lib.unescape(TAG_RE.sub(' ', html)).lower()
+    for name in names:
+        text = re.sub(r'\b' + re.escape(name.lower()) + r'\b', PLACEHOLDER, text)
+    return WORD_RE.findall(text)
+
+
+def shingle_hashes(tokens, size=SHINGLE_WORDS):
+    """Hashes de 64 bits de las secuencias de size palabras"""
+    if len(tokens) < size:
+        size = max(1, len(tokens))
+    hashes = set()
+    for idx in range(len(tokens) - size + 1):
+        digest = hashlib.blake2b(' '.join(tokens[idx:idx + size]).encode('utf-8'), digest_size=8).digest()
+        hashes.add(int.from_bytes(digest, 'big'))
+    return hashes
+
+
+def minhash(hashes):
+    """Firma MinHash de una permutación (tupla de NUM_BINS valores), o None sin texto"""
+    bins = [None] * NUM_BINS
+    for value in hashes:
+        idx, rest = value >> VALUE_BITS, value & VALUE_MASK
+        if bins[idx] is None or rest < bins[idx]:
+            bins[idx] = rest
+    filled = [idx for idx, value in enumerate(bins) if value is not None]
+    if not filled:
+        return None
+    # Densificación por rotación: un compartimento vacío toma el siguiente lleno,
+    # desplazado según la distancia (así dos vacíos distintos no coinciden por azar)
+    signature = list(bins)
+    next_filled = filled[0] + NUM_BINS
+    for idx in range(NUM_BINS - 1, -1, -1):
+        if bins[idx] is not None:
+            next_filled = idx
+        else:
+            distance = next_filled - idx
+            signature[idx] = bins[next_filled % NUM_BINS] + (distance << VALUE_BITS)
+    return tuple(signature)
+
+
+def similarity(a, b):
+    """Jaccard estimada entre dos firmas"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+def group_of(key):
+    """Grupo de comparación: tipo y, en las guías, reparación"""
+    kind, _, _, repair = split_key(key)
+    return f"{kind}|{repair}" if repair else kind
+
+
+def key_names(key, catalog):
+    """Nombres propios del fragmento (marca y modelo) que no cuentan como diferencia"""
+    _, slug, model_id, _ = split_key(key)
+    brand = catalog.by_slug.get(slug)
+    if brand is None:
+        return (slug.replace('-', ' '),) if slug else ()
+    names = [brand.name, slug.replace('-', ' ')]
+    model = catalog.models.get((slug, model_id))
+    if model is not None:
+        names.append(model.name)
+    return tuple(names)
+
+
+def _find(parents, key):
+    while parents[key] != key:
+        parents[key] = parents[parents[key]]
+        key = parents[key]
+    return key
+
+
+def find_clusters(signatures, threshold=DEFAULT_THRESHOLD):
+    """Grupos de claves casi duplicadas: [(claves en orden, {(a, b): similitud})]"""
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        for band in range(BANDS):
+            buckets[(band, signature[band * ROWS:(band + 1) * ROWS])].append(key)
+
+    parents = {key: key for key in signatures}
+    scores = {}
+    for members in buckets.values():
+        first = members[0]
+        for key in members[1:]:
+            pair = (first, key)
+            if pair not in scores:
+                scores[pair] = similarity(signatures[first], signatures[key])
+            if scores[pair] >= threshold:
+                root_a, root_b = _find(parents, first), _find(parents, key)
+                if root_a != root_b:
+                    parents[root_b] = root_a
+
+    order = {key: idx for idx, key in enumerate(signatures)}
+    clusters = defaultdict(list)
+    for key in signatures:
+        clusters[_find(parents, key)].append(key)
+    result = []
+    for keys in clusters.values():
+        if len(keys) < 2:
+            continue
+        keys.sort(key=order.get)
+        members = set(keys)
+        pairs = {pair: score for pair, score in scores.items()
+                 if score >= threshold and pair[0] in members}
+        result.append((keys, pairs))
+    result.sort(key=lambda cluster: (-len(cluster[0]), order[cluster[0][0]]))
+    return result
+
+
+def analyze(store, catalog, threshold=DEFAULT_THRESHOLD, kinds=None):
+    """Informe de casi duplicados de los fragmentos del almacén (de los tipos dados)"""
+    start = time.perf_counter()
+    groups = defaultdict(dict)
+    empty = 0
+    for key in store:
+        if kinds and split_key(key)[0] not in kinds:
+            continue
+        signature = minhash(shingle_hashes(fragment_tokens(store[key], key_names(key, catalog))))
+        if signature is None:
+            empty += 1
+            continue
+        groups[group_of(key)][key] = signature
+
+    report_groups = []
+    fragments = 0
+    for group, signatures in groups.items():
+        fragments += len(signatures)
+        for keys, pairs in find_clusters(signatures, threshold):
+            scores = list(pairs.values())
+            report_groups.append({
+                'grupo': group,
+                'referencia': keys[0],
+                'claves': keys,
+                'similitud_media': round(sum(scores) / len(scores), 3),
+                'similitud_max': round(max(scores), 3),
+                'pares': [[a, b, round(score, 3)] for (a, b), score in sorted(pairs.items(), key=lambda p: -p[1])],
+            })
+    report_groups.sort(key=lambda cluster: -len(cluster['claves']))
+    return {
+        'umbral': threshold,
+        'shingle': SHINGLE_WORDS,
+        'firma': {'compartimentos': NUM_BINS, 'bandas': BANDS},
+        'fragmentos': fragments,
+        'vacios': empty,
+        'duplicados': sum(len(cluster['claves']) - 1 for cluster in report_groups),
+        'segundos': round(time.perf_counter() - start, 3),
+        'grupos': report_groups,
+    }
+
+
+def flagged_keys(report):
+    """Claves a diversificar: todas las de cada grupo menos la de referencia"""
+    return {key for cluster in report['grupos'] for key in cluster['claves'][1:]}
+
+
+def diversify_prompt(prompt, brand=None):
+    """Prompt con la instrucción de diversificar el texto"""
+    brand_part = f" para {brand}, con particularidades de esa marca" if brand else ""
+    return prompt + DIVERSIFY_INSTRUCTIONS.format(brand_part=brand_part)
+
+
+def print_report(report, limit=10):
+    print(f"[*] Fragmentos analizados: {report['fragmentos']} ({report['segundos']:.2f}s)")
+    print(f"[*] Grupos casi duplicados (>= {report['umbral']:g}): {len(report['grupos'])}, "
+          f"{report['duplicados']} fragmentos a diversificar")
+    for cluster in report['grupos'][:limit]:
+        print(f"    {cluster['grupo']:32s} {len(cluster['claves']):4d} fragmentos  "
+              f"similitud media {cluster['similitud_media']:.2f}, max {cluster['similitud_max']:.2f}")
+    if len(report['grupos']) > limit:
+        print(f"    ... y {len(report['grupos']) - limit} grupos mas")
+
+
+def option_value(argv, name, default):
+    if name not in argv:
+        return default
+    idx = argv.index(name)
+    return argv[idx + 1] if idx + 1 < len(argv) else default
+
+
+if __name__ == "__main__":
+    try:
+        threshold = float(option_value(sys.argv, "--threshold", DEFAULT_THRESHOLD))
+        catalog = load_catalog()
+    except (ValueError, CatalogError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    kinds = [kind for kind in option_value(sys.argv, "--kind", '').split(',') if kind] or None
+
+    with ContentStore() as store:
+        report = analyze(store, catalog, threshold, kinds)
+    write_json_atomic(REPORT_FILE, report)
+    print_report(report)
+    print(f"[OK] Informe en {REPORT_FILE.relative_to(BASE_DIR).as_posix()}")
+    if report['duplicados']:
+        print("[NEXT] python scripts/regenerate.py --kind <tipo> --diversify para reescribirlos")
@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import build_profile
+
+# Render en paralelo por marca
+#
+# Cada unidad de trabajo es una marca con la lista de páginas que hay que
+# renderizar. Las páginas al día se filtran antes con el manifiesto, las
+# unidades se reparten en un pool de procesos (la plantilla y los datos se
+# cargan una vez por proceso mediante el inicializador) y la escritura se
+# hace siempre en el proceso principal y en el mismo orden que una ejecución
+# en serie, así que la salida es idéntica byte a byte.
+#
+# Con --profile (ver build_profile.py) cada página se renderiza por separado
+# para medir su tiempo, también dentro de los procesos del pool.
+
+
+def parse_jobs(argv):
+    """Lee --jobs N de la línea de comandos (0 = un proceso por núcleo)"""
+    if "--jobs" not in argv:
+        return 1
+    idx = argv.index("--jobs")
+    if idx + 1 >= len(argv):
+        return 1
+    jobs = int(argv[idx + 1])
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def run_units(render_unit, units, jobs=1, initializer=None, initargs=()):
+    """Aplica render_unit a cada unidad, en orden, en serie o en un pool de procesos"""
+    if not units:
+        return
+    if jobs <= 1:
+        if initializer:
+            initializer(*initargs)
+        for unit in units:
+            yield render_unit(unit)
+        return
+
+    # Unidades agrupadas en lotes para no pagar IPC por cada marca
+    chunksize = max(1, len(units) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(render_unit, units, chunksize=chunksize)
+
+
+def render_pages(manifest, units, render_unit, jobs=1, initializer=None, initargs=()):
+    """Renderiza las páginas desactualizadas de cada unidad y las registra en el manifiesto
+
+    Las páginas se escriben en manifest.save(), después de validar sus enlaces.
+
+    units: lista de (clave, [(ruta, hash_entradas, arg_pagina), ...])
+    render_unit((clave, [arg_pagina, ...])) -> [html, ...] en el mismo orden
+    """
+    pending = []
+    for unit_key, pages in units:
+        stale = []
+        for path, inputs_hash, page_arg in pages:
+            reason = manifest.check(path, inputs_hash)
+            if reason is not None:
+                stale.append((path, inputs_hash, page_arg, reason))
+        if stale:
+            pending.append((unit_key, stale))
+
+    work = [(unit_key, [page[2] for page in stale]) for unit_key, stale in pending]
+    profiling = build_profile.active()
+    if profiling:
+        render_unit = partial(timed_unit, render_unit)
+    results = run_units(render_unit, work, jobs=jobs, initializer=initializer, initargs=initargs)
+    for (unit_key, stale), result in zip(pending, results):
+        htmls, seconds = result if profiling else (result, None)
+        for idx, (path, inputs_hash, _, reason) in enumerate(stale):
+            if profiling:
+                build_profile.record_page(path, seconds[idx])
+            manifest.record(path, htmls[idx], inputs_hash, reason)
+
+
+def timed_unit(render_unit, unit):
+    """Como render_unit(unit), pero página por página: devuelve ([html, ...], [segundos, ...])"""
+    unit_key, page_args = unit
+    htmls, seconds = [], []
+    for page_arg in page_args:
+        start = time.perf_counter()
+        htmls.extend(render_unit((unit_key, [page_arg])))
+        seconds.append(time.perf_counter() - start)
+    return htmls, seconds
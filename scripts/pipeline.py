@@ -0,0 +1,505 @@
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from content_store import write_atomic
+from parallel_render import parse_jobs
+from publish import STAGING_ENV, Publication, output_dir, resolve
+
+# Orquestador de la compilación completa del sitio
+#
+#   python scripts/pipeline.py [objetivo ...] [--explain] [--dry-run] [--force]
+#                              [--jobs N] [--minify] [--profile] [--marcas secciones|ai|build]
+#                              [--verbose]
+#   python scripts/pipeline.py --list
+#
+# Reemplaza a la secuencia de scripts que había que correr a mano para
+# refrescar el sitio. Cada etapa es un objetivo (build_targets()) con sus
+# dependencias, sus entradas (archivos o patrones relativos a la raíz del
+# repo, más los módulos de scripts/ que importa) y sus salidas:
+#
+#   catalogo -> marcas, reparaciones, valvulas -> reescritura -> fuentes
+#            -> estilos -> iconos -> sitemap, enlaces
+#
+# y, en paralelo a la reescritura, duplicados (informe de fragmentos casi
+# duplicados del almacén, que los generadores acaban de completar).
+#
+# Cada objetivo se ejecuta como un proceso aparte (python scripts/<script>.py)
+# apenas terminan sus dependencias, hasta --jobs objetivos a la vez (por
+# defecto uno por núcleo): los tres generadores corren en paralelo, igual
+# que el sitemap y el verificador de enlaces.
+#
+# En .build_cache/pipeline.json se guarda, por objetivo, el comando y el
+# hash de cada entrada tal como quedó al terminar su última ejecución
+# correcta. Un objetivo se salta si nada de eso cambió y sus salidas
+# existen; así, editar data/catalog.json ejecuta catalogo y los
+# generadores, y después solo las etapas cuyas entradas cambiaron de
+# verdad (los generadores, a su vez, solo re-renderizan las páginas
+# afectadas). Los hashes se reutilizan mientras no cambie el tamaño ni la
+# fecha del archivo, así un objetivo al día no vuelve a leer public/.
+#
+# Toda la ejecución escribe en una sola preparación de public/ (ver
+# publish.py): las etapas la heredan, y public/ se reemplaza de una vez
+# recién cuando terminan todas bien. Si alguna falla, la preparación se
+# descarta y los objetivos ejecutados vuelven a quedar pendientes. Las
+# rutas public/... de entradas y salidas se leen de la preparación.
+#
+# Las hojas de estilo, fuentes e íconos salen de las páginas generadas, pero
+# los generadores enlazan su versión vigente (data/stylesheet.json,
+# data/fonts.json, data/sprite.json): si una etapa posterior cambia una
+# entrada de otra ya ejecutada, se hace otra pasada con los objetivos
+# desactualizados, hasta MAX_PASSES.
+#
+# Opciones:
+#   objetivo ...    solo esos objetivos y sus dependencias (por defecto, todos)
+#   --explain       por qué se ejecuta (o se salta) cada objetivo
+#   --dry-run       mostrar el plan con sus motivos, sin ejecutar nada
+#   --force         ejecutar todos los objetivos seleccionados aunque estén al día
+#                   (los generadores siguen usando su manifiesto; para
+#                   re-renderizar todo, ejecutarlos con --force)
+#   --jobs N        objetivos en paralelo (0 = uno por núcleo, el valor por defecto)
+#   --minify        pasa --minify a los generadores
+#   --profile       pasa --profile a los generadores (ver build_profile.py)
+#   --marcas X      generador de las páginas de marca y modelo (BRAND_GENERATORS)
+#   --verbose       mostrar la salida completa de cada objetivo
+#   --list          listar los objetivos con sus dependencias, entradas y salidas
+
+BASE_DIR = Path(__file__).parent.parent
+SCRIPTS_DIR = BASE_DIR / 'scripts'
+BUILD_CACHE_DIR = BASE_DIR / '.build_cache'
+STATE_FILE = BUILD_CACHE_DIR / 'pipeline.json'
+LOG_DIR = BUILD_CACHE_DIR / 'pipeline'
+STATE_VERSION = 1
+
+MAX_PASSES = 3
+MAX_LISTED = 3
+TAIL_LINES = 15
+
+# Las tres generan las mismas páginas (public/<marca>/index.html y modelos/)
+BRAND_GENERATORS = {
+    'secciones': ('build_all_sections', ()),
+    'ai': ('build_with_ai', ('--batch', '1000')),  # todas las marcas en un solo lote
+    'build': ('build', ()),
+}
+DEFAULT_BRAND_GENERATOR = 'secciones'
+
+PAGES = 'public/**/*.html'
+CONTENT = ('data/brands.json', 'data/catalog.json', 'data/content_store.jsonl')
+PAGE_ASSETS = ('data/stylesheet.json', 'data/fonts.json', 'data/sprite.json')
+
+# Motivos por los que un objetivo se ejecuta o se salta
+REASON_FORCED = 'forzado (--force)'
+REASON_NEW = 'sin ejecucion previa'
+REASON_UP_TO_DATE = 'al dia'
+
+
+@dataclass(frozen=True, slots=True)
+class Target:
+    name: str
+    script: str
+    args: tuple = ()
+    deps: tuple = ()
+    inputs: tuple = ()
+    outputs: tuple = ()
+    description: str = ''
+
+
+def build_targets(brand_generator=DEFAULT_BRAND_GENERATOR, minify=False, profile=False):
+    """Objetivos de la compilación, en orden topológico"""
+    brand_script, brand_args = BRAND_GENERATORS[brand_generator]
+    gen_args = (('--minify',) if minify else ()) + (('--profile',) if profile else ())
+    targets = (
+        Target('catalogo', 'catalog',
+               inputs=('data/brands.json', 'data/catalog.json'),
+               outputs=('.build_cache/catalog.pickle',),
+               description='valida el catalogo'),
+        Target('marcas', brand_script, brand_args + gen_args, deps=('catalogo',),
+               inputs=CONTENT + PAGE_ASSETS + ('templates/plantilla_maestra.html',
+                                               'documentacion/plantilla_maestra.html'),
+               outputs=('public/*/index.html', 'public/*/modelos/*.html'),
+               description='paginas de marca y modelo'),
+        Target('reparaciones', 'build_repair_pages', gen_args, deps=('catalogo',),
+               inputs=CONTENT + PAGE_ASSETS,
+               outputs=('public/*/reparaciones/*.html',),
+               description='guias de reparacion'),
+        Target('valvulas', 'build_cambiar_valvula_pages', gen_args, deps=('catalogo',),
+               inputs=CONTENT + PAGE_ASSETS,
+               outputs=('public/*/reparaciones/cambiar-valvula.html',),
+               description='guias de cambio de valvula'),
+        Target('duplicados', 'near_duplicates', deps=('marcas', 'reparaciones', 'valvulas'),
+               inputs=CONTENT,
+               outputs=('.build_cache/near_duplicates.json',),
+               description='informe de fragmentos casi duplicados'),
+        # Antes que los recursos, que leen las páginas ya corregidas
+        Target('reescritura', 'rewrite_site', deps=('marcas', 'reparaciones', 'valvulas'),
+               inputs=(PAGES, 'data/rewrite_rules.json'),
+               description='correcciones de data/rewrite_rules.json'),
+        Target('fuentes', 'build_fonts', deps=('reescritura',),
+               inputs=(PAGES, 'data/content_store.jsonl', 'vendor/inter/Inter.var.ttf'),
+               outputs=('data/fonts.json', 'public/assets/fonts/*.woff2'),
+               description='Inter recortada (WOFF2)'),
+        # Las tres etapas de recursos reescriben index.html y 404.html: en serie
+        Target('estilos', 'build_css', deps=('fuentes',),
+               inputs=(PAGES, 'data/content_store.jsonl', 'data/fonts.json',
+                       'templates/*.html', 'templates/tailwind_base.css', 'documentacion/*.html'),
+               outputs=('data/stylesheet.json', 'public/assets/css/*.css'),
+               description='hoja de estilos de utilidades'),
+        Target('iconos', 'build_icons', deps=('estilos',),
+               inputs=(PAGES, 'data/content_store.jsonl', 'vendor/fontawesome/iconos.json',
+                       'templates/*.html', 'documentacion/*.html'),
+               outputs=('data/sprite.json', 'public/assets/svg/*.svg'),
+               description='sprite SVG de iconos'),
+        Target('sitemap', 'generate_sitemap', deps=('iconos',),
+               inputs=(PAGES, '.build_cache/sitemap_lastmod.json'),
+               outputs=('public/sitemap.xml', '.build_cache/sitemap_lastmod.json'),
+               description='sitemap.xml'),
+        Target('enlaces', 'link_checker', deps=('iconos',),
+               inputs=(PAGES,),
+               description='verifica los enlaces internos'),
+    )
+    return {target.name: target for target in targets}
+
+
+def check_graph(targets):
+    """Cada dependencia existe y está declarada antes (así el grafo no tiene ciclos)"""
+    seen = set()
+    for target in targets.values():
+        for dep in target.deps:
+            if dep not in targets:
+                raise ValueError(f"{target.name}: dependencia desconocida '{dep}'")
+            if dep not in seen:
+                raise ValueError(f"{target.name}: '{dep}' tiene que declararse antes")
+        seen.add(target.name)
+
+
+def with_dependencies(names, targets):
+    """Objetivos pedidos más todas sus dependencias, en orden topológico"""
+    wanted = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(targets[name].deps)
+    return [name for name in targets if name in wanted]
+
+
+# Entradas
+
+@lru_cache(maxsize=None)
+def source_modules(script):
+    """Módulos de scripts/ que usa un script (él mismo y lo que importa, transitivamente)"""
+    seen = set()
+    stack = [script]
+    while stack:
+        name = stack.pop()
+        path = SCRIPTS_DIR / f'{name}.py'
+        if name in seen or not path.exists():
+            continue
+        seen.add(name)
+        for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'))):
+            if isinstance(node, ast.Import):
+                stack.extend(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                stack.append(node.module.split('.')[0])
+    return tuple(sorted(f'scripts/{name}.py' for name in seen))
+
+
+def expand(patterns):
+    """Archivos (rutas relativas a la raíz) que coinciden con los patrones"""
+    files = set()
+    for pattern in patterns:
+        first, _, rest = pattern.partition('/')
+        root, prefix = (output_dir(), 'public/') if first == 'public' else (BASE_DIR, '')
+        for path in root.glob(rest if prefix else pattern):
+            if path.is_file():
+                files.add(prefix + path.relative_to(root).as_posix())
+    return sorted(files)
+
+
+def matches(rel, pattern):
+    """rel coincide con un patrón de glob ('**/' también vale por cero carpetas)"""
+    return fnmatch.fnmatchcase(rel, pattern) or fnmatch.fnmatchcase(rel, pattern.replace('**/', ''))
+
+
+class FileHasher:
+    """Hash SHA-256 de archivos, reutilizado mientras no cambien tamaño ni fecha"""
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def digest(self, rel):
+        path = resolve(rel)
+        st = path.stat()
+        cached = self.known.get(rel)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.known[rel] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def inputs(self, target):
+        """Entradas actuales de un objetivo: ruta -> hash"""
+        return {rel: self.digest(rel) for rel in expand(target.inputs + source_modules(target.script))}
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'archivos': {}, 'objetivos': {}}
+    if state.get('version') != STATE_VERSION:
+        return {'archivos': {}, 'objetivos': {}}
+    return state
+
+
+def save_state(state, hasher):
+    write_atomic(STATE_FILE, json.dumps({'version': STATE_VERSION, 'archivos': hasher.known,
+                                         'objetivos': state['objetivos']},
+                                        ensure_ascii=False, separators=(',', ':')))
+
+
+# Motivos
+
+def command(target):
+    return [f'scripts/{target.script}.py', *target.args]
+
+
+def producer(rel, targets):
+    """Objetivo que declara el archivo como salida, si hay uno"""
+    for target in targets.values():
+        if any(matches(rel, pattern) for pattern in target.outputs):
+            return target.name
+    return None
+
+
+def describe_files(files, targets):
+    listed = []
+    for rel in files[:MAX_LISTED]:
+        source = producer(rel, targets)
+        listed.append(f"{rel} (salida de {source})" if source else rel)
+    more = f" y {len(files) - MAX_LISTED} mas" if len(files) > MAX_LISTED else ''
+    return ', '.join(listed) + more
+
+
+def stale_reason(target, stamp, current, targets):
+    """Por qué hay que ejecutar el objetivo, o None si está al día"""
+    if stamp is None:
+        return REASON_NEW
+    if stamp['comando'] != command(target):
+        return f"comando distinto ({' '.join(stamp['comando'])} -> {' '.join(command(target))})"
+    previous = stamp['entradas']
+    changed = sorted(rel for rel, digest in current.items() if previous.get(rel) != digest)
+    removed = sorted(previous.keys() - current.keys())
+    if changed:
+        return f"cambio {describe_files(changed, targets)}"
+    if removed:
+        return f"ya no existe {describe_files(removed, targets)}"
+    for pattern in target.outputs:
+        if not expand((pattern,)):
+            return f"falta la salida {pattern}"
+    return None
+
+
+# Ejecución
+
+def run_target(target):
+    """Ejecuta el script de un objetivo; devuelve (código de salida, salida, segundos)"""
+    start = time.monotonic()
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    result = subprocess.run([sys.executable, *command(target)], cwd=BASE_DIR, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, encoding='utf-8', errors='replace')
+    return result.returncode, result.stdout, time.monotonic() - start
+
+
+def write_log(name, output):
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    path = LOG_DIR / f'{name}.log'
+    path.write_text(output, encoding='utf-8')
+    return path
+
+
+def run_pass(order, targets, state, hasher, jobs, forced=False, explain=False, dry_run=False, verbose=False):
+    """Una pasada por el grafo; devuelve (ejecutados, fallidos)"""
+    stamps = state['objetivos']
+    pending = list(order)
+    finished = set()   # ejecutados o al día: sus dependientes pueden seguir
+    ran, failed, blocked = [], [], set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in list(pending):
+                target = targets[name]
+                broken = [dep for dep in target.deps if dep in blocked]
+                if broken:
+                    pending.remove(name)
+                    blocked.add(name)
+                    print(f"[!] {name}: omitido (fallo {', '.join(broken)})")
+                    continue
+                if not all(dep in finished for dep in target.deps):
+                    continue
+                pending.remove(name)
+
+                upstream = [dep for dep in target.deps if dep in ran]
+                if forced:
+                    reason = REASON_FORCED
+                else:
+                    reason = stale_reason(target, stamps.get(name), hasher.inputs(target), targets)
+                    if reason is None and dry_run and upstream:
+                        # Sin ejecutar no se sabe si la dependencia cambia algo
+                        reason = f"puede cambiar: depende de {', '.join(upstream)}"
+                if reason is None:
+                    finished.add(name)
+                    if explain:
+                        print(f"    {name:13s} {REASON_UP_TO_DATE}")
+                    continue
+                if explain:
+                    print(f"    {name:13s} ejecutar: {reason}")
+                if dry_run:
+                    ran.append(name)
+                    finished.add(name)
+                    continue
+                print(f"[*] {name}: python {' '.join(command(target))}", flush=True)
+                running[pool.submit(run_target, target)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                code, output, seconds = future.result()
+                log_path = write_log(name, output)
+                if verbose:
+                    print(output.rstrip())
+                if code != 0:
+                    failed.append(name)
+                    blocked.add(name)
+                    stamps.pop(name, None)
+                    print(f"[ERROR] {name} fallo (codigo {code}, {seconds:.1f}s); salida en {log_path.relative_to(BASE_DIR).as_posix()}")
+                    if not verbose:
+                        for line in output.rstrip().splitlines()[-TAIL_LINES:]:
+                            print(f"    {line}")
+                    continue
+                # Entradas tal como quedaron: lo que el propio objetivo reescribió
+                # (p. ej. index.html en estilos) no cuenta como cambio
+                stamps[name] = {'comando': command(targets[name]), 'entradas': hasher.inputs(targets[name])}
+                ran.append(name)
+                finished.add(name)
+                print(f"[OK] {name} ({seconds:.1f}s)", flush=True)
+
+    return ran, failed
+
+
+def run_pipeline(names, targets, jobs=1, force=False, explain=False, dry_run=False, verbose=False):
+    """Ejecuta los objetivos pedidos (y sus dependencias) que estén desactualizados"""
+    check_graph(targets)
+    order = with_dependencies(names or list(targets), targets)
+    state = load_state()
+    hasher = FileHasher(state['archivos'])
+    start = time.monotonic()
+    all_ran, all_failed = [], []
+    # Dentro de otra publicación (publish.py) se escribe en la de ella
+    publication = None if dry_run or os.environ.get(STAGING_ENV) else Publication()
+    if publication is not None:
+        publication.open()
+
+    try:
+        for pass_number in range(1, MAX_PASSES + 1):
+            if pass_number > 1 or explain or dry_run:
+                print(f"[*] Pasada {pass_number}" + (" (--dry-run, sin ejecutar)" if dry_run else ""))
+            ran, failed = run_pass(order, targets, state, hasher, jobs, forced=force and pass_number == 1,
+                                   explain=explain or dry_run, dry_run=dry_run, verbose=verbose)
+            all_ran += ran
+            all_failed += failed
+            if failed or dry_run or not ran:
+                break
+            # ¿Una etapa posterior cambió las entradas de otra que ya se ejecutó?
+            stale = [name for name in order
+                     if stale_reason(targets[name], state['objetivos'].get(name),
+                                     hasher.inputs(targets[name]), targets) is not None]
+            if not stale:
+                break
+            if pass_number == MAX_PASSES:
+                print(f"[!] Sin converger despues de {MAX_PASSES} pasadas: {', '.join(stale)}")
+    except BaseException:
+        if publication is not None:
+            publication.discard()
+            print("[!] Compilacion interrumpida: public/ queda como estaba")
+        raise
+
+    if publication is not None:
+        if all_failed:
+            publication.discard()
+            print("[!] Hubo objetivos fallidos: public/ queda como estaba")
+            # Lo que escribieron en public/ se descartó: se vuelven a ejecutar
+            for name in all_ran:
+                state['objetivos'].pop(name, None)
+        else:
+            publication.commit()
+    if not dry_run:
+        save_state(state, hasher)
+
+    print("=" * 70)
+    verb = 'A ejecutar' if dry_run else 'Ejecutados'
+    print(f"[*] {verb}: {len(all_ran)} ({', '.join(all_ran) or '-'})")
+    print(f"[*] Objetivos: {len(order)}, fallidos: {len(all_failed)}")
+    print(f"[*] Tiempo: {time.monotonic() - start:.2f}s")
+    return all_failed
+
+
+def print_targets(targets):
+    for target in targets.values():
+        print(f"{target.name:13s} {target.description}")
+        print(f"    python {' '.join(command(target))}")
+        if target.deps:
+            print(f"    depende de: {', '.join(target.deps)}")
+        print(f"    entradas:   {', '.join(target.inputs + source_modules(target.script))}")
+        if target.outputs:
+            print(f"    salidas:    {', '.join(target.outputs)}")
+
+
+def option_value(argv, name, default):
+    if name not in argv:
+        return default
+    idx = argv.index(name)
+    return argv[idx + 1] if idx + 1 < len(argv) else default
+
+
+if __name__ == "__main__":
+    brand_generator = option_value(sys.argv, "--marcas", DEFAULT_BRAND_GENERATOR)
+    if brand_generator not in BRAND_GENERATORS:
+        print(f"[ERROR] --marcas: '{brand_generator}' (opciones: {', '.join(BRAND_GENERATORS)})")
+        sys.exit(1)
+    targets = build_targets(brand_generator, minify="--minify" in sys.argv, profile="--profile" in sys.argv)
+
+    if "--list" in sys.argv:
+        print_targets(targets)
+        sys.exit(0)
+
+    values = {option_value(sys.argv, name, None) for name in ("--jobs", "--marcas")}
+    names = [arg for arg in sys.argv[1:] if not arg.startswith('--') and arg not in values]
+    unknown = [name for name in names if name not in targets]
+    if unknown:
+        print(f"[ERROR] Objetivos desconocidos: {', '.join(unknown)} (ver --list)")
+        sys.exit(1)
+
+    jobs = parse_jobs(sys.argv) if "--jobs" in sys.argv else (os.cpu_count() or 1)
+    failed = run_pipeline(names, targets, jobs=jobs,
+                          force="--force" in sys.argv,
+                          explain="--explain" in sys.argv,
+                          dry_run="--dry-run" in sys.argv,
+                          verbose="--verbose" in sys.argv)
+    sys.exit(1 if failed else 0)
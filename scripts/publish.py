@@ -0,0 +1,349 @@
+import ctypes
+import errno
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from content_store import file_lock, write_atomic
+
+# Publicación atómica de public/ por generaciones
+#
+#   python scripts/publish.py scripts/<script>.py [argumentos ...]
+#   python scripts/publish.py --list
+#   python scripts/publish.py --rollback [generacion]
+#
+# Una compilación no escribe en public/: escribe en una preparación,
+# .build_cache/generaciones/.preparacion-<id>/, que arranca como una copia
+# de public/ hecha con enlaces duros (los archivos que la compilación no
+# toca no se copian ni ocupan lugar). Al terminar bien, la preparación se
+# intercambia con public/ en un solo paso (renameat2 con RENAME_EXCHANGE en
+# Linux; en otros sistemas, tres renombres seguidos) y la salida anterior
+# queda como generación en .build_cache/generaciones/<id>/. Si la
+# compilación falla o se interrumpe (p. ej. un lote de build_with_ai.py
+# --start/--batch a medias), la preparación se descarta y public/ queda
+# entera como estaba: nunca se despliega un sitio mitad viejo y mitad nuevo.
+#
+# Los scripts que escriben en public/ llaman a ensure_staged() al principio:
+# si no hay una preparación en curso se vuelven a ejecutar dentro de una.
+# pipeline.py abre una sola preparación para toda la compilación y sus
+# etapas la heredan (variable de entorno STAGING_ENV); output_dir() es la
+# carpeta de salida vigente en cada proceso.
+#
+# Como las generaciones comparten los enlaces duros, un archivo de salida
+# nunca se reescribe en el lugar: content_store.write_atomic() escribe un
+# temporal y lo renombra, así el archivo de las demás generaciones no cambia.
+#
+# Se guardan KEEP_GENERATIONS generaciones anteriores; --rollback vuelve a
+# una de ellas (por defecto, la anterior a la publicada) con el mismo
+# intercambio atómico, y la publicada pasa a ser una generación más.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = BASE_DIR / 'public'
+GENERATIONS_DIR = BASE_DIR / '.build_cache' / 'generaciones'
+STATE_FILE = GENERATIONS_DIR / 'generaciones.json'
+LOCK_FILE = GENERATIONS_DIR / 'publicacion.lock'
+STAGING_PREFIX = '.preparacion-'
+STAGING_ENV = 'CALEFONES_STAGING_DIR'
+
+# Dominio canónico del sitio: canonical, currentUrl, sitemap y robots.txt.
+# Los generadores lo escriben ya correcto; la regla dominio-pages de
+# data/rewrite_rules.json solo queda para páginas viejas, así la
+# reescritura no toca lo recién generado (ni el manifiesto lo da por
+# editado en la próxima compilación).
+SITE_URL = "https://arreglar-calefon-gratis-uruguay.pages.dev"
+
+KEEP_GENERATIONS = 5
+
+# renameat2(2)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+class PublishError(Exception):
+    """Error al publicar o restaurar una generación"""
+
+
+def output_dir(base_dir=BASE_DIR):
+    """Carpeta donde se escribe el sitio: la preparación en curso, o public/"""
+    staging = os.environ.get(STAGING_ENV)
+    return Path(staging) if staging else Path(base_dir) / 'public'
+
+
+def live_path(path):
+    """Ruta bajo public/ de un archivo de la preparación (las demás, sin cambios)"""
+    staging = os.environ.get(STAGING_ENV)
+    if not staging:
+        return Path(path)
+    try:
+        return PUBLIC_DIR / Path(path).resolve().relative_to(Path(staging).resolve())
+    except ValueError:
+        return Path(path)
+
+
+def resolve(rel):
+    """Ruta de un archivo relativo a la raíz del repo; public/... se lee de la preparación"""
+    first, _, rest = rel.partition('/')
+    return output_dir() / rest if first == 'public' else BASE_DIR / rel
+
+
+def site_files(root):
+    """Rutas relativas (posix) -> ruta de los archivos bajo root"""
+    files = {}
+    for dirpath, dirs, names in os.walk(root):
+        dirs.sort()
+        rel_dir = Path(dirpath).relative_to(root)
+        for name in names:
+            files[(rel_dir / name).as_posix()] = Path(dirpath) / name
+    return files
+
+
+def link_tree(src, dst, stats):
+    """Copia src en dst con enlaces duros (copia normal si el sistema no los permite)"""
+    dst.mkdir(parents=True)
+    if not src.exists():
+        return
+    for rel, path in site_files(src).items():
+        target = dst / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if path.is_symlink():
+            os.symlink(os.readlink(path), target)
+            stats['enlazados'] += 1
+            continue
+        try:
+            os.link(path, target)
+            stats['enlazados'] += 1
+        except OSError:
+            shutil.copy2(path, target)
+            stats['copiados'] += 1
+
+
+def _renameat2():
+    try:
+        func = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, TypeError, AttributeError):
+        return None
+    func.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint)
+    return func
+
+
+def exchange(a, b):
+    """Intercambia dos carpetas; devuelve True si fue atómico"""
+    renameat2 = _renameat2()
+    if renameat2 is not None:
+        if renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0:
+            return True
+        err = ctypes.get_errno()
+        if err not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+            raise OSError(err, os.strerror(err), str(a), None, str(b))
+    # Sin intercambio atómico: b falta solo entre el primer y el segundo renombre
+    tmp = Path(f"{b}.intercambio")
+    os.rename(b, tmp)
+    os.rename(a, b)
+    os.rename(tmp, a)
+    return False
+
+
+def new_generation_id():
+    now = time.time()
+    return time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+
+
+def load_state(generations_dir=GENERATIONS_DIR):
+    try:
+        with open(generations_dir / STATE_FILE.name, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state, generations_dir=GENERATIONS_DIR):
+    write_atomic(generations_dir / STATE_FILE.name, json.dumps(state, indent=2) + '\n')
+
+
+def current_generation(public_dir=PUBLIC_DIR, generations_dir=GENERATIONS_DIR):
+    """Id de la generación publicada (la de un public/ anterior a las generaciones, por su fecha)"""
+    current = load_state(generations_dir).get('actual')
+    if current:
+        return current
+    return time.strftime('%Y%m%d-%H%M%S.000', time.localtime(public_dir.stat().st_mtime))
+
+
+def list_generations(generations_dir=GENERATIONS_DIR):
+    """Ids de las generaciones guardadas, de la más vieja a la más nueva"""
+    if not generations_dir.exists():
+        return []
+    return sorted(path.name for path in generations_dir.iterdir()
+                  if path.is_dir() and not path.name.startswith(STAGING_PREFIX))
+
+
+def prune(keep=KEEP_GENERATIONS, generations_dir=GENERATIONS_DIR):
+    """Borra las generaciones más viejas que las keep más nuevas"""
+    old = list_generations(generations_dir)
+    for generation in old[:max(0, len(old) - keep)]:
+        shutil.rmtree(generations_dir / generation, ignore_errors=True)
+
+
+class Publication:
+    """Una compilación que escribe en una copia de public/ y se publica entera o nada"""
+
+    def __init__(self, public_dir=PUBLIC_DIR, generations_dir=GENERATIONS_DIR, keep=KEEP_GENERATIONS):
+        self.public_dir = Path(public_dir)
+        self.generations_dir = Path(generations_dir)
+        self.keep = keep
+        self.id = None
+        self.dir = None
+        self.stats = Counter()
+        self._stack = None
+
+    def open(self):
+        """Arma la preparación y la deja como carpeta de salida de este proceso y sus hijos"""
+        self._stack = ExitStack()
+        # Una sola publicación a la vez: otra compilación espera a que esta termine
+        self._stack.enter_context(file_lock(self.generations_dir / LOCK_FILE.name))
+        for stale in self.generations_dir.glob(STAGING_PREFIX + '*'):
+            shutil.rmtree(stale, ignore_errors=True)
+        self.id = new_generation_id()
+        self.dir = self.generations_dir / (STAGING_PREFIX + self.id)
+        link_tree(self.public_dir, self.dir, self.stats)
+        os.environ[STAGING_ENV] = str(self.dir)
+        return self
+
+    def changes(self):
+        """(nuevos o cambiados, eliminados) respecto de public/"""
+        live = site_files(self.public_dir) if self.public_dir.exists() else {}
+        staged = site_files(self.dir)
+        changed = 0
+        for rel, path in staged.items():
+            if rel not in live:
+                changed += 1
+                continue
+            st, st_live = os.lstat(path), os.lstat(live[rel])
+            if (st.st_ino, st.st_dev) != (st_live.st_ino, st_live.st_dev):
+                changed += 1
+        return changed, len(live.keys() - staged.keys())
+
+    def commit(self):
+        """Publica la preparación; devuelve False si no cambió nada (y se descarta)"""
+        changed, removed = self.changes()
+        if self.public_dir.exists() and not changed and not removed:
+            print("[*] public/ sin cambios: no se publica una generacion nueva", flush=True)
+            self.discard()
+            return False
+
+        atomic = True
+        if self.public_dir.exists():
+            previous = current_generation(self.public_dir, self.generations_dir)
+            atomic = exchange(self.dir, self.public_dir)
+            # La preparación tiene ahora la salida anterior: queda como su generación
+            os.rename(self.dir, self.generations_dir / previous)
+        else:
+            os.rename(self.dir, self.public_dir)
+        save_state({'actual': self.id}, self.generations_dir)
+        prune(self.keep, self.generations_dir)
+        self._close()
+
+        how = 'intercambio atomico' if atomic else 'renombres'
+        print(f"[OK] Publicada la generacion {self.id} ({how}): {changed} archivos nuevos o cambiados, "
+              f"{removed} eliminados, {self.stats['enlazados']} enlazados de la anterior", flush=True)
+        return True
+
+    def discard(self):
+        """Descarta la preparación: public/ queda como estaba"""
+        if self.dir is not None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+        self._close()
+
+    def _close(self):
+        if self._stack is None:
+            return
+        if os.environ.get(STAGING_ENV) == str(self.dir):
+            del os.environ[STAGING_ENV]
+        self._stack.close()
+        self._stack = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._stack is None:
+            return False
+        if exc_type is not None:
+            self.discard()
+            print("[!] Compilacion interrumpida: public/ queda como estaba", flush=True)
+        else:
+            self.commit()
+        return False
+
+
+def run_staged(argv):
+    """Ejecuta un comando dentro de una publicación; publica solo si termina bien"""
+    try:
+        with Publication() as publication:
+            code = subprocess.call(argv)
+            if code != 0:
+                publication.discard()
+                print(f"[!] Termino con codigo {code}: public/ queda como estaba", flush=True)
+    except KeyboardInterrupt:
+        return 130
+    return code
+
+
+def ensure_staged():
+    """Si no hay una preparación en curso, vuelve a ejecutar este script dentro de una"""
+    if os.environ.get(STAGING_ENV):
+        return
+    script = Path(sys.argv[0]).resolve()
+    sys.exit(run_staged([sys.executable, str(script), *sys.argv[1:]]))
+
+
+def rollback(generation=None, public_dir=PUBLIC_DIR, generations_dir=GENERATIONS_DIR):
+    """Vuelve a publicar una generación guardada; devuelve su id"""
+    with file_lock(generations_dir / LOCK_FILE.name):
+        kept = list_generations(generations_dir)
+        current = current_generation(public_dir, generations_dir)
+        if generation is None:
+            older = [gen for gen in kept if gen < current]
+            if not older:
+                raise PublishError("No hay una generacion anterior a la publicada")
+            generation = older[-1]
+        if generation not in kept:
+            raise PublishError(f"No existe la generacion '{generation}' (ver --list)")
+        exchange(generations_dir / generation, public_dir)
+        os.rename(generations_dir / generation, generations_dir / current)
+        save_state({'actual': generation}, generations_dir)
+    return generation
+
+
+def print_generations():
+    kept = list_generations()
+    current = current_generation() if PUBLIC_DIR.exists() else None
+    for generation in sorted(kept + ([current] if current else [])):
+        root = PUBLIC_DIR if generation == current else GENERATIONS_DIR / generation
+        mark = '*' if generation == current else ' '
+        print(f" {mark} {generation}  {len(site_files(root)):5d} archivos")
+    if not kept:
+        print("[*] Sin generaciones anteriores")
+
+
+if __name__ == "__main__":
+    if "--list" in sys.argv:
+        print_generations()
+    elif "--rollback" in sys.argv:
+        idx = sys.argv.index("--rollback")
+        try:
+            generation = rollback(sys.argv[idx + 1] if idx + 1 < len(sys.argv) else None)
+        except (PublishError, OSError) as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        print(f"[OK] Publicada de nuevo la generacion {generation}")
+    elif len(sys.argv) > 1:
+        sys.exit(run_staged([sys.executable, *sys.argv[1:]]))
+    else:
+        print("Uso: python scripts/publish.py scripts/<script>.py [argumentos ...] | --list | --rollback [generacion]")
+        sys.exit(1)
@@ -0,0 +1,222 @@
+import sys
+
+from build_all_sections import clean_html as clean_section_html, section_prompt
+from build_cambiar_valvula_pages import clean_html as clean_valvula_html, valvula_prompt
+from build_repair_pages import REPAIR_TYPES, clean_html as clean_repair_html, repair_guide_prompt
+from brand_intro import brand_intro_prompt, clean_brand_intro
+from build_with_ai import clean_model_intro, model_intro_prompt
+from catalog import CatalogError, load_catalog
+from content_store import ContentStore, content_key, key_brand, split_key
+from gemini_client import MissingApiKeyError, generate_all, prompt_fingerprint
+from near_duplicates import DEFAULT_THRESHOLD, analyze, diversify_prompt, flagged_keys
+from spec_plan import model_lead_key, model_lead_prompt, plan_models, spec_block_key, spec_block_prompt
+
+# Regeneración selectiva del contenido generado por IA
+#
+#   python scripts/regenerate.py --kind repair --brand bosch --stale-only
+#
+# Calcula el prompt actual de cada fragmento del tipo y marcas pedidos y lo
+# compara con la huella guardada en el almacén (prompt, modelo y
+# generationConfig). Con --stale-only solo se piden a la API los fragmentos
+# que faltan o cuya huella cambió, así que retocar un prompt cuesta
+# exactamente las llamadas afectadas. Después, los generadores solo
+# re-renderizan las páginas cuyo fragmento cambió (manifiesto incremental).
+#
+# Opciones:
+#   --kind a,b      tipos (ver KINDS) o 'all'
+#   --brand a,b     marcas (nombre o slug); por defecto todas
+#   --stale-only    solo fragmentos ausentes o desactualizados
+#   --dry-run       mostrar qué se regeneraría, sin llamar a la API
+#   --adopt         aceptar el contenido actual como vigente para los prompts
+#                   actuales (guarda la huella sin llamar a la API)
+#   --diversify     solo los fragmentos casi duplicados de otros del mismo
+#                   grupo (near_duplicates.py), pedidos con una instrucción
+#                   de diversificación. Se guardan con la huella del prompt
+#                   normal: siguen vigentes para --stale-only
+#   --threshold X   similitud mínima para --diversify (por defecto 0.8)
+
+# Tipo -> generador que re-renderiza sus páginas (el prompt de cada tipo es
+# uno solo; brand_intro lo comparten build_with_ai y build_all_sections,
+# ver brand_intro.py)
+KINDS = {
+    'brand_intro': 'build_with_ai',
+    'model_intro': 'build_with_ai',
+    'model_lead': 'build_with_ai',
+    'spec_block': 'build_with_ai',
+    'diagnosis': 'build_all_sections',
+    'repair_guides': 'build_all_sections',
+    'repair': 'build_repair_pages',
+    'valvula': 'build_cambiar_valvula_pages',
+}
+
+STATUS_MISSING = 'ausente'
+STATUS_STALE = 'desactualizado'
+STATUS_FRESH = 'vigente'
+STATUS_DUPLICATE = 'casi duplicado'
+
+def expected_entries(kind, brands, catalog):
+    """Fragmentos esperados de un tipo: clave -> (prompt actual, función de limpieza)"""
+    entries = {}
+    for brand in brands:
+        slug = brand.replace(' ', '-').lower()
+        if kind == 'brand_intro':
+            entries[content_key('brand_intro', slug)] = (brand_intro_prompt(brand), clean_brand_intro)
+        elif kind == 'model_intro':
+            for m in catalog.by_name[brand].models:
+                prompt = model_intro_prompt(brand, m.name, m.description, m.specs)
+                entries[content_key('model_intro', slug, m.id)] = (prompt, clean_model_intro)
+        elif kind == 'model_lead':
+            for m in catalog.by_name[brand].models:
+                entries[model_lead_key(slug, m)] = (model_lead_prompt(brand, m), clean_model_intro)
+        elif kind == 'spec_block':
+            for m in catalog.by_name[brand].models:
+                entries[spec_block_key(m.specs)] = (spec_block_prompt(m.specs), clean_model_intro)
+        elif kind == 'diagnosis':
+            entries[content_key('diagnosis', slug)] = (section_prompt('diagnosis_cards', brand), clean_section_html)
+        elif kind == 'repair_guides':
+            entries[content_key('repair_guides', slug)] = (section_prompt('repair_guides', brand), clean_section_html)
+        elif kind == 'repair':
+            for repair_type in REPAIR_TYPES:
+                key = content_key('repair_guide', slug, repair=repair_type['id'])
+                entries[key] = (repair_guide_prompt(brand, repair_type), clean_repair_html)
+        elif kind == 'valvula':
+            key = content_key('repair_guide', slug, repair='cambiar-valvula')
+            entries[key] = (valvula_prompt(brand), clean_valvula_html)
+    return entries
+
+def entry_status(store, key, fingerprint):
+    """Estado de un fragmento respecto de su prompt actual"""
+    if key not in store:
+        return STATUS_MISSING
+    if store.fingerprint(key) != fingerprint:
+        return STATUS_STALE
+    return STATUS_FRESH
+
+def select_brands(brands_list, wanted):
+    """Marcas pedidas por nombre o slug; termina con error si alguna no existe"""
+    if not wanted:
+        return brands_list
+    by_slug = {brand.replace(' ', '-').lower(): brand for brand in brands_list}
+    selected = []
+    for name in wanted:
+        slug = name.replace(' ', '-').lower()
+        if slug not in by_slug:
+            print(f"[ERROR] Marca desconocida: {name}")
+            sys.exit(1)
+        selected.append(by_slug[slug])
+    return selected
+
+def arg_list(argv, name):
+    """Valores de una opción separada por comas (--kind a,b)"""
+    if name not in argv:
+        return []
+    idx = argv.index(name)
+    if idx + 1 >= len(argv):
+        return []
+    return [value for value in argv[idx + 1].split(',') if value]
+
+def regenerate(kinds, brands, stale_only=False, dry_run=False, adopt=False, diversify=False,
+               threshold=DEFAULT_THRESHOLD):
+    """Regenera (o adopta) los fragmentos seleccionados; devuelve cuántos se actualizaron"""
+    catalog = load_catalog()
+    store = ContentStore()
+
+    # Fragmentos candidatos con su prompt y huella actuales. De cada modelo
+    # cuentan la introducción completa si está guardada, o si no su párrafo
+    # propio y el bloque técnico de su firma (ver spec_plan)
+    plan = plan_models(catalog, brands, store)
+    candidates = {}
+    for kind in kinds:
+        for key, (prompt, clean) in expected_entries(kind, brands, catalog).items():
+            if plan.wants(key):
+                candidates[key] = (prompt, clean, prompt_fingerprint(prompt))
+
+    counts = {STATUS_MISSING: 0, STATUS_STALE: 0, STATUS_FRESH: 0}
+    selected = {}
+    for key, (prompt, clean, fingerprint) in candidates.items():
+        status = entry_status(store, key, fingerprint)
+        counts[status] += 1
+        if stale_only and status == STATUS_FRESH:
+            continue
+        selected[key] = status
+
+    prompts = {key: prompt for key, (prompt, _, _) in candidates.items()}
+    if diversify:
+        # Solo los casi duplicados (menos el de referencia de cada grupo)
+        report = analyze(store, catalog, threshold, {split_key(key)[0] for key in candidates})
+        flagged = flagged_keys(report)
+        selected = {key: STATUS_DUPLICATE for key in candidates if key in flagged}
+        for key in selected:
+            brand = catalog.by_slug.get(split_key(key)[1])
+            prompts[key] = diversify_prompt(prompts[key], brand.name if brand else None)
+
+    print(f"[*] Fragmentos: {len(candidates)} "
+          f"({counts[STATUS_FRESH]} vigentes, {counts[STATUS_STALE]} desactualizados, {counts[STATUS_MISSING]} ausentes)")
+    print(f"[*] Seleccionados: {len(selected)}")
+    for key, status in selected.items():
+        print(f"    {key:45s} {status}")
+
+    if dry_run or not selected:
+        store.close()
+        return 0
+
+    if adopt:
+        adopted = 0
+        for key in selected:
+            if key in store:
+                store.put(key, store[key], candidates[key][2])
+                adopted += 1
+        print(f"[OK] {adopted} fragmentos adoptados con la huella actual (sin llamadas a la API)")
+        store.compact(force=True)  # Reescribe todo el registro: no dejar versiones viejas
+        store.close()
+        return adopted
+
+    updated = 0
+
+    def store_result(key, content):
+        nonlocal updated
+        prompt, clean, fingerprint = candidates[key]
+        content = clean(content)
+        if content:
+            store.put(key, content, fingerprint)
+            updated += 1
+            print(f"  {key:45s} >> [OK]")
+        else:
+            print(f"  {key:45s} >> [FAIL] (se conserva la version anterior)")
+
+    # Los fragmentos de una marca (aunque sean de distintos tipos) se piden juntos
+    generate_all({key: prompts[key] for key in selected}, store_result,
+                 group_by=key_brand, validate=lambda key, text: bool(candidates[key][1](text)))
+    store.close()
+
+    print(f"\n[DONE] {updated}/{len(selected)} fragmentos regenerados")
+    generators = sorted({KINDS[kind] for kind in kinds})
+    print(f"[INFO] Para re-renderizar las paginas afectadas: {', '.join(f'python scripts/{g}.py' for g in generators)}")
+    return updated
+
+if __name__ == "__main__":
+    kinds = arg_list(sys.argv, "--kind")
+    if kinds == ['all']:
+        kinds = list(KINDS)
+    unknown = [kind for kind in kinds if kind not in KINDS]
+    if not kinds or unknown:
+        print(f"Uso: regenerate.py --kind {{{','.join(KINDS)}|all}} [--brand marca[,marca]] "
+              "[--stale-only] [--dry-run] [--adopt] [--diversify [--threshold X]]")
+        sys.exit(1)
+
+    try:
+        brands = select_brands(load_catalog().names(), arg_list(sys.argv, "--brand"))
+        threshold = float((arg_list(sys.argv, "--threshold") or [DEFAULT_THRESHOLD])[0])
+    except (CatalogError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    try:
+        regenerate(kinds, brands,
+                   stale_only="--stale-only" in sys.argv,
+                   dry_run="--dry-run" in sys.argv,
+                   adopt="--adopt" in sys.argv,
+                   diversify="--diversify" in sys.argv,
+                   threshold=threshold)
+    except MissingApiKeyError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
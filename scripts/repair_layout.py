@@ -0,0 +1,173 @@
+from functools import lru_cache
+
+from build_css import stylesheet_link
+from build_fonts import font_preload_links
+from publish import SITE_URL
+
+# Diseño compartido de las guías de reparación
+#
+# Las páginas de build_repair_pages.py y build_cambiar_valvula_pages.py
+# tienen la misma estructura: cabecera <head>, header, breadcrumb, el
+# contenido de la guía, la grilla "Otras Reparaciones" y el footer. Cada
+# parte es un fragmento (partial) que se renderiza una sola vez y se
+# memoriza según de qué depende:
+#
+# - page_assets(): estilos, fuentes y apertura de <body>, iguales en todas
+#   las páginas (lee data/stylesheet.json y data/fonts.json una vez por proceso)
+# - site_header(), breadcrumb_prefix(), site_footer(): uno por marca
+# - related_link(): un enlace por marca y tipo de reparación, compartido
+#   por las grillas de todas las guías de esa marca
+#
+# repair_page() arma cada página concatenando los fragmentos con lo único
+# que cambia de una guía a otra: título, descripción, canonical y contenido.
+
+STORE_URL = "https://casadelcalefon.uy"
+
+
+@lru_cache(maxsize=None)
+def page_assets():
+    """Estilos, fuentes y apertura de <body> (igual en todas las guías)"""
+    return f"""    <!-- Estilos (scripts/build_css.py) -->
+    {stylesheet_link()}
+    
+    <!-- Fuentes (scripts/build_fonts.py) -->
+    {font_preload_links()}
+    
+    <style>
+        body {{ font-family: 'Inter', sans-serif; }}
+    </style>
+</head>
+<body class="bg-gray-50">
+    
+"""
+
+
+@lru_cache(maxsize=None)
+def site_header(brand, slug):
+    """Header con la navegación de la marca"""
+    return f"""    <!-- Header -->
+    <header class="bg-white shadow-md sticky top-0 z-50">
+        <div class="container mx-auto px-4 py-4">
+            <div class="flex justify-between items-center">
+                <div>
+                    <a href="/{slug}/" class="text-2xl font-bold text-primary hover:text-blue-700 transition">
+                        <i class="fas fa-fire mr-2"></i>Calefones {brand}
+                    </a>
+                </div>
+                <nav class="hidden md:flex space-x-6">
+                    <a href="/{slug}/" class="text-gray-700 hover:text-primary transition">Inicio</a>
+                    <a href="/{slug}/#diagnostico" class="text-gray-700 hover:text-primary transition">Diagnóstico</a>
+                    <a href="/{slug}/#reparaciones" class="text-gray-700 hover:text-primary transition">Reparaciones</a>
+                    <a href="{STORE_URL}" target="_blank" class="bg-primary text-white px-4 py-2 rounded-lg hover:bg-blue-700 transition">
+                        <i class="fas fa-shopping-cart mr-2"></i>Tienda
+                    </a>
+                </nav>
+            </div>
+        </div>
+    </header>
+    
+"""
+
+
+@lru_cache(maxsize=None)
+def breadcrumb_prefix(brand, slug):
+    """Breadcrumb hasta 'Reparaciones' (falta la etiqueta de la guía)"""
+    return f"""    <!-- Breadcrumb -->
+    <div class="bg-gray-100 py-3">
+        <div class="container mx-auto px-4">
+            <nav class="text-sm">
+                <a href="/" class="text-primary hover:underline">Inicio</a>
+                <span class="mx-2 text-gray-500">/</span>
+                <a href="/{slug}/" class="text-primary hover:underline">{brand}</a>
+                <span class="mx-2 text-gray-500">/</span>
+                <a href="/{slug}/#reparaciones" class="text-primary hover:underline">Reparaciones</a>
+                <span class="mx-2 text-gray-500">/</span>
+                <span class="text-gray-700">"""
+
+
+BREADCRUMB_END = """</span>
+            </nav>
+        </div>
+    </div>
+    
+    <!-- Main Content -->
+    <main class="container mx-auto px-4 py-12 max-w-4xl">
+        
+        """
+
+
+@lru_cache(maxsize=None)
+def related_link(slug, repair_id, title, icon, color):
+    """Enlace a una guía de la marca en la grilla 'Otras Reparaciones'"""
+    return f"""                <a href="/{slug}/reparaciones/{repair_id}.html" class="block p-4 border border-gray-200 rounded-lg hover:border-{color}-500 hover:shadow-md transition">
+                    <i class="fas {icon} text-{color}-600 mr-2"></i><span class="font-semibold">{title}</span>
+                </a>
+"""
+
+
+def related_repairs(brand, slug, links):
+    """Grilla 'Otras Reparaciones' con los enlaces dados: [(id, título, ícono, color), ...]"""
+    return (f"""
+        
+        <!-- Otras Reparaciones -->
+        <div class="mt-12 bg-white p-6 rounded-lg shadow-md">
+            <h3 class="text-xl font-bold text-gray-800 mb-4">Otras Reparaciones de {brand}</h3>
+            <div class="grid md:grid-cols-2 gap-4">
+"""
+            + ''.join(related_link(slug, *link) for link in links)
+            + """            </div>
+        </div>
+        
+    </main>
+    
+""")
+
+
+@lru_cache(maxsize=None)
+def site_footer(brand):
+    """Footer con el enlace a la tienda y cierre del documento"""
+    return f"""    <!-- Footer -->
+    <footer class="bg-gray-800 text-white py-8 mt-12">
+        <div class="container mx-auto px-4 text-center">
+            <p class="mb-2"><i class="fas fa-phone mr-2"></i>Servicio Técnico Especializado en Uruguay</p>
+            <p class="text-gray-400 text-sm">Guías de reparación para calefones {brand} - © 2025</p>
+            <div class="mt-4">
+                <a href="{STORE_URL}" target="_blank" class="text-primary hover:text-blue-400 transition">
+                    <i class="fas fa-store mr-2"></i>Visitá Nuestra Tienda de Repuestos
+                </a>
+            </div>
+        </div>
+    </footer>
+    
+</body>
+</html>"""
+
+
+def repair_page(brand, slug, repair_id, title, action, crumb, content, links):
+    """HTML completo de una guía de reparación
+
+    title: título de la guía ('Cambiar Resistencia'), action: qué se hace, en
+    minúsculas, para la descripción; crumb: etiqueta en el breadcrumb;
+    links: enlaces de la grilla 'Otras Reparaciones' (ver related_repairs()).
+    """
+    return ''.join((
+        f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - Calefón {brand} | Guía Paso a Paso</title>
+    <meta name="description" content="Guía completa paso a paso para {action} en calefones {brand}. Herramientas, medidas de seguridad y procedimiento detallado.">
+    <meta name="robots" content="index, follow">
+    <link rel="canonical" href="{SITE_URL}/{slug}/reparaciones/{repair_id}.html">
+    
+""",
+        page_assets(),
+        site_header(brand, slug),
+        breadcrumb_prefix(brand, slug),
+        crumb,
+        BREADCRUMB_END,
+        content,
+        related_repairs(brand, slug, links),
+        site_footer(brand),
+    ))
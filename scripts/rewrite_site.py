@@ -0,0 +1,209 @@
+import difflib
+import json
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path, PurePosixPath
+
+from content_store import write_atomic
+from publish import ensure_staged, output_dir
+
+# Motor de reescritura de public/
+#
+#   python scripts/rewrite_site.py [--dry-run] [--rules archivo.json]
+#
+# Reemplaza a los scripts de corrección sueltos (fix_broken_links,
+# fix_repair_links, reparar_rutas, update_urls, corregir_enlace_anodo y
+# corregir_enlaces_modelos): cada corrección es ahora una regla de
+# data/rewrite_rules.json.
+#
+# Cada regla tiene:
+#   id        nombre que aparece en el conteo de aciertos
+#   files     patrón (o lista de patrones) de rutas relativas a public/; se
+#             compara desde la derecha, así 'modelos/*.html' vale para
+#             cualquier marca/modelos/ y '*.html' para todo el sitio
+#   literal   texto exacto a buscar, o bien
+#   regex     expresión regular (sintaxis de re; el reemplazo admite \1)
+#   replace   texto de reemplazo
+#
+# Todas las reglas que aplican a un archivo se combinan en una sola
+# expresión alternada, así cada archivo se lee y se recorre una única vez.
+# Las reglas se aplican a la vez sobre el texto original: en cada posición
+# gana la primera regla (en orden del archivo) que coincide, y lo ya
+# reemplazado no se vuelve a procesar. Para encadenar correcciones sobre el
+# mismo enlace conviene usar contexto sin consumirlo (p. ej.
+# (?<=reparaciones/)), como hace la regla de reemplazar-termostato.
+# Al combinarse, los grupos de cada regla cambian de número: una regla con
+# referencias hacia atrás en la expresión (\1, (?P=nombre), (?(1)...)) se
+# rechaza al cargar. El reemplazo sí puede usar \1.
+#
+# Solo se escriben los archivos que cambian, de forma atómica (archivo
+# temporal + os.replace). Con --dry-run se muestra el diff unificado de
+# cada archivo sin escribir nada.
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = output_dir()
+RULES_FILE = BASE_DIR / 'data' / 'rewrite_rules.json'
+
+# Referencias hacia atrás en una expresión (un \\ escapado se salta)
+BACKREF_RE = re.compile(r'\\\\|\\[1-9]|\(\?P=|\(\?\(')
+
+
+class RewriteRule:
+    """Una regla de reescritura: patrón, reemplazo y archivos a los que aplica"""
+
+    def __init__(self, spec):
+        missing = [field for field in ('id', 'files', 'replace') if field not in spec]
+        if missing:
+            raise ValueError(f"Regla {spec.get('id', '?')}: faltan campos {', '.join(missing)}")
+        if ('literal' in spec) == ('regex' in spec):
+            raise ValueError(f"Regla {spec['id']}: debe tener 'literal' o 'regex' (uno solo)")
+
+        self.id = spec['id']
+        files = spec['files']
+        self.files = [files] if isinstance(files, str) else list(files)
+        self.replace = spec['replace']
+        self.literal = 'literal' in spec
+        source = re.escape(spec['literal']) if self.literal else spec['regex']
+        try:
+            self.pattern = re.compile(source)
+        except re.error as e:
+            raise ValueError(f"Regla {self.id}: expresion invalida: {e}") from None
+        if self.literal:
+            self.pattern_source = source
+        else:
+            backref = next((m.group(0) for m in BACKREF_RE.finditer(source) if m.group(0) != '\\\\'), None)
+            if backref:
+                raise ValueError(f"Regla {self.id}: la expresion usa una referencia hacia atras ('{backref}'), "
+                                 "que deja de funcionar al combinarse con las demas reglas")
+            # Envolver la expresión tal cual: sus grupos se vuelven a leer
+            # con self.pattern al expandir el reemplazo
+            self.pattern_source = f"(?:{source})"
+
+    def applies_to(self, rel):
+        """La regla aplica a una ruta relativa a public/"""
+        path = PurePosixPath(rel)
+        return any(path.match(pattern) for pattern in self.files)
+
+    def expand(self, content, pos):
+        """Reemplazo de la coincidencia que empieza en pos"""
+        if self.literal:
+            return self.replace
+        return self.pattern.match(content, pos).expand(self.replace)
+
+
+def load_rules(path=RULES_FILE):
+    """Carga y valida las reglas; lanza ValueError si alguna es inválida"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        specs = json.load(f)
+    rules = [RewriteRule(spec) for spec in specs]
+    ids = Counter(rule.id for rule in rules)
+    repeated = [rule_id for rule_id, n in ids.items() if n > 1]
+    if repeated:
+        raise ValueError(f"Reglas con id repetido: {', '.join(repeated)}")
+    return rules
+
+
+class Rewriter:
+    """Aplica un conjunto de reglas en una pasada por archivo"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.hits = Counter()        # id de regla -> reemplazos
+        self.files_hit = Counter()   # id de regla -> archivos afectados
+        self._combined = {}          # reglas aplicables -> expresión combinada
+
+    def _pattern_for(self, indices):
+        pattern = self._combined.get(indices)
+        if pattern is None:
+            pattern = re.compile('|'.join(f"(?P<r{i}>{self.rules[i].pattern_source})" for i in indices))
+            self._combined[indices] = pattern
+        return pattern
+
+    def applicable(self, rel):
+        """Índices de las reglas que aplican a un archivo (en orden)"""
+        return tuple(i for i, rule in enumerate(self.rules) if rule.applies_to(rel))
+
+    def rewrite(self, rel, content):
+        """Contenido reescrito de un archivo (igual al original si nada coincide)"""
+        indices = self.applicable(rel)
+        if not indices:
+            return content
+        counts = Counter()
+
+        def substitute(match):
+            i = int(match.lastgroup[1:])
+            counts[i] += 1
+            return self.rules[i].expand(content, match.start())
+
+        result = self._pattern_for(indices).sub(substitute, content)
+        for i, n in counts.items():
+            self.hits[self.rules[i].id] += n
+            self.files_hit[self.rules[i].id] += 1
+        return result
+
+
+def site_files(public_dir):
+    """Rutas relativas a public/ de todos los archivos, en orden estable"""
+    files = []
+    for root, dirs, names in os.walk(public_dir):
+        dirs.sort()
+        rel_root = Path(root).relative_to(public_dir).as_posix()
+        for name in sorted(names):
+            files.append(name if rel_root == '.' else f"{rel_root}/{name}")
+    return files
+
+
+def rewrite_site(public_dir=PUBLIC_DIR, rules_file=RULES_FILE, dry_run=False, out=sys.stdout):
+    """Aplica las reglas a public/; devuelve (rewriter, archivos cambiados)"""
+    public_dir = Path(public_dir)
+    rewriter = Rewriter(load_rules(rules_file))
+    changed = []
+    for rel in site_files(public_dir):
+        if not rewriter.applicable(rel):
+            continue
+        path = public_dir / rel
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            content = f.read()
+        result = rewriter.rewrite(rel, content)
+        if result == content:
+            continue
+        changed.append(rel)
+        if dry_run:
+            out.writelines(difflib.unified_diff(content.splitlines(keepends=True),
+                                                result.splitlines(keepends=True),
+                                                f"a/{rel}", f"b/{rel}"))
+        else:
+            write_atomic(path, result, newline='')
+    return rewriter, changed
+
+
+def option_value(argv, name, default):
+    """Valor de una opción --nombre valor"""
+    if name in argv:
+        idx = argv.index(name)
+        if idx + 1 < len(argv):
+            return argv[idx + 1]
+    return default
+
+
+if __name__ == "__main__":
+    ensure_staged()
+    dry_run = "--dry-run" in sys.argv
+    rules_file = Path(option_value(sys.argv, "--rules", RULES_FILE))
+    try:
+        rewriter, changed = rewrite_site(rules_file=rules_file, dry_run=dry_run)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    out = sys.stderr if dry_run else sys.stdout  # en --dry-run stdout es el diff
+    print("=" * 70, file=out)
+    print("RESUMEN" + (" (--dry-run, sin escribir)" if dry_run else ""), file=out)
+    print("=" * 70, file=out)
+    for rule in rewriter.rules:
+        print(f"  {rule.id:32s} {rewriter.hits[rule.id]:6d} reemplazos en "
+              f"{rewriter.files_hit[rule.id]} archivos", file=out)
+    print(f"[*] Archivos {'a cambiar' if dry_run else 'modificados'}: {len(changed)}", file=out)
+    print(f"[*] Reemplazos: {sum(rewriter.hits.values())}", file=out)
@@ -0,0 +1,165 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+
+from content_store import content_key
+
+# Plan de generación del contenido de modelos por firma de especificaciones
+#
+# Muchos modelos comparten exactamente las mismas especificaciones (p. ej.
+# 'Rosca 1 1/4 - 1500W' + 'Contacto universal' + 'Rosca 1/2 pulgada'), y la
+# parte técnica de su introducción (ventajas, mantenimiento, herramientas)
+# solo depende de ellas. Por eso la introducción de un modelo se arma con
+# dos fragmentos:
+#
+#   model_lead  (marca, modelo)  párrafo breve propio del modelo y la marca
+#   spec_block  (-, firma)       bloque técnico, uno por firma de
+#                                especificaciones, compartido entre modelos
+#                                y marcas
+#
+# La firma es un hash de las especificaciones normalizadas (minúsculas,
+# espacios colapsados, 'pulgada(s)' = '"', herramientas sin orden ni
+# repetidos). Con cientos de modelos, las llamadas a la API y el tamaño del
+# almacén del bloque técnico crecen con las firmas distintas, no con los
+# modelos.
+#
+# Una introducción completa ya guardada (model_intro) tiene prioridad: los
+# modelos que la tienen no piden ni usan los fragmentos del plan.
+
+SIGNATURE_LENGTH = 12
+INCH_RE = re.compile(r'\s*(?:pulgadas?\b|")')
+
+
+def _normalize(text):
+    return ' '.join(INCH_RE.sub('"', (text or '').lower()).split())
+
+
+def spec_signature(specs):
+    """Firma corta de unas especificaciones normalizadas"""
+    fields = (
+        _normalize(specs.resistencia),
+        _normalize(specs.termostato),
+        _normalize(specs.anodo),
+        ','.join(sorted({_normalize(tool) for tool in specs.herramientas})),
+    )
+    return hashlib.sha1('|'.join(fields).encode('utf-8')).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def model_intro_key(slug, model):
+    return content_key('model_intro', slug, model.id)
+
+
+def model_lead_key(slug, model):
+    return content_key('model_lead', slug, model.id)
+
+
+def spec_block_key(specs):
+    """Clave del bloque técnico (sin marca: lo comparten todas)"""
+    return content_key('spec_block', '', spec_signature(specs))
+
+
+def model_lead_prompt(brand, model):
+    """Prompt del párrafo propio de un modelo (sin el bloque técnico)"""
+    prompt = f"""Eres un técnico especializado en reparación de calefones {brand} en Uruguay.
+
+Genera SOLO un fragmento HTML (SIN etiquetas html, head, body, section) que presente el modelo **{brand} {model.name}**. Las especificaciones técnicas van en un bloque aparte: no las detalles.
+
+DATOS DEL MODELO:
+- Descripción: {model.description}
+
+GENERA EXACTAMENTE ESTA ESTRUCTURA:
+
+<p class="lead">... Posicionamiento del {model.name} en la línea {brand}, capacidad y aplicaciones, tecnología destacada ...</p>
+
+IMPORTANTE: NO incluyas ```html, ni etiquetas de estructura. Solo el fragmento HTML directo.
+LONGITUD: 50-80 palabras."""
+
+    return prompt
+
+
+def spec_block_prompt(specs):
+    """Prompt del bloque técnico común a los modelos con estas especificaciones"""
+    prompt = f"""Eres un técnico especializado en reparación de calefones eléctricos en Uruguay.
+
+Genera SOLO fragmentos HTML (SIN etiquetas html, head, body, section) con el bloque técnico de un calefón con estas especificaciones. Varios modelos de distintas marcas lo comparten: NO menciones marcas ni nombres de modelos.
+
+ESPECIFICACIONES:
+- Resistencia: {specs.resistencia or 'N/A'}
+- Termostato: {specs.termostato or 'N/A'}
+- Ánodo: {specs.anodo or 'N/A'}
+- Herramientas: {', '.join(specs.herramientas)}
+
+GENERA EXACTAMENTE ESTA ESTRUCTURA:
+
+<h3 class="text-xl font-bold mt-6 mb-4 text-gray-800">Ventajas Técnicas del Modelo</h3>
+<ul class="space-y-3">
+    <li class="flex items-start"><i class="fas fa-check-circle text-green-600 mr-2 mt-1"></i><span><strong>Punto 1:</strong> Detalle sobre resistencia {specs.resistencia or ''}</span></li>
+    <li class="flex items-start"><i class="fas fa-check-circle text-green-600 mr-2 mt-1"></i><span><strong>Punto 2:</strong> Facilidad de mantenimiento</span></li>
+    <li class="flex items-start"><i class="fas fa-check-circle text-green-600 mr-2 mt-1"></i><span><strong>Punto 3:</strong> Eficiencia energética</span></li>
+    <li class="flex items-start"><i class="fas fa-check-circle text-green-600 mr-2 mt-1"></i><span><strong>Punto 4:</strong> Durabilidad del tanque</span></li>
+</ul>
+
+<p class="mt-6">... Componentes de mantenimiento frecuente, dificultad de reparaciones DIY con herramientas mencionadas ...</p>
+
+IMPORTANTE: NO incluyas ```html, ni etiquetas de estructura. Solo el fragmento HTML directo.
+LONGITUD: 130-170 palabras."""
+
+    return prompt
+
+
+def compose_model_intro(store, slug, model):
+    """Introducción de un modelo: la completa guardada, o párrafo propio + bloque técnico; None si falta"""
+    key = model_intro_key(slug, model)
+    if key in store:
+        return store[key]
+    lead_key, block_key = model_lead_key(slug, model), spec_block_key(model.specs)
+    if lead_key in store and block_key in store:
+        return f"{store[lead_key]}\n\n{store[block_key]}"
+    return None
+
+
+@dataclass(slots=True)
+class ModelPlan:
+    """Fragmentos que necesitan los modelos de un conjunto de marcas"""
+    full: list = field(default_factory=list)        # claves model_intro ya guardadas
+    leads: dict = field(default_factory=dict)       # clave model_lead -> (marca, modelo)
+    blocks: dict = field(default_factory=dict)      # clave spec_block -> especificaciones
+    groups: dict = field(default_factory=dict)      # clave spec_block -> [(slug, id de modelo)]
+
+    def prompts(self):
+        """Clave -> prompt de todos los fragmentos del plan"""
+        prompts = {key: model_lead_prompt(brand, model) for key, (brand, model) in self.leads.items()}
+        prompts.update((key, spec_block_prompt(specs)) for key, specs in self.blocks.items())
+        return prompts
+
+    def wants(self, key):
+        """False para fragmentos de modelos que el plan no usa"""
+        if key.startswith('model_intro|'):
+            return key in self.full
+        if key.startswith('model_lead|'):
+            return key in self.leads
+        if key.startswith('spec_block|'):
+            return key in self.blocks
+        return True
+
+    def print_summary(self):
+        shared = sum(1 for models in self.groups.values() if len(models) > 1)
+        print(f"[*] Modelos: {len(self.full)} con introduccion completa, {len(self.leads)} con "
+              f"introduccion breve + {len(self.blocks)} bloques tecnicos ({shared} compartidos)")
+
+
+def plan_models(catalog, brands, store):
+    """Plan de los modelos de las marcas dadas (nombres) según lo que ya hay en el almacén"""
+    plan = ModelPlan()
+    for brand in brands:
+        entry = catalog.by_name[brand]
+        for model in entry.models:
+            key = model_intro_key(entry.slug, model)
+            if key in store:
+                plan.full.append(key)
+                continue
+            plan.leads[model_lead_key(entry.slug, model)] = (brand, model)
+            block_key = spec_block_key(model.specs)
+            plan.blocks.setdefault(block_key, model.specs)
+            plan.groups.setdefault(block_key, []).append((entry.slug, model.id))
+    return plan
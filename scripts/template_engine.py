@@ -0,0 +1,133 @@
+import hashlib
+import re
+from pathlib import Path
+
+# Motor de plantillas compilado para plantilla_maestra.html
+#
+# La plantilla se analiza una sola vez en segmentos literales y huecos
+# ({{nombre}}). Cada página se renderiza con un único ''.join() en lugar de
+# una cadena de str.replace() que copia el documento completo en cada paso.
+# Los huecos desconocidos o sin rellenar son un error, nunca texto literal
+# publicado. Cada <section id="..."> es un bloque con nombre que se puede
+# ocultar (se omite del HTML final junto con sus huecos).
+
+SLOT_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+BLOCK_PATTERN = re.compile(r'<section id="([\w-]+)"[^>]*>.*?</section>', re.DOTALL)
+
+
+class TemplateError(Exception):
+    """Error al compilar o renderizar una plantilla"""
+
+
+class CompiledTemplate:
+    """Plantilla compilada en segmentos literales y huecos"""
+
+    __slots__ = ('name', 'source', 'digest', 'slots', 'blocks', '_segments', '_plans')
+
+    def __init__(self, source, name='<plantilla>'):
+        self.name = name
+        self.source = source
+        self.digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+        # Segmentos: str = literal, (nombre,) = hueco
+        # Bloques: nombre -> (indice_inicio, indice_fin) sobre los segmentos
+        segments = []
+        blocks = {}
+        pos = 0
+        for match in BLOCK_PATTERN.finditer(source):
+            self._split(source[pos:match.start()], segments)
+            block_name = match.group(1)
+            if block_name in blocks:
+                raise TemplateError(f"{name}: bloque duplicado '{block_name}'")
+            start = len(segments)
+            self._split(match.group(0), segments)
+            blocks[block_name] = (start, len(segments))
+            pos = match.end()
+        self._split(source[pos:], segments)
+
+        self._segments = segments
+        self.slots = frozenset(seg[0] for seg in segments if isinstance(seg, tuple))
+        self.blocks = blocks
+        self._plans = {}
+
+    @staticmethod
+    def _split(text, segments):
+        """Divide un texto en literales y huecos"""
+        pos = 0
+        for match in SLOT_PATTERN.finditer(text):
+            if match.start() > pos:
+                segments.append(text[pos:match.start()])
+            segments.append((match.group(1),))
+            pos = match.end()
+        if pos < len(text):
+            segments.append(text[pos:])
+
+    def _plan(self, hidden):
+        """Plan de render (literales + posiciones de huecos) para un conjunto de bloques ocultos"""
+        plan = self._plans.get(hidden)
+        if plan is not None:
+            return plan
+
+        unknown_blocks = hidden - self.blocks.keys()
+        if unknown_blocks:
+            raise TemplateError(f"{self.name}: bloques inexistentes: {', '.join(sorted(unknown_blocks))}")
+
+        skipped = set()
+        for block_name in hidden:
+            start, end = self.blocks[block_name]
+            skipped.update(range(start, end))
+
+        parts = []
+        slot_positions = []
+        last_literal = False
+        for idx, seg in enumerate(self._segments):
+            if idx in skipped:
+                continue
+            if isinstance(seg, tuple):
+                slot_positions.append((len(parts), seg[0]))
+                parts.append('')
+                last_literal = False
+            elif last_literal:
+                # Fusionar literales contiguos (p. ej. al omitir un bloque)
+                parts[-1] += seg
+            else:
+                parts.append(seg)
+                last_literal = True
+
+        required = frozenset(name for _, name in slot_positions)
+        plan = (parts, tuple(slot_positions), required)
+        self._plans[hidden] = plan
+        return plan
+
+    def render(self, values, hidden=()):
+        """Renderiza la plantilla con los valores dados, omitiendo los bloques ocultos"""
+        parts, slot_positions, required = self._plan(frozenset(hidden))
+
+        unknown = values.keys() - self.slots
+        if unknown:
+            raise TemplateError(f"{self.name}: huecos desconocidos: {', '.join(sorted(unknown))}")
+        missing = required - values.keys()
+        if missing:
+            raise TemplateError(f"{self.name}: huecos sin rellenar: {', '.join(sorted(missing))}")
+
+        out = parts[:]
+        for idx, slot_name in slot_positions:
+            out[idx] = values[slot_name]
+        return ''.join(out)
+
+
+_TEMPLATE_CACHE = {}
+
+
+def load_template(path):
+    """Lee y compila una plantilla (una sola vez por ruta y fecha de modificación)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    template = _TEMPLATE_CACHE.get(key)
+    if template is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            template = CompiledTemplate(f.read(), name=path.name)
+        _TEMPLATE_CACHE[key] = template
+    return template